@@ -0,0 +1,449 @@
+pragma solidity 0.5.17;
+
+import "./MultiRewards.sol";
+
+
+/**
+ * @notice `MultiRewards` for many staking tokens in one contract
+ * @dev Every pool keeps the accounting of a single `MultiRewards`: its own supply,
+ *      balances, reward tokens, reward data and user checkpoints, all keyed by
+ *      pool ID. Pools only meet in `getRewardMany`, which claims from several
+ *      pools and pays each reward token with one transfer.
+ */
+contract MultiPoolRewards is ReentrancyGuard, Pausable {
+    using SafeMath for uint256;
+    using SafeCast for uint256;
+    using SafeERC20 for IERC20;
+
+    /* ========== STATE VARIABLES ========== */
+
+    // Same packing as `MultiRewards.Reward`
+    struct Reward {
+        address rewardsDistributor;
+        uint32 rewardsDuration;
+        uint32 periodFinish;
+        uint256 rewardRate;
+        uint32 lastUpdateTime;
+        uint224 rewardPerTokenStored;
+    }
+    // pool ID -> staking token, pool IDs are assigned in order by `addPool`
+    IERC20[] public stakingTokens;
+    mapping(address => bool) public isStakingToken;
+
+    // pool ID -> reward token -> reward data
+    mapping(uint256 => mapping(address => Reward)) public rewardData;
+    mapping(uint256 => address[]) public rewardTokens;
+
+    // pool ID -> reward tokens whose accumulator can still change
+    mapping(uint256 => address[]) public activeRewardTokens;
+    // pool ID -> reward token -> position in `activeRewardTokens` plus one
+    mapping(uint256 => mapping(address => uint256)) private _activeRewardIndex;
+
+    // pool ID -> user -> reward token -> amount
+    mapping(uint256 => mapping(address => mapping(address => uint256))) public userRewardPerTokenPaid;
+    mapping(uint256 => mapping(address => mapping(address => uint256))) public rewards;
+
+    // pool ID -> deactivation log, see `MultiRewards.deactivatedRewardTokens`
+    mapping(uint256 => address[]) public deactivatedRewardTokens;
+    mapping(uint256 => mapping(address => uint256)) public userRewardsEpoch;
+
+    // reward tokens funded in any pool, which `recoverERC20` must not touch
+    mapping(address => bool) private _isFundedRewardToken;
+
+    mapping(uint256 => uint256) private _totalSupply;
+    mapping(uint256 => mapping(address => uint256)) private _balances;
+
+    /* ========== CONSTRUCTOR ========== */
+
+    constructor(address _owner) public Owned(_owner) {}
+
+    function addPool(address _stakingToken) external onlyOwner returns (uint256 poolId) {
+        require(!isStakingToken[_stakingToken], "Pool already exists");
+        poolId = stakingTokens.length;
+        stakingTokens.push(IERC20(_stakingToken));
+        isStakingToken[_stakingToken] = true;
+        emit PoolAdded(poolId, _stakingToken);
+    }
+
+    function addReward(
+        uint256 poolId,
+        address _rewardsToken,
+        address _rewardsDistributor,
+        uint256 _rewardsDuration
+    )
+        public
+        onlyOwner
+        validPool(poolId)
+    {
+        require(rewardData[poolId][_rewardsToken].rewardsDuration == 0);
+        rewardTokens[poolId].push(_rewardsToken);
+        rewardData[poolId][_rewardsToken].rewardsDistributor = _rewardsDistributor;
+        rewardData[poolId][_rewardsToken].rewardsDuration = _rewardsDuration.toUint32();
+        emit RewardTokenAdded(poolId, _rewardsToken, _rewardsDistributor, _rewardsDuration);
+    }
+
+    /* ========== VIEWS ========== */
+
+    function poolsLength() external view returns (uint256) {
+        return stakingTokens.length;
+    }
+
+    function totalSupply(uint256 poolId) external view returns (uint256) {
+        return _totalSupply[poolId];
+    }
+
+    function balanceOf(uint256 poolId, address account) external view returns (uint256) {
+        return _balances[poolId][account];
+    }
+
+    function rewardsEpoch(uint256 poolId) public view returns (uint256) {
+        return deactivatedRewardTokens[poolId].length;
+    }
+
+    function rewardTokensLength(uint256 poolId) external view returns (uint256) {
+        return rewardTokens[poolId].length;
+    }
+
+    function lastTimeRewardApplicable(uint256 poolId, address _rewardsToken) public view returns (uint256) {
+        return Math.min(block.timestamp, rewardData[poolId][_rewardsToken].periodFinish);
+    }
+
+    function rewardPerToken(uint256 poolId, address _rewardsToken) public view returns (uint256) {
+        return _rewardPerToken(rewardData[poolId][_rewardsToken], _totalSupply[poolId]);
+    }
+
+    function earned(uint256 poolId, address account, address _rewardsToken) public view returns (uint256) {
+        return _balances[poolId][account].mul(rewardPerToken(poolId, _rewardsToken).sub(userRewardPerTokenPaid[poolId][account][_rewardsToken])).div(1e18).add(rewards[poolId][account][_rewardsToken]);
+    }
+
+    function getRewardForDuration(uint256 poolId, address _rewardsToken) external view returns (uint256) {
+        return rewardData[poolId][_rewardsToken].rewardRate.mul(rewardData[poolId][_rewardsToken].rewardsDuration);
+    }
+
+    /* ========== MUTATIVE FUNCTIONS ========== */
+
+    function setRewardsDistributor(uint256 poolId, address _rewardsToken, address _rewardsDistributor) external onlyOwner validPool(poolId) {
+        rewardData[poolId][_rewardsToken].rewardsDistributor = _rewardsDistributor;
+        emit RewardsDistributorUpdated(poolId, _rewardsToken, _rewardsDistributor);
+    }
+
+    function stake(uint256 poolId, uint256 amount) external nonReentrant notPaused validPool(poolId) updateReward(poolId, msg.sender) {
+        require(amount > 0, "Cannot stake 0");
+        uint256 supply = _totalSupply[poolId].add(amount);
+        uint256 balance = _balances[poolId][msg.sender].add(amount);
+        _totalSupply[poolId] = supply;
+        _balances[poolId][msg.sender] = balance;
+        stakingTokens[poolId].safeTransferFrom(msg.sender, address(this), amount);
+        emit Staked(poolId, msg.sender, amount);
+        emit BalanceUpdated(poolId, msg.sender, balance, supply);
+    }
+
+    function withdraw(uint256 poolId, uint256 amount) external nonReentrant validPool(poolId) updateReward(poolId, msg.sender) {
+        _withdraw(poolId, amount);
+    }
+
+    function getReward(uint256 poolId) external nonReentrant updateReward(poolId, msg.sender) {
+        _getReward(poolId, msg.sender);
+    }
+
+    // Claims only the given reward tokens of one pool, checkpointing each of them and nothing else
+    function getRewardForTokens(uint256 poolId, address[] calldata _rewardsTokens) external nonReentrant {
+        for (uint i; i < _rewardsTokens.length; i++) {
+            address _rewardsToken = _rewardsTokens[i];
+            _updateRewardToken(poolId, _rewardsToken, msg.sender, _totalSupply[poolId], _balances[poolId][msg.sender]);
+            _payReward(poolId, msg.sender, _rewardsToken);
+        }
+    }
+
+    /**
+     * @notice Claim every reward of several pools
+     * @dev Each pool is checkpointed and emits `RewardPaid` as in `getReward`, but a reward
+     *      token shared by several pools is sent with a single transfer of the combined amount.
+     */
+    function getRewardMany(uint256[] calldata poolIds) external nonReentrant {
+        uint256 length;
+        for (uint i; i < poolIds.length; i++) {
+            require(poolIds[i] < stakingTokens.length, "Unknown pool");
+            length = length.add(rewardTokens[poolIds[i]].length);
+        }
+        address[] memory tokens = new address[](length);
+        uint256[] memory amounts = new uint256[](length);
+        uint256 count;
+
+        for (uint i; i < poolIds.length; i++) {
+            _updateReward(poolIds[i], msg.sender);
+            count = _collectRewards(poolIds[i], msg.sender, tokens, amounts, count);
+        }
+
+        for (uint k; k < count; k++) {
+            IERC20(tokens[k]).safeTransfer(msg.sender, amounts[k]);
+        }
+    }
+
+    // Withdraws the full balance of a pool and claims its rewards behind a single checkpoint
+    function exit(uint256 poolId) external nonReentrant validPool(poolId) updateReward(poolId, msg.sender) {
+        _withdraw(poolId, _balances[poolId][msg.sender]);
+        _getReward(poolId, msg.sender);
+    }
+
+    /* ========== RESTRICTED FUNCTIONS ========== */
+
+    function notifyRewardAmount(uint256 poolId, address _rewardsToken, uint256 reward) external updateReward(poolId, address(0)) {
+        _notifyRewardAmount(poolId, _rewardsToken, reward);
+    }
+
+    // Funds several reward tokens of one pool while running the pool checkpoint only once
+    function notifyRewardAmounts(
+        uint256 poolId,
+        address[] calldata _rewardsTokens,
+        uint256[] calldata _rewards
+    )
+        external
+        updateReward(poolId, address(0))
+    {
+        require(_rewardsTokens.length == _rewards.length, "Array lengths differ");
+        for (uint i; i < _rewardsTokens.length; i++) {
+            _notifyRewardAmount(poolId, _rewardsTokens[i], _rewards[i]);
+        }
+    }
+
+    function recoverERC20(address tokenAddress, uint256 tokenAmount) external onlyOwner {
+        require(!isStakingToken[tokenAddress], "Cannot withdraw staking token");
+        require(!_isFundedRewardToken[tokenAddress], "Cannot withdraw reward token");
+        IERC20(tokenAddress).safeTransfer(owner, tokenAmount);
+        emit Recovered(tokenAddress, tokenAmount);
+    }
+
+    function setRewardsDuration(uint256 poolId, address _rewardsToken, uint256 _rewardsDuration) external {
+        Reward storage data = rewardData[poolId][_rewardsToken];
+        require(block.timestamp > data.periodFinish, "Reward period still active");
+        require(data.rewardsDistributor == msg.sender);
+        require(_rewardsDuration > 0, "Reward duration must be non-zero");
+        data.rewardsDuration = _rewardsDuration.toUint32();
+        emit RewardsDurationUpdated(poolId, _rewardsToken, data.rewardsDuration);
+    }
+
+    /* ========== INTERNAL FUNCTIONS ========== */
+
+    function _updateReward(uint256 poolId, address account) internal {
+        uint256 supply = _totalSupply[poolId];
+        uint256 balance = _balances[poolId][account];
+        address[] storage active = activeRewardTokens[poolId];
+
+        uint i;
+        while (i < active.length) {
+            address token = active[i];
+            if (_updateRewardToken(poolId, token, account, supply, balance)) {
+                _deactivateReward(poolId, token, i);
+            } else {
+                i++;
+            }
+        }
+
+        if (account != address(0)) {
+            _settleInactive(poolId, account, supply, balance);
+        }
+    }
+
+    // Settles the inactive reward tokens of a pool once, see `MultiRewards._settleInactive`
+    function _settleInactive(uint256 poolId, address account, uint256 supply, uint256 balance) internal {
+        address[] storage deactivated = deactivatedRewardTokens[poolId];
+        uint256 epoch = userRewardsEpoch[poolId][account];
+        uint256 currentEpoch = deactivated.length;
+        if (epoch != currentEpoch) {
+            address[] storage tokens = rewardTokens[poolId];
+            if (currentEpoch - epoch < tokens.length) {
+                for (uint i = epoch; i < currentEpoch; i++) {
+                    if (_activeRewardIndex[poolId][deactivated[i]] == 0) {
+                        _updateRewardToken(poolId, deactivated[i], account, supply, balance);
+                    }
+                }
+            } else {
+                for (uint i; i < tokens.length; i++) {
+                    if (_activeRewardIndex[poolId][tokens[i]] == 0) {
+                        _updateRewardToken(poolId, tokens[i], account, supply, balance);
+                    }
+                }
+            }
+            userRewardsEpoch[poolId][account] = currentEpoch;
+        }
+    }
+
+    /**
+     * @dev Checkpoints one reward token of a pool, see `MultiRewards._updateRewardToken`.
+     * Returns true once the reward period is over.
+     */
+    function _updateRewardToken(
+        uint256 poolId,
+        address _rewardsToken,
+        address account,
+        uint256 supply,
+        uint256 balance
+    )
+        internal
+        returns (bool)
+    {
+        Reward storage data = rewardData[poolId][_rewardsToken];
+        Reward memory cached = data;
+
+        uint256 rewardPerTokenStored = _rewardPerToken(cached, supply);
+        uint256 lastUpdateTime = Math.min(block.timestamp, cached.periodFinish);
+        if (rewardPerTokenStored != cached.rewardPerTokenStored || lastUpdateTime != cached.lastUpdateTime) {
+            data.rewardPerTokenStored = rewardPerTokenStored.toUint224();
+            data.lastUpdateTime = lastUpdateTime.toUint32();
+        }
+
+        if (account != address(0)) {
+            uint256 paid = userRewardPerTokenPaid[poolId][account][_rewardsToken];
+            if (paid != rewardPerTokenStored) {
+                if (balance > 0) {
+                    rewards[poolId][account][_rewardsToken] = rewards[poolId][account][_rewardsToken].add(
+                        balance.mul(rewardPerTokenStored.sub(paid)).div(1e18)
+                    );
+                }
+                userRewardPerTokenPaid[poolId][account][_rewardsToken] = rewardPerTokenStored;
+            }
+        }
+        return block.timestamp >= cached.periodFinish;
+    }
+
+    function _rewardPerToken(Reward memory data, uint256 supply) internal view returns (uint256) {
+        if (supply == 0) {
+            return data.rewardPerTokenStored;
+        }
+        return
+            uint256(data.rewardPerTokenStored).add(
+                Math.min(block.timestamp, data.periodFinish).sub(data.lastUpdateTime).mul(data.rewardRate).mul(1e18).div(supply)
+            );
+    }
+
+    function _notifyRewardAmount(uint256 poolId, address _rewardsToken, uint256 reward) internal {
+        Reward storage data = rewardData[poolId][_rewardsToken];
+        require(data.rewardsDistributor == msg.sender);
+        IERC20(_rewardsToken).safeTransferFrom(msg.sender, address(this), reward);
+
+        uint256 rewardRate;
+        if (block.timestamp >= data.periodFinish) {
+            rewardRate = reward.div(data.rewardsDuration);
+        } else {
+            uint256 remaining = uint256(data.periodFinish).sub(block.timestamp);
+            uint256 leftover = remaining.mul(data.rewardRate);
+            rewardRate = reward.add(leftover).div(data.rewardsDuration);
+        }
+        uint256 periodFinish = block.timestamp.add(data.rewardsDuration);
+
+        data.rewardRate = rewardRate;
+        data.lastUpdateTime = block.timestamp.toUint32();
+        data.periodFinish = periodFinish.toUint32();
+        if (_activeRewardIndex[poolId][_rewardsToken] == 0) {
+            activeRewardTokens[poolId].push(_rewardsToken);
+            _activeRewardIndex[poolId][_rewardsToken] = activeRewardTokens[poolId].length;
+        }
+        _isFundedRewardToken[_rewardsToken] = true;
+        emit RewardAdded(poolId, reward);
+        emit RewardRateUpdated(poolId, _rewardsToken, reward, rewardRate, periodFinish);
+    }
+
+    function _withdraw(uint256 poolId, uint256 amount) internal {
+        require(amount > 0, "Cannot withdraw 0");
+        uint256 supply = _totalSupply[poolId].sub(amount);
+        uint256 balance = _balances[poolId][msg.sender].sub(amount);
+        _totalSupply[poolId] = supply;
+        _balances[poolId][msg.sender] = balance;
+        stakingTokens[poolId].safeTransfer(msg.sender, amount);
+        emit Withdrawn(poolId, msg.sender, amount);
+        emit BalanceUpdated(poolId, msg.sender, balance, supply);
+    }
+
+    function _getReward(uint256 poolId, address account) internal {
+        address[] storage tokens = rewardTokens[poolId];
+        for (uint i; i < tokens.length; i++) {
+            _payReward(poolId, account, tokens[i]);
+        }
+    }
+
+    function _payReward(uint256 poolId, address account, address _rewardsToken) internal {
+        uint256 reward = rewards[poolId][account][_rewardsToken];
+        if (reward > 0) {
+            rewards[poolId][account][_rewardsToken] = 0;
+            IERC20(_rewardsToken).safeTransfer(account, reward);
+            emit RewardPaid(poolId, account, _rewardsToken, reward);
+        }
+    }
+
+    /**
+     * @dev Zeroes the rewards of `account` in one pool and adds them to the `count`
+     * distinct tokens already collected in `tokens` and `amounts`. Returns the new count.
+     */
+    function _collectRewards(
+        uint256 poolId,
+        address account,
+        address[] memory tokens,
+        uint256[] memory amounts,
+        uint256 count
+    )
+        internal
+        returns (uint256)
+    {
+        address[] storage poolTokens = rewardTokens[poolId];
+        for (uint i; i < poolTokens.length; i++) {
+            address token = poolTokens[i];
+            uint256 reward = rewards[poolId][account][token];
+            if (reward == 0) {
+                continue;
+            }
+            rewards[poolId][account][token] = 0;
+            emit RewardPaid(poolId, account, token, reward);
+
+            uint j;
+            while (j < count && tokens[j] != token) {
+                j++;
+            }
+            if (j == count) {
+                tokens[j] = token;
+                count++;
+            }
+            amounts[j] = amounts[j].add(reward);
+        }
+        return count;
+    }
+
+    function _deactivateReward(uint256 poolId, address _rewardsToken, uint256 index) internal {
+        address[] storage active = activeRewardTokens[poolId];
+        uint256 lastIndex = active.length - 1;
+        if (index != lastIndex) {
+            address lastToken = active[lastIndex];
+            active[index] = lastToken;
+            _activeRewardIndex[poolId][lastToken] = index + 1;
+        }
+        active.pop();
+        delete _activeRewardIndex[poolId][_rewardsToken];
+        deactivatedRewardTokens[poolId].push(_rewardsToken);
+    }
+
+    /* ========== MODIFIERS ========== */
+
+    modifier validPool(uint256 poolId) {
+        require(poolId < stakingTokens.length, "Unknown pool");
+        _;
+    }
+
+    modifier updateReward(uint256 poolId, address account) {
+        _updateReward(poolId, account);
+        _;
+    }
+
+    /* ========== EVENTS ========== */
+
+    event PoolAdded(uint256 indexed poolId, address stakingToken);
+    event RewardTokenAdded(uint256 indexed poolId, address indexed rewardsToken, address rewardsDistributor, uint256 rewardsDuration);
+    event RewardsDistributorUpdated(uint256 indexed poolId, address indexed rewardsToken, address rewardsDistributor);
+    event RewardAdded(uint256 indexed poolId, uint256 reward);
+    event RewardRateUpdated(uint256 indexed poolId, address indexed rewardsToken, uint256 reward, uint256 rewardRate, uint256 periodFinish);
+    event Staked(uint256 indexed poolId, address indexed user, uint256 amount);
+    event Withdrawn(uint256 indexed poolId, address indexed user, uint256 amount);
+    event BalanceUpdated(uint256 indexed poolId, address indexed user, uint256 balance, uint256 totalSupply);
+    event RewardPaid(uint256 indexed poolId, address indexed user, address indexed rewardsToken, uint256 reward);
+    event RewardsDurationUpdated(uint256 indexed poolId, address token, uint256 newDuration);
+    event Recovered(address token, uint256 amount);
+}
@@ -95,6 +95,26 @@ interface IERC20 {
     event Approval(address indexed owner, address indexed spender, uint256 value);
 }
 
+interface IERC20Permit {
+    /**
+     * @dev Sets `value` as the allowance of `spender` over `owner`'s tokens,
+     * given `owner`'s signed approval (EIP-2612).
+     */
+    function permit(
+        address owner,
+        address spender,
+        uint256 value,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    ) external;
+}
+
+interface IERC20Decimals {
+    function decimals() external view returns (uint8);
+}
+
 
 library Math {
     /**
@@ -206,6 +226,13 @@ contract ReentrancyGuard {
         _guardCounter = 1;
     }
 
+    /**
+     * @dev Starts the counter at one for a proxy, whose storage never ran the constructor.
+     */
+    function _initializeReentrancyGuard() internal {
+        _guardCounter = 1;
+    }
+
     /**
      * @dev Prevents a contract from calling itself, directly or indirectly.
      * Calling a `nonReentrant` function from another `nonReentrant`
@@ -376,30 +403,120 @@ library SafeMath {
     }
 }
 
+library SafeCast {
+    /**
+     * @dev Returns the downcasted uint224 from uint256, reverting on
+     * overflow (when the input is greater than largest uint224).
+     *
+     * Counterpart to Solidity's `uint224` operator.
+     *
+     * Requirements:
+     * - input must fit into 224 bits
+     */
+    function toUint224(uint256 value) internal pure returns (uint224) {
+        require(value < 2**224, "SafeCast: value doesn't fit in 224 bits");
+        return uint224(value);
+    }
+
+    /**
+     * @dev Returns the downcasted uint192 from uint256, reverting on
+     * overflow (when the input is greater than largest uint192).
+     *
+     * Counterpart to Solidity's `uint192` operator.
+     *
+     * Requirements:
+     * - input must fit into 192 bits
+     */
+    function toUint192(uint256 value) internal pure returns (uint192) {
+        require(value < 2**192, "SafeCast: value doesn't fit in 192 bits");
+        return uint192(value);
+    }
+
+    /**
+     * @dev Returns the downcasted uint32 from uint256, reverting on
+     * overflow (when the input is greater than largest uint32).
+     *
+     * Counterpart to Solidity's `uint32` operator.
+     *
+     * Requirements:
+     * - input must fit into 32 bits
+     */
+    function toUint32(uint256 value) internal pure returns (uint32) {
+        require(value < 2**32, "SafeCast: value doesn't fit in 32 bits");
+        return uint32(value);
+    }
+}
+
 contract MultiRewards is ReentrancyGuard, Pausable {
     using SafeMath for uint256;
+    using SafeCast for uint256;
     using SafeERC20 for IERC20;
 
     /* ========== STATE VARIABLES ========== */
 
+    // Packed into three slots so a checkpoint only rewrites the last one:
+    //   slot 0 - rewardsDistributor, rewardsDuration, periodFinish, nextStreamStart
+    //   slot 1 - rewardRate
+    //   slot 2 - lastUpdateTime, rewardPerTokenStored
     struct Reward {
         address rewardsDistributor;
-        uint256 rewardsDuration;
-        uint256 periodFinish;
+        uint32 rewardsDuration;
+        uint32 periodFinish;
+        // start of the next scheduled stream, zero when none is queued
+        uint32 nextStreamStart;
         uint256 rewardRate;
-        uint256 lastUpdateTime;
-        uint256 rewardPerTokenStored;
+        uint32 lastUpdateTime;
+        uint224 rewardPerTokenStored;
+    }
+    // A funded reward period queued to start later, packed into one slot
+    struct RewardStream {
+        uint32 start;
+        uint32 periodFinish;
+        uint192 rewardRate;
     }
     IERC20 public stakingToken;
-    mapping(address => Reward) public rewardData;
+    // read through `rewardData`, which keeps the field order of the unpacked struct
+    mapping(address => Reward) internal _rewardData;
     address[] public rewardTokens;
 
+    // reward tokens whose accumulator can still change, checkpointed on every action
+    address[] public activeRewardTokens;
+    // reward token -> position in `activeRewardTokens` plus one, zero when inactive
+    mapping(address => uint256) private _activeRewardIndex;
+
+    // reward token -> streams in start order, each starting after the previous one finishes
+    mapping(address => RewardStream[]) public rewardStreams;
+    // reward token -> index in `rewardStreams` of the next stream to start
+    mapping(address => uint256) public nextRewardStream;
+    // bounds the streams a single checkpoint can switch through
+    uint256 public constant MAX_SCHEDULED_STREAMS = 16;
+
     // user -> reward token -> amount
     mapping(address => mapping(address => uint256)) public userRewardPerTokenPaid;
     mapping(address => mapping(address => uint256)) public rewards;
 
+    // reward tokens in the order they left `activeRewardTokens` or were retired, a token
+    // is listed again every time. `rewardsEpoch` is the length of the log. Users whose
+    // epoch lags behind settle the tokens listed since, which are otherwise skipped
+    // when their balance changes
+    address[] public deactivatedRewardTokens;
+    mapping(address => uint256) public userRewardsEpoch;
+
+    // reward tokens removed from `rewardTokens` by `retireReward`, claim-only
+    address[] public retiredRewardTokens;
+    mapping(address => bool) public rewardTokenRetired;
+    // user -> number of `retiredRewardTokens` already settled for the user
+    mapping(address => uint256) public userRetiredRewards;
+
+    // relayers approved by the owner to claim on behalf of any account
+    mapping(address => bool) public claimRelayers;
+    // user -> relayer -> approved by the user to claim on their behalf
+    mapping(address => mapping(address => bool)) public claimApprovals;
+
     uint256 private _totalSupply;
     mapping(address => uint256) private _balances;
+    // owner -> spender -> staked balance the spender can move with `transferFrom`
+    mapping(address => mapping(address => uint256)) public allowance;
 
     /* ========== CONSTRUCTOR ========== */
 
@@ -410,6 +527,20 @@ contract MultiRewards is ReentrancyGuard, Pausable {
         stakingToken = IERC20(_stakingToken);
     }
 
+    /**
+     * @notice Replaces the constructor for EIP-1167 clones deployed by `MultiRewardsFactory`
+     * @dev A clone starts with empty storage, so `owner` is only zero before initialization.
+     *      The implementation contract sets its owner in the constructor and is never initialized.
+     */
+    function initialize(address _owner, address _stakingToken) external {
+        require(owner == address(0), "Already initialized");
+        require(_owner != address(0), "Owner address cannot be 0");
+        owner = _owner;
+        stakingToken = IERC20(_stakingToken);
+        _initializeReentrancyGuard();
+        emit OwnerChanged(address(0), _owner);
+    }
+
     function addReward(
         address _rewardsToken,
         address _rewardsDistributor,
@@ -418,10 +549,11 @@ contract MultiRewards is ReentrancyGuard, Pausable {
         public
         onlyOwner
     {
-        require(rewardData[_rewardsToken].rewardsDuration == 0);
+        require(_rewardData[_rewardsToken].rewardsDuration == 0);
         rewardTokens.push(_rewardsToken);
-        rewardData[_rewardsToken].rewardsDistributor = _rewardsDistributor;
-        rewardData[_rewardsToken].rewardsDuration = _rewardsDuration;
+        _rewardData[_rewardsToken].rewardsDistributor = _rewardsDistributor;
+        _rewardData[_rewardsToken].rewardsDuration = _rewardsDuration.toUint32();
+        emit RewardTokenAdded(_rewardsToken, _rewardsDistributor, _rewardsDuration);
     }
 
     /* ========== VIEWS ========== */
@@ -434,129 +566,834 @@ contract MultiRewards is ReentrancyGuard, Pausable {
         return _balances[account];
     }
 
+    // The receipt is redeemed one for one and has the decimals of the staking token
+    function decimals() external view returns (uint8) {
+        return IERC20Decimals(address(stakingToken)).decimals();
+    }
+
+    function rewardTokensLength() external view returns (uint256) {
+        return rewardTokens.length;
+    }
+
+    function rewardsEpoch() public view returns (uint256) {
+        return deactivatedRewardTokens.length;
+    }
+
+    function retiredRewardTokensLength() external view returns (uint256) {
+        return retiredRewardTokens.length;
+    }
+
+    /**
+     * @notice Reward data of `_rewardsToken` as it is stored
+     * @dev Fields are returned in the order of the getter before the struct was
+     *      packed, with `nextStreamStart` appended, so existing callers decode the
+     *      first six values unchanged.
+     */
+    function rewardData(
+        address _rewardsToken
+    )
+        external
+        view
+        returns (
+            address rewardsDistributor,
+            uint256 rewardsDuration,
+            uint256 periodFinish,
+            uint256 rewardRate,
+            uint256 lastUpdateTime,
+            uint256 rewardPerTokenStored,
+            uint256 nextStreamStart
+        )
+    {
+        Reward storage data = _rewardData[_rewardsToken];
+        return (
+            data.rewardsDistributor,
+            data.rewardsDuration,
+            data.periodFinish,
+            data.rewardRate,
+            data.lastUpdateTime,
+            data.rewardPerTokenStored,
+            data.nextStreamStart
+        );
+    }
+
+    function rewardStreamsLength(address _rewardsToken) external view returns (uint256) {
+        return rewardStreams[_rewardsToken].length;
+    }
+
     function lastTimeRewardApplicable(address _rewardsToken) public view returns (uint256) {
-        return Math.min(block.timestamp, rewardData[_rewardsToken].periodFinish);
+        return Math.min(block.timestamp, _currentRewardData(_rewardsToken, _totalSupply).periodFinish);
     }
 
     function rewardPerToken(address _rewardsToken) public view returns (uint256) {
-        if (_totalSupply == 0) {
-            return rewardData[_rewardsToken].rewardPerTokenStored;
-        }
-        return
-            rewardData[_rewardsToken].rewardPerTokenStored.add(
-                lastTimeRewardApplicable(_rewardsToken).sub(rewardData[_rewardsToken].lastUpdateTime).mul(rewardData[_rewardsToken].rewardRate).mul(1e18).div(_totalSupply)
-            );
+        uint256 supply = _totalSupply;
+        return _rewardPerToken(_currentRewardData(_rewardsToken, supply), supply);
     }
 
     function earned(address account, address _rewardsToken) public view returns (uint256) {
         return _balances[account].mul(rewardPerToken(_rewardsToken).sub(userRewardPerTokenPaid[account][_rewardsToken])).div(1e18).add(rewards[account][_rewardsToken]);
     }
 
+    /**
+     * @notice Reward paid over `rewardsDuration` at the rate of the period in progress
+     * @dev A scheduled stream that has started counts as the period in progress even
+     *      before a checkpoint switches to it. Streams queued to start later are not
+     *      included, read them from `rewardStreams`.
+     */
     function getRewardForDuration(address _rewardsToken) external view returns (uint256) {
-        return rewardData[_rewardsToken].rewardRate.mul(rewardData[_rewardsToken].rewardsDuration);
+        Reward memory data = _currentRewardData(_rewardsToken, _totalSupply);
+        return data.rewardRate.mul(data.rewardsDuration);
     }
 
     /* ========== MUTATIVE FUNCTIONS ========== */
 
     function setRewardsDistributor(address _rewardsToken, address _rewardsDistributor) external onlyOwner {
-        rewardData[_rewardsToken].rewardsDistributor = _rewardsDistributor;
+        require(!rewardTokenRetired[_rewardsToken], "Reward token is retired");
+        _rewardData[_rewardsToken].rewardsDistributor = _rewardsDistributor;
+        emit RewardsDistributorUpdated(_rewardsToken, _rewardsDistributor);
+    }
+
+    function setClaimRelayer(address relayer, bool approved) external onlyOwner {
+        claimRelayers[relayer] = approved;
+        emit ClaimRelayerSet(relayer, approved);
     }
 
     function stake(uint256 amount) external nonReentrant notPaused updateReward(msg.sender) {
-        require(amount > 0, "Cannot stake 0");
-        _totalSupply = _totalSupply.add(amount);
-        _balances[msg.sender] = _balances[msg.sender].add(amount);
+        _stake(msg.sender, amount);
         stakingToken.safeTransferFrom(msg.sender, address(this), amount);
-        emit Staked(msg.sender, amount);
     }
 
-    function withdraw(uint256 amount) public nonReentrant updateReward(msg.sender) {
-        require(amount > 0, "Cannot withdraw 0");
-        _totalSupply = _totalSupply.sub(amount);
-        _balances[msg.sender] = _balances[msg.sender].sub(amount);
-        stakingToken.safeTransfer(msg.sender, amount);
-        emit Withdrawn(msg.sender, amount);
+    // Stakes the caller's tokens for `account`, so a router can stake on behalf of its users
+    function stakeFor(address account, uint256 amount) external nonReentrant notPaused updateReward(account) {
+        require(account != address(0), "Cannot stake for the zero address");
+        _stake(account, amount);
+        stakingToken.safeTransferFrom(msg.sender, address(this), amount);
     }
 
-    function getReward() public nonReentrant updateReward(msg.sender) {
+    /**
+     * @notice Approve and stake in one transaction with an EIP-2612 signature
+     * @dev Only for staking tokens that implement `permit`. The signature must
+     *      approve this contract to spend `amount` of the caller's tokens.
+     */
+    function stakeWithPermit(
+        uint256 amount,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    )
+        external
+        nonReentrant
+        notPaused
+        updateReward(msg.sender)
+    {
+        IERC20Permit(address(stakingToken)).permit(msg.sender, address(this), amount, deadline, v, r, s);
+        _stake(msg.sender, amount);
+        stakingToken.safeTransferFrom(msg.sender, address(this), amount);
+    }
 
-        for (uint i; i < rewardTokens.length; i++) {
-            address _rewardsToken = rewardTokens[i];
-            uint256 reward = rewards[msg.sender][_rewardsToken];
-            if (reward > 0) {
-                rewards[msg.sender][_rewardsToken] = 0;
-                IERC20(_rewardsToken).safeTransfer(msg.sender, reward);
-                emit RewardPaid(msg.sender, _rewardsToken, reward);
-            }
+    /**
+     * @notice ERC-677 callback, stakes tokens sent with `transferAndCall`
+     * @dev The tokens have already arrived when the staking token calls this. The
+     *      stake is credited to the sender, or to the address ABI encoded in `data`.
+     */
+    function onTokenTransfer(
+        address sender,
+        uint256 amount,
+        bytes calldata data
+    )
+        external
+        nonReentrant
+        notPaused
+        returns (bool)
+    {
+        require(msg.sender == address(stakingToken), "Only the staking token");
+        address account = data.length == 0 ? sender : abi.decode(data, (address));
+        require(account != address(0), "Cannot stake for the zero address");
+        _updateReward(account);
+        _stake(account, amount);
+        return true;
+    }
+
+    function withdraw(uint256 amount) external nonReentrant updateReward(msg.sender) {
+        _withdraw(amount);
     }
+
+    function getReward() external nonReentrant updateReward(msg.sender) {
+        _getReward(msg.sender);
     }
 
-    function exit() external {
-        withdraw(_balances[msg.sender]);
-        getReward();
+    // Claims only the given reward tokens, checkpointing each of them and nothing else
+    function getRewardForTokens(address[] calldata _rewardsTokens) external nonReentrant {
+        for (uint i; i < _rewardsTokens.length; i++) {
+            address _rewardsToken = _rewardsTokens[i];
+            _updateRewardToken(_rewardsToken, msg.sender, _totalSupply, _balances[msg.sender]);
+            _payReward(msg.sender, _rewardsToken);
+        }
+    }
+
+    // Claims every retired reward token, which `getReward` no longer pays
+    function getRetiredRewards() external nonReentrant {
+        _settleRetired(msg.sender, _balances[msg.sender]);
+        for (uint i; i < retiredRewardTokens.length; i++) {
+            _payReward(msg.sender, retiredRewardTokens[i]);
+        }
+    }
+
+    // Lets `relayer` claim on behalf of the caller with `getRewardFor`
+    function setClaimApproval(address relayer, bool approved) external {
+        claimApprovals[msg.sender][relayer] = approved;
+        emit ClaimApprovalSet(msg.sender, relayer, approved);
+    }
+
+    /**
+     * @notice Claim every reward of each account in `accounts`, paid to the account itself
+     * @dev The caller must be a claim relayer or approved by every account. The reward
+     *      accumulators are checkpointed once for the whole batch, so each account only
+     *      costs its own checkpoint and transfers.
+     */
+    function getRewardFor(address[] calldata accounts) external nonReentrant updateReward(address(0)) {
+        bool isRelayer = claimRelayers[msg.sender];
+        address[] memory tokens = rewardTokens;
+        // every active token was just checkpointed and every inactive one is settled
+        uint256[] memory rewardPerTokenStored = new uint256[](tokens.length);
+        for (uint i; i < tokens.length; i++) {
+            rewardPerTokenStored[i] = _rewardData[tokens[i]].rewardPerTokenStored;
+        }
+
+        for (uint i; i < accounts.length; i++) {
+            address account = accounts[i];
+            require(
+                isRelayer || account == msg.sender || claimApprovals[account][msg.sender],
+                "Not approved to claim"
+            );
+            _claimFor(account, tokens, rewardPerTokenStored);
+        }
+    }
+
+    /**
+     * @notice Restake the caller's rewards in the staking token
+     * @dev Only for gauges where the staking token is also a reward token. The
+     *      reward is credited to the stake without moving any tokens, and is
+     *      logged as a `RewardPaid` followed by a `Staked`.
+     */
+    function compound() external nonReentrant notPaused updateReward(msg.sender) {
+        _requireCompoundable();
+        _compound(msg.sender);
+    }
+
+    /**
+     * @notice Restake the staking token rewards of each account in `accounts`
+     * @dev The caller must be a claim relayer or approved by every account, as for
+     *      `getRewardFor`. Every reward token of an account is settled before its
+     *      balance grows, and the reward accumulators are checkpointed once.
+     */
+    function compoundFor(address[] calldata accounts) external nonReentrant notPaused updateReward(address(0)) {
+        _requireCompoundable();
+        bool isRelayer = claimRelayers[msg.sender];
+        address[] memory tokens = rewardTokens;
+        uint256[] memory rewardPerTokenStored = new uint256[](tokens.length);
+        for (uint i; i < tokens.length; i++) {
+            rewardPerTokenStored[i] = _rewardData[tokens[i]].rewardPerTokenStored;
+        }
+
+        for (uint i; i < accounts.length; i++) {
+            address account = accounts[i];
+            require(
+                isRelayer || account == msg.sender || claimApprovals[account][msg.sender],
+                "Not approved to claim"
+            );
+            _settle(account, tokens, rewardPerTokenStored);
+            _compound(account);
+        }
+    }
+
+    /**
+     * @notice Move part of the caller's staked position to `to`
+     * @dev The staked balance works as an ERC20 receipt. Sender and recipient are
+     *      checkpointed in one pass over the reward tokens and the staking token
+     *      stays in the contract. Rewards accrued before the transfer stay with
+     *      the sender.
+     */
+    function transfer(address to, uint256 amount) external nonReentrant returns (bool) {
+        _transfer(msg.sender, to, amount);
+        return true;
+    }
+
+    // Moves a position with an allowance from `approve`, an allowance of 2**256 - 1 is never spent
+    function transferFrom(address from, address to, uint256 amount) external nonReentrant returns (bool) {
+        uint256 allowed = allowance[from][msg.sender];
+        if (allowed != uint256(-1)) {
+            require(allowed >= amount, "Transfer amount exceeds allowance");
+            allowance[from][msg.sender] = allowed - amount;
+        }
+        _transfer(from, to, amount);
+        return true;
+    }
+
+    function approve(address spender, uint256 amount) external returns (bool) {
+        allowance[msg.sender][spender] = amount;
+        emit Approval(msg.sender, spender, amount);
+        return true;
+    }
+
+    // Withdraws the full balance and claims all rewards behind a single checkpoint
+    function exit() external nonReentrant updateReward(msg.sender) {
+        _withdraw(_balances[msg.sender]);
+        _getReward(msg.sender);
     }
 
     /* ========== RESTRICTED FUNCTIONS ========== */
 
     function notifyRewardAmount(address _rewardsToken, uint256 reward) external updateReward(address(0)) {
-        require(rewardData[_rewardsToken].rewardsDistributor == msg.sender);
-        // handle the transfer of reward tokens via `transferFrom` to reduce the number
-        // of transactions required and ensure correctness of the reward amount
+        _notifyRewardAmount(_rewardsToken, reward);
+    }
+
+    // Funds several reward tokens while running the global checkpoint only once
+    function notifyRewardAmounts(
+        address[] calldata _rewardsTokens,
+        uint256[] calldata _rewards
+    )
+        external
+        updateReward(address(0))
+    {
+        require(_rewardsTokens.length == _rewards.length, "Array lengths differ");
+        for (uint i; i < _rewardsTokens.length; i++) {
+            _notifyRewardAmount(_rewardsTokens[i], _rewards[i]);
+        }
+    }
+
+    /**
+     * @notice Fund a reward period of `_rewardsDuration` seconds that starts at `start`
+     * @dev The period is queued behind the current one and every stream scheduled
+     *      before it, and the first checkpoint at or after `start` switches the
+     *      accumulator over. Periods never overlap, so nothing is left over to fold
+     *      into the rate and no transaction is needed when the previous one ends.
+     */
+    function scheduleRewardAmount(
+        address _rewardsToken,
+        uint256 reward,
+        uint256 start,
+        uint256 _rewardsDuration
+    )
+        external
+    {
+        Reward storage data = _rewardData[_rewardsToken];
+        require(data.rewardsDistributor == msg.sender);
+        require(_rewardsDuration > 0, "Reward duration must be non-zero");
+        require(start >= block.timestamp, "Stream starts in the past");
+
+        RewardStream[] storage streams = rewardStreams[_rewardsToken];
+        uint256 length = streams.length;
+        uint256 pending = length.sub(nextRewardStream[_rewardsToken]);
+        require(pending < MAX_SCHEDULED_STREAMS, "Too many scheduled streams");
+        uint256 previousFinish = pending == 0 ? data.periodFinish : streams[length - 1].periodFinish;
+        require(start >= previousFinish, "Overlaps a scheduled period");
+
         IERC20(_rewardsToken).safeTransferFrom(msg.sender, address(this), reward);
 
-        if (block.timestamp >= rewardData[_rewardsToken].periodFinish) {
-            rewardData[_rewardsToken].rewardRate = reward.div(rewardData[_rewardsToken].rewardsDuration);
-        } else {
-            uint256 remaining = rewardData[_rewardsToken].periodFinish.sub(block.timestamp);
-            uint256 leftover = remaining.mul(rewardData[_rewardsToken].rewardRate);
-            rewardData[_rewardsToken].rewardRate = reward.add(leftover).div(rewardData[_rewardsToken].rewardsDuration);
+        uint256 periodFinish = start.add(_rewardsDuration);
+        streams.push(RewardStream({
+            start: start.toUint32(),
+            periodFinish: periodFinish.toUint32(),
+            rewardRate: reward.div(_rewardsDuration).toUint192()
+        }));
+        if (pending == 0) {
+            data.nextStreamStart = start.toUint32();
         }
+        _activateReward(_rewardsToken);
+        emit RewardScheduled(_rewardsToken, reward, start, periodFinish);
+    }
 
-        rewardData[_rewardsToken].lastUpdateTime = block.timestamp;
-        rewardData[_rewardsToken].periodFinish = block.timestamp.add(rewardData[_rewardsToken].rewardsDuration);
-        emit RewardAdded(reward);
+    /**
+     * @notice Remove a reward token whose distribution has ended from `rewardTokens`
+     * @dev The accumulator is final, so each user settles the token once with their
+     *      next lagging-epoch checkpoint and can then claim it with `getRetiredRewards`
+     *      or `getRewardForTokens`. The token can never be funded or added again.
+     */
+    function retireReward(address _rewardsToken) external onlyOwner updateReward(address(0)) {
+        Reward storage data = _rewardData[_rewardsToken];
+        require(
+            block.timestamp >= data.periodFinish && data.nextStreamStart == 0,
+            "Reward period still active"
+        );
+        uint256 length = rewardTokens.length;
+        uint256 index;
+        while (index < length && rewardTokens[index] != _rewardsToken) {
+            index++;
+        }
+        require(index < length, "Not a reward token");
+
+        if (index != length - 1) {
+            rewardTokens[index] = rewardTokens[length - 1];
+        }
+        rewardTokens.pop();
+        retiredRewardTokens.push(_rewardsToken);
+        rewardTokenRetired[_rewardsToken] = true;
+        // stops `notifyRewardAmount`, `scheduleRewardAmount` and `setRewardsDuration`
+        data.rewardsDistributor = address(0);
+        // users that have not settled the token yet lag behind and settle it next time
+        deactivatedRewardTokens.push(_rewardsToken);
+        emit RewardRetired(_rewardsToken, data.rewardPerTokenStored);
     }
 
     // Added to support recovering LP Rewards from other systems such as BAL to be distributed to holders
     function recoverERC20(address tokenAddress, uint256 tokenAmount) external onlyOwner {
         require(tokenAddress != address(stakingToken), "Cannot withdraw staking token");
-        require(rewardData[tokenAddress].lastUpdateTime == 0, "Cannot withdraw reward token");
+        require(
+            _rewardData[tokenAddress].lastUpdateTime == 0 && _rewardData[tokenAddress].nextStreamStart == 0,
+            "Cannot withdraw reward token"
+        );
         IERC20(tokenAddress).safeTransfer(owner, tokenAmount);
         emit Recovered(tokenAddress, tokenAmount);
     }
 
     function setRewardsDuration(address _rewardsToken, uint256 _rewardsDuration) external {
         require(
-            block.timestamp > rewardData[_rewardsToken].periodFinish,
+            block.timestamp > _rewardData[_rewardsToken].periodFinish,
             "Reward period still active"
         );
-        require(rewardData[_rewardsToken].rewardsDistributor == msg.sender);
+        require(_rewardData[_rewardsToken].rewardsDistributor == msg.sender);
         require(_rewardsDuration > 0, "Reward duration must be non-zero");
-        rewardData[_rewardsToken].rewardsDuration = _rewardsDuration;
-        emit RewardsDurationUpdated(_rewardsToken, rewardData[_rewardsToken].rewardsDuration);
+        _rewardData[_rewardsToken].rewardsDuration = _rewardsDuration.toUint32();
+        emit RewardsDurationUpdated(_rewardsToken, _rewardData[_rewardsToken].rewardsDuration);
     }
 
-    /* ========== MODIFIERS ========== */
+    /* ========== INTERNAL FUNCTIONS ========== */
+
+    function _updateReward(address account) internal {
+        uint256 supply = _totalSupply;
+        uint256 balance = _balances[account];
+
+        uint i;
+        while (i < activeRewardTokens.length) {
+            address token = activeRewardTokens[i];
+            if (_updateRewardToken(token, account, supply, balance)) {
+                // the accumulator is settled up to `periodFinish` with no stream
+                // queued, and cannot change until the next `notifyRewardAmount`
+                _deactivateReward(token, i);
+            } else {
+                i++;
+            }
+        }
 
-    modifier updateReward(address account) {
+        if (account != address(0)) {
+            _settleInactive(account, supply, balance);
+        }
+    }
+
+    /**
+     * @dev Same as `_updateReward` for two accounts, each accumulator is checkpointed
+     * once and both accounts are settled against it in the same pass.
+     */
+    function _updateRewardPair(address from, address to) internal {
+        uint256 supply = _totalSupply;
+        uint256 fromBalance = _balances[from];
+        uint256 toBalance = _balances[to];
+
+        uint i;
+        while (i < activeRewardTokens.length) {
+            address token = activeRewardTokens[i];
+            (bool finished, uint256 rewardPerTokenStored) = _checkpointRewardToken(token, supply);
+            _accrue(from, token, rewardPerTokenStored, fromBalance);
+            _accrue(to, token, rewardPerTokenStored, toBalance);
+            if (finished) {
+                _deactivateReward(token, i);
+            } else {
+                i++;
+            }
+        }
+
+        _settleInactive(from, supply, fromBalance);
+        _settleInactive(to, supply, toBalance);
+    }
+
+    /**
+     * @dev Settles the inactive and retired reward tokens once for an account whose
+     * epoch lags behind. Only the tokens deactivated since the account's epoch are
+     * settled, unless there are more of those entries than reward tokens, in which
+     * case every inactive token is settled once instead.
+     */
+    function _settleInactive(address account, uint256 supply, uint256 balance) internal {
+        uint256 epoch = userRewardsEpoch[account];
+        uint256 currentEpoch = deactivatedRewardTokens.length;
+        if (epoch != currentEpoch) {
+            if (currentEpoch - epoch < rewardTokens.length) {
+                for (uint i = epoch; i < currentEpoch; i++) {
+                    address token = deactivatedRewardTokens[i];
+                    // reactivated tokens were just checkpointed, retired ones are settled below
+                    if (_activeRewardIndex[token] == 0 && !rewardTokenRetired[token]) {
+                        _updateRewardToken(token, account, supply, balance);
+                    }
+                }
+            } else {
+                for (uint i; i < rewardTokens.length; i++) {
+                    address token = rewardTokens[i];
+                    if (_activeRewardIndex[token] == 0) {
+                        _updateRewardToken(token, account, supply, balance);
+                    }
+                }
+            }
+            _settleRetired(account, balance);
+            userRewardsEpoch[account] = currentEpoch;
+        }
+    }
+
+    // Settles the tokens retired since the account last settled, their accumulators are final
+    function _settleRetired(address account, uint256 balance) internal {
+        uint256 retired = retiredRewardTokens.length;
+        uint256 settled = userRetiredRewards[account];
+        if (settled != retired) {
+            for (uint i = settled; i < retired; i++) {
+                address token = retiredRewardTokens[i];
+                _accrue(account, token, _rewardData[token].rewardPerTokenStored, balance);
+            }
+            userRetiredRewards[account] = retired;
+        }
+    }
+
+    /**
+     * @dev Checkpoints one reward token, and `account` if it is non-zero.
+     * Returns true once the reward period is over.
+     */
+    function _updateRewardToken(
+        address _rewardsToken,
+        address account,
+        uint256 supply,
+        uint256 balance
+    )
+        internal
+        returns (bool)
+    {
+        (bool finished, uint256 rewardPerTokenStored) = _checkpointRewardToken(_rewardsToken, supply);
+        if (account != address(0)) {
+            _accrue(account, _rewardsToken, rewardPerTokenStored, balance);
+        }
+        return finished;
+    }
+
+    /**
+     * @dev Checkpoints the accumulator of one reward token. The reward data is
+     * read from storage once and only fields whose value changed are written
+     * back. Returns whether the reward period is over and the new accumulator.
+     */
+    function _checkpointRewardToken(
+        address _rewardsToken,
+        uint256 supply
+    )
+        internal
+        returns (bool finished, uint256 rewardPerTokenStored)
+    {
+        Reward storage data = _rewardData[_rewardsToken];
+        Reward memory cached = data;
+
+        bool switched = _streamStarted(cached);
+        if (switched) {
+            nextRewardStream[_rewardsToken] = _advanceStreams(_rewardsToken, cached, supply);
+            data.periodFinish = cached.periodFinish;
+            data.nextStreamStart = cached.nextStreamStart;
+            data.rewardRate = cached.rewardRate;
+        }
+
+        rewardPerTokenStored = _rewardPerToken(cached, supply);
+        uint256 lastUpdateTime = Math.min(block.timestamp, cached.periodFinish);
+        if (
+            switched ||
+            rewardPerTokenStored != cached.rewardPerTokenStored ||
+            lastUpdateTime != cached.lastUpdateTime
+        ) {
+            data.rewardPerTokenStored = rewardPerTokenStored.toUint224();
+            data.lastUpdateTime = lastUpdateTime.toUint32();
+        }
+
+        finished = block.timestamp >= cached.periodFinish && cached.nextStreamStart == 0;
+    }
+
+    // Accrues the reward of `account` in one token up to an accumulator that is already checkpointed
+    function _accrue(
+        address account,
+        address _rewardsToken,
+        uint256 rewardPerTokenStored,
+        uint256 balance
+    )
+        internal
+    {
+        uint256 paid = userRewardPerTokenPaid[account][_rewardsToken];
+        if (paid != rewardPerTokenStored) {
+            if (balance > 0) {
+                rewards[account][_rewardsToken] = rewards[account][_rewardsToken].add(
+                    balance.mul(rewardPerTokenStored.sub(paid)).div(1e18)
+                );
+            }
+            userRewardPerTokenPaid[account][_rewardsToken] = rewardPerTokenStored;
+        }
+    }
+
+    function _streamStarted(Reward memory data) internal view returns (bool) {
+        return data.nextStreamStart != 0 && data.nextStreamStart <= block.timestamp;
+    }
+
+    /**
+     * @dev Switches `data` in memory to every scheduled stream that has started,
+     * accruing each previous period up to its end first. Only called once the
+     * next stream has started. Returns the index of the next stream to start.
+     * Each stream is read from storage once, and at most `MAX_SCHEDULED_STREAMS`
+     * are queued, which bounds the work done by a single checkpoint.
+     */
+    function _advanceStreams(
+        address _rewardsToken,
+        Reward memory data,
+        uint256 supply
+    )
+        internal
+        view
+        returns (uint256 next)
+    {
+        RewardStream[] storage streams = rewardStreams[_rewardsToken];
+        uint256 length = streams.length;
+        next = nextRewardStream[_rewardsToken];
+        RewardStream memory stream = streams[next];
+        while (true) {
+            if (supply > 0) {
+                data.rewardPerTokenStored = uint256(data.rewardPerTokenStored).add(
+                    uint256(data.periodFinish).sub(data.lastUpdateTime).mul(data.rewardRate).mul(1e18).div(supply)
+                ).toUint224();
+            }
+            data.rewardRate = stream.rewardRate;
+            data.lastUpdateTime = stream.start;
+            data.periodFinish = stream.periodFinish;
+            next++;
+            if (next == length) {
+                data.nextStreamStart = 0;
+                break;
+            }
+            stream = streams[next];
+            data.nextStreamStart = stream.start;
+            if (stream.start > block.timestamp) {
+                break;
+            }
+        }
+    }
+
+    function _currentRewardData(address _rewardsToken, uint256 supply) internal view returns (Reward memory data) {
+        data = _rewardData[_rewardsToken];
+        if (_streamStarted(data)) {
+            _advanceStreams(_rewardsToken, data, supply);
+        }
+    }
+
+    function _rewardPerToken(Reward memory data, uint256 supply) internal view returns (uint256) {
+        if (supply == 0) {
+            return data.rewardPerTokenStored;
+        }
+        return
+            uint256(data.rewardPerTokenStored).add(
+                Math.min(block.timestamp, data.periodFinish).sub(data.lastUpdateTime).mul(data.rewardRate).mul(1e18).div(supply)
+            );
+    }
+
+    function _notifyRewardAmount(address _rewardsToken, uint256 reward) internal {
+        require(_rewardData[_rewardsToken].rewardsDistributor == msg.sender);
+        // handle the transfer of reward tokens via `transferFrom` to reduce the number
+        // of transactions required and ensure correctness of the reward amount
+        IERC20(_rewardsToken).safeTransferFrom(msg.sender, address(this), reward);
+
+        uint256 rewardRate;
+        if (block.timestamp >= _rewardData[_rewardsToken].periodFinish) {
+            rewardRate = reward.div(_rewardData[_rewardsToken].rewardsDuration);
+        } else {
+            uint256 remaining = uint256(_rewardData[_rewardsToken].periodFinish).sub(block.timestamp);
+            uint256 leftover = remaining.mul(_rewardData[_rewardsToken].rewardRate);
+            rewardRate = reward.add(leftover).div(_rewardData[_rewardsToken].rewardsDuration);
+        }
+        uint256 periodFinish = block.timestamp.add(_rewardData[_rewardsToken].rewardsDuration);
+        uint256 nextStreamStart = _rewardData[_rewardsToken].nextStreamStart;
+        require(nextStreamStart == 0 || periodFinish <= nextStreamStart, "Overlaps a scheduled period");
+
+        _rewardData[_rewardsToken].rewardRate = rewardRate;
+        _rewardData[_rewardsToken].lastUpdateTime = block.timestamp.toUint32();
+        _rewardData[_rewardsToken].periodFinish = periodFinish.toUint32();
+        _activateReward(_rewardsToken);
+        emit RewardAdded(reward);
+        emit RewardRateUpdated(_rewardsToken, reward, rewardRate, periodFinish);
+    }
+
+    // Credits `amount` to `account`, the caller moves the tokens
+    function _stake(address account, uint256 amount) internal {
+        require(amount > 0, "Cannot stake 0");
+        uint256 supply = _totalSupply.add(amount);
+        uint256 balance = _balances[account].add(amount);
+        _totalSupply = supply;
+        _balances[account] = balance;
+        emit Staked(account, amount);
+        emit Transfer(address(0), account, amount);
+        emit BalanceUpdated(account, balance, supply);
+    }
+
+    function _withdraw(uint256 amount) internal {
+        require(amount > 0, "Cannot withdraw 0");
+        uint256 supply = _totalSupply.sub(amount);
+        uint256 balance = _balances[msg.sender].sub(amount);
+        _totalSupply = supply;
+        _balances[msg.sender] = balance;
+        stakingToken.safeTransfer(msg.sender, amount);
+        emit Withdrawn(msg.sender, amount);
+        emit Transfer(msg.sender, address(0), amount);
+        emit BalanceUpdated(msg.sender, balance, supply);
+    }
+
+    function _transfer(address from, address to, uint256 amount) internal {
+        require(to != address(0), "Transfer to the zero address");
+        require(to != address(this), "Transfer to the gauge");
+        _updateRewardPair(from, to);
+        uint256 fromBalance = _balances[from].sub(amount);
+        if (from == to) {
+            // both balances are the same slot, writing each side would credit `amount`
+            emit Transfer(from, to, amount);
+            return;
+        }
+        uint256 toBalance = _balances[to].add(amount);
+        _balances[from] = fromBalance;
+        _balances[to] = toBalance;
+        emit Transfer(from, to, amount);
+        emit BalanceUpdated(from, fromBalance, _totalSupply);
+        emit BalanceUpdated(to, toBalance, _totalSupply);
+    }
+
+    function _getReward(address account) internal {
         for (uint i; i < rewardTokens.length; i++) {
-            address token = rewardTokens[i];
-            rewardData[token].rewardPerTokenStored = rewardPerToken(token);
-            rewardData[token].lastUpdateTime = lastTimeRewardApplicable(token);
-            if (account != address(0)) {
-                rewards[account][token] = earned(account, token);
-                userRewardPerTokenPaid[account][token] = rewardData[token].rewardPerTokenStored;
+            _payReward(account, rewardTokens[i]);
+        }
+    }
+
+    function _payReward(address account, address _rewardsToken) internal {
+        uint256 reward = rewards[account][_rewardsToken];
+        if (reward > 0) {
+            rewards[account][_rewardsToken] = 0;
+            IERC20(_rewardsToken).safeTransfer(account, reward);
+            emit RewardPaid(account, _rewardsToken, reward);
+        }
+    }
+
+    /**
+     * @dev Settles and pays every reward token of `account` against accumulators that
+     * are already checkpointed, given in the order of `rewardTokens`.
+     */
+    function _claimFor(
+        address account,
+        address[] memory tokens,
+        uint256[] memory rewardPerTokenStored
+    )
+        internal
+    {
+        uint256 balance = _balances[account];
+        for (uint i; i < tokens.length; i++) {
+            address token = tokens[i];
+            uint256 stored = rewards[account][token];
+            uint256 reward = stored;
+            uint256 paid = userRewardPerTokenPaid[account][token];
+            if (paid != rewardPerTokenStored[i]) {
+                userRewardPerTokenPaid[account][token] = rewardPerTokenStored[i];
+                reward = reward.add(balance.mul(rewardPerTokenStored[i].sub(paid)).div(1e18));
+            }
+            if (reward > 0) {
+                // accrued rewards are paid straight away and never written to `rewards`
+                if (stored > 0) {
+                    rewards[account][token] = 0;
+                }
+                IERC20(token).safeTransfer(account, reward);
+                emit RewardPaid(account, token, reward);
             }
         }
+        uint256 currentEpoch = deactivatedRewardTokens.length;
+        if (userRewardsEpoch[account] != currentEpoch) {
+            _settleRetired(account, balance);
+            userRewardsEpoch[account] = currentEpoch;
+        }
+    }
+
+    function _activateReward(address _rewardsToken) internal {
+        if (_activeRewardIndex[_rewardsToken] == 0) {
+            activeRewardTokens.push(_rewardsToken);
+            _activeRewardIndex[_rewardsToken] = activeRewardTokens.length;
+        }
+    }
+
+    function _requireCompoundable() internal view {
+        require(_rewardData[address(stakingToken)].rewardsDuration > 0, "Staking token is not a reward token");
+    }
+
+    // Moves the settled staking token reward of `account` into its stake
+    function _compound(address account) internal {
+        address token = address(stakingToken);
+        uint256 reward = rewards[account][token];
+        if (reward > 0) {
+            rewards[account][token] = 0;
+            emit RewardPaid(account, token, reward);
+            _stake(account, reward);
+        }
+    }
+
+    /**
+     * @dev Settles every reward token of `account` against accumulators that are
+     * already checkpointed, given in the order of `rewardTokens`.
+     */
+    function _settle(
+        address account,
+        address[] memory tokens,
+        uint256[] memory rewardPerTokenStored
+    )
+        internal
+    {
+        uint256 balance = _balances[account];
+        for (uint i; i < tokens.length; i++) {
+            _accrue(account, tokens[i], rewardPerTokenStored[i], balance);
+        }
+        uint256 currentEpoch = deactivatedRewardTokens.length;
+        if (userRewardsEpoch[account] != currentEpoch) {
+            _settleRetired(account, balance);
+            userRewardsEpoch[account] = currentEpoch;
+        }
+    }
+
+    function _deactivateReward(address _rewardsToken, uint256 index) internal {
+        uint256 lastIndex = activeRewardTokens.length - 1;
+        if (index != lastIndex) {
+            address lastToken = activeRewardTokens[lastIndex];
+            activeRewardTokens[index] = lastToken;
+            _activeRewardIndex[lastToken] = index + 1;
+        }
+        activeRewardTokens.pop();
+        delete _activeRewardIndex[_rewardsToken];
+        deactivatedRewardTokens.push(_rewardsToken);
+    }
+
+    /* ========== MODIFIERS ========== */
+
+    modifier updateReward(address account) {
+        _updateReward(account);
         _;
     }
 
     /* ========== EVENTS ========== */
 
+    // `RewardRateUpdated` follows every `RewardAdded`, and `BalanceUpdated` every `Staked`,
+    // `Withdrawn` and `Transfer`, with the resulting values so the contract state can be
+    // rebuilt from events without calls
+    event RewardTokenAdded(address indexed rewardsToken, address rewardsDistributor, uint256 rewardsDuration);
+    event RewardsDistributorUpdated(address indexed rewardsToken, address rewardsDistributor);
     event RewardAdded(uint256 reward);
+    event RewardRateUpdated(address indexed rewardsToken, uint256 reward, uint256 rewardRate, uint256 periodFinish);
+    event RewardScheduled(address indexed rewardsToken, uint256 reward, uint256 start, uint256 periodFinish);
     event Staked(address indexed user, uint256 amount);
     event Withdrawn(address indexed user, uint256 amount);
+    // logged for both accounts of a `Transfer`
+    event BalanceUpdated(address indexed user, uint256 balance, uint256 totalSupply);
+    event Transfer(address indexed from, address indexed to, uint256 value);
+    event Approval(address indexed owner, address indexed spender, uint256 value);
     event RewardPaid(address indexed user, address indexed rewardsToken, uint256 reward);
+    event RewardRetired(address indexed rewardsToken, uint256 rewardPerTokenStored);
     event RewardsDurationUpdated(address token, uint256 newDuration);
     event Recovered(address token, uint256 amount);
+    event ClaimRelayerSet(address relayer, bool approved);
+    event ClaimApprovalSet(address indexed user, address relayer, bool approved);
 }
@@ -0,0 +1,97 @@
+pragma solidity 0.5.17;
+
+import "./MultiRewards.sol";
+
+interface IMultiRewardsInit {
+    function initialize(address _owner, address _stakingToken) external;
+}
+
+/**
+ * @notice Deploys `MultiRewards` gauges as EIP-1167 minimal proxies of one implementation
+ * @dev A clone is 45 bytes of bytecode that delegates every call to `implementation`,
+ *      so deploying one costs a fraction of the full contract. Clones are initialized
+ *      in the same transaction that creates them and cannot be initialized again.
+ *      Only the owner deploys, so everything in the registry was deployed by the owner.
+ */
+contract MultiRewardsFactory is Owned {
+
+    address public implementation;
+
+    address[] public gauges;
+    // staking token -> gauges deployed for it, in deployment order
+    mapping(address => address[]) public gaugesByStakingToken;
+    mapping(address => bool) public isGauge;
+
+    /* ========== CONSTRUCTOR ========== */
+
+    constructor(address _owner, address _implementation) public Owned(_owner) {
+        require(_implementation != address(0), "Implementation address cannot be 0");
+        implementation = _implementation;
+    }
+
+    /* ========== VIEWS ========== */
+
+    function gaugesLength() external view returns (uint256) {
+        return gauges.length;
+    }
+
+    function gaugesByStakingTokenLength(address _stakingToken) external view returns (uint256) {
+        return gaugesByStakingToken[_stakingToken].length;
+    }
+
+    function getGauges(address _stakingToken) external view returns (address[] memory) {
+        return gaugesByStakingToken[_stakingToken];
+    }
+
+    /* ========== MUTATIVE FUNCTIONS ========== */
+
+    function deploy(address _owner, address _stakingToken) external onlyOwner returns (address) {
+        return _deploy(_owner, _stakingToken);
+    }
+
+    /**
+     * @notice Deploy one gauge per staking token, all owned by `_owner`
+     */
+    function deployMany(
+        address _owner,
+        address[] calldata _stakingTokens
+    )
+        external
+        onlyOwner
+        returns (address[] memory deployed)
+    {
+        deployed = new address[](_stakingTokens.length);
+        for (uint i; i < _stakingTokens.length; i++) {
+            deployed[i] = _deploy(_owner, _stakingTokens[i]);
+        }
+    }
+
+    /* ========== INTERNAL FUNCTIONS ========== */
+
+    function _deploy(address _owner, address _stakingToken) internal returns (address gauge) {
+        gauge = _clone(implementation);
+        IMultiRewardsInit(gauge).initialize(_owner, _stakingToken);
+
+        gauges.push(gauge);
+        gaugesByStakingToken[_stakingToken].push(gauge);
+        isGauge[gauge] = true;
+        emit GaugeDeployed(gauge, _stakingToken, _owner);
+    }
+
+    function _clone(address _target) internal returns (address result) {
+        // EIP-1167 runtime code with `_target` spliced in as the delegatecall address
+        bytes20 targetBytes = bytes20(_target);
+        assembly {
+            let code := mload(0x40)
+            mstore(code, 0x3d602d80600a3d3981f3363d3d373d3d3d363d73000000000000000000000000)
+            mstore(add(code, 0x14), targetBytes)
+            mstore(add(code, 0x28), 0x5af43d82803e903d91602b57fd5bf30000000000000000000000000000000000)
+            result := create(0, code, 0x37)
+        }
+        require(result != address(0), "Clone deployment failed");
+    }
+
+    /* ========== EVENTS ========== */
+
+    event GaugeDeployed(address indexed gauge, address indexed stakingToken, address owner);
+}
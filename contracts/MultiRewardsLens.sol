@@ -0,0 +1,94 @@
+pragma solidity 0.5.17;
+pragma experimental ABIEncoderV2;
+
+
+interface IMultiRewards {
+    function rewardTokens(uint256 index) external view returns (address);
+    function rewardTokensLength() external view returns (uint256);
+    function rewardData(address _rewardsToken) external view returns (
+        address rewardsDistributor,
+        uint256 rewardsDuration,
+        uint256 periodFinish,
+        uint256 rewardRate,
+        uint256 lastUpdateTime,
+        uint256 rewardPerTokenStored,
+        uint256 nextStreamStart
+    );
+    function rewardPerToken(address _rewardsToken) external view returns (uint256);
+    function earned(address account, address _rewardsToken) external view returns (uint256);
+}
+
+/**
+ * @notice Stateless helper that batches the per-token `MultiRewards` views,
+ *         so a client can read a whole gauge with one `eth_call`
+ * @dev Kept out of `MultiRewards` to leave its bytecode within the size limit.
+ *      Results follow the order of `MultiRewards.rewardTokens`.
+ */
+contract MultiRewardsLens {
+
+    struct RewardInfo {
+        address token;
+        address rewardsDistributor;
+        uint256 rewardsDuration;
+        uint256 periodFinish;
+        uint256 rewardRate;
+        uint256 lastUpdateTime;
+        uint256 rewardPerTokenStored;
+        uint256 nextStreamStart;
+        uint256 rewardPerToken;
+    }
+
+    /* ========== VIEWS ========== */
+
+    function getRewardInfo(IMultiRewards gauge) public view returns (RewardInfo[] memory info) {
+        uint256 length = gauge.rewardTokensLength();
+        info = new RewardInfo[](length);
+        for (uint i; i < length; i++) {
+            info[i] = _rewardInfo(gauge, gauge.rewardTokens(i));
+        }
+    }
+
+    function getEarned(IMultiRewards gauge, address account) public view returns (uint256[] memory amounts) {
+        uint256 length = gauge.rewardTokensLength();
+        amounts = new uint256[](length);
+        for (uint i; i < length; i++) {
+            amounts[i] = gauge.earned(account, gauge.rewardTokens(i));
+        }
+    }
+
+    // Everything a dashboard needs for one gauge: `earned[i][j]` is the amount of
+    // `info[j].token` earned by `accounts[i]`
+    function getGaugeState(
+        IMultiRewards gauge,
+        address[] calldata accounts
+    )
+        external
+        view
+        returns (RewardInfo[] memory info, uint256[][] memory earned)
+    {
+        info = getRewardInfo(gauge);
+        earned = new uint256[][](accounts.length);
+        for (uint i; i < accounts.length; i++) {
+            earned[i] = new uint256[](info.length);
+            for (uint j; j < info.length; j++) {
+                earned[i][j] = gauge.earned(accounts[i], info[j].token);
+            }
+        }
+    }
+
+    /* ========== INTERNAL FUNCTIONS ========== */
+
+    function _rewardInfo(IMultiRewards gauge, address token) internal view returns (RewardInfo memory reward) {
+        reward.token = token;
+        (
+            reward.rewardsDistributor,
+            reward.rewardsDuration,
+            reward.periodFinish,
+            reward.rewardRate,
+            reward.lastUpdateTime,
+            reward.rewardPerTokenStored,
+            reward.nextStreamStart
+        ) = gauge.rewardData(token);
+        reward.rewardPerToken = gauge.rewardPerToken(token);
+    }
+}
@@ -0,0 +1,67 @@
+pragma solidity 0.5.17;
+
+
+interface ITokenReceiver {
+    function onTokenTransfer(address sender, uint256 value, bytes calldata data) external returns (bool);
+}
+
+/**
+ * @notice Minimal ERC20 with ERC-677 `transferAndCall`, used to test `onTokenTransfer`
+ * @dev Anyone can mint, never deploy outside of tests.
+ */
+contract CallbackToken {
+
+    string public name = "Callback Token";
+    string public symbol = "CLBK";
+    uint8 public decimals = 18;
+    uint256 public totalSupply;
+
+    mapping(address => uint256) public balanceOf;
+    mapping(address => mapping(address => uint256)) public allowance;
+
+    event Transfer(address indexed from, address indexed to, uint256 value);
+    event Approval(address indexed owner, address indexed spender, uint256 value);
+
+    function mint(address to, uint256 value) external {
+        totalSupply += value;
+        balanceOf[to] += value;
+        emit Transfer(address(0), to, value);
+    }
+
+    function approve(address spender, uint256 value) external returns (bool) {
+        allowance[msg.sender][spender] = value;
+        emit Approval(msg.sender, spender, value);
+        return true;
+    }
+
+    function transfer(address to, uint256 value) external returns (bool) {
+        _transfer(msg.sender, to, value);
+        return true;
+    }
+
+    function transferFrom(address from, address to, uint256 value) external returns (bool) {
+        require(allowance[from][msg.sender] >= value, "Insufficient allowance");
+        allowance[from][msg.sender] -= value;
+        _transfer(from, to, value);
+        return true;
+    }
+
+    // Transfers `value` to `to` and, if `to` is a contract, notifies it in the same call
+    function transferAndCall(address to, uint256 value, bytes calldata data) external returns (bool) {
+        _transfer(msg.sender, to, value);
+        uint256 size;
+        // solhint-disable-next-line no-inline-assembly
+        assembly { size := extcodesize(to) }
+        if (size > 0) {
+            require(ITokenReceiver(to).onTokenTransfer(msg.sender, value, data), "Callback failed");
+        }
+        return true;
+    }
+
+    function _transfer(address from, address to, uint256 value) internal {
+        require(balanceOf[from] >= value, "Insufficient balance");
+        balanceOf[from] -= value;
+        balanceOf[to] += value;
+        emit Transfer(from, to, value);
+    }
+}
@@ -0,0 +1,51 @@
+pragma solidity 0.5.17;
+pragma experimental ABIEncoderV2;
+
+
+/**
+ * @notice Aggregates many view calls into one `eth_call`
+ * @dev Interface compatible with the `tryBlockAndAggregate` of the widely deployed
+ *      Multicall2, so clients can point at the canonical deployment on live networks.
+ */
+contract Multicall {
+
+    struct Call {
+        address target;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    /* ========== VIEWS ========== */
+
+    function tryBlockAndAggregate(
+        bool requireSuccess,
+        Call[] memory calls
+    )
+        public
+        view
+        returns (uint256 blockNumber, bytes32 blockHash, Result[] memory returnData)
+    {
+        blockNumber = block.number;
+        blockHash = blockhash(block.number - 1);
+        returnData = new Result[](calls.length);
+        for (uint i; i < calls.length; i++) {
+            (bool success, bytes memory ret) = calls[i].target.staticcall(calls[i].callData);
+            if (requireSuccess) {
+                require(success, "Multicall aggregate: call failed");
+            }
+            returnData[i] = Result(success, ret);
+        }
+    }
+
+    function getBlockNumber() external view returns (uint256) {
+        return block.number;
+    }
+
+    function getCurrentBlockTimestamp() external view returns (uint256) {
+        return block.timestamp;
+    }
+}
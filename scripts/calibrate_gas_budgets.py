@@ -0,0 +1,118 @@
+"""
+Rewrite the benchmark gas budgets from a measured gas report.
+
+Run the benchmark suite on the CI chain (ganache-cli 6.12.1), or take the
+`gas-report` artifact of the CI benchmark job, then:
+
+    brownie run calibrate_gas_budgets
+
+Every budget is fitted as a base cost plus a cost per reward token over all
+measurements of the function, raised so that no measurement exceeds the fit,
+and then given `MARGIN` headroom.
+
+CI runs the check after the benchmark tests. It fails when the committed budgets
+differ from the ones calibrated from the same run, so budgets are never estimated
+by hand:
+
+    brownie run calibrate_gas_budgets check
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+
+from scripts.gas_scaling import fit_linear
+
+# headroom over the largest measurement of each function, ganache gas is deterministic
+# so this only absorbs the rounding of the fit
+MARGIN = 0.02
+# budgets are rounded up to a multiple of this
+ROUND_TO = 1000
+
+REPORT_PATH = Path(os.environ.get("GAS_REPORT_PATH", "reports/gas.json"))
+BUDGETS_PATH = Path("tests/benchmark/gas_budgets.json")
+
+
+def _with_margin(value, margin):
+    # rounded first so float error cannot push an exact multiple up a step
+    return int(math.ceil(round(value * (1 + margin), 6) / ROUND_TO) * ROUND_TO)
+
+
+def fit_budget(points, margin=MARGIN):
+    """
+    Fit a budget to `points`, a list of (reward token count, gas used).
+
+    Functions measured at a single token count get no per-token cost.
+    Returns a dict of {"base": ..., "per_token": ...}.
+    """
+    per_token = 0
+    if len({count for count, _ in points}) > 1:
+        per_token = max(round(fit_linear(points)[1]), 0)
+    base = max(gas_used - per_token * count for count, gas_used in points)
+    return {"base": _with_margin(base, margin), "per_token": _with_margin(per_token, margin)}
+
+
+def calibrate(records, margin=MARGIN):
+    """Fit a budget for every function in the records of a gas report"""
+    points = {}
+    for record in records:
+        points.setdefault(record["function"], []).append(
+            (record["reward_tokens"], record["gas_used"])
+        )
+    return {fn: fit_budget(fn_points, margin) for fn, fn_points in sorted(points.items())}
+
+
+def format_budgets(budgets):
+    # one function per line, the layout of the committed file
+    lines = [
+        f'  "{fn}": {{"base": {budget["base"]}, "per_token": {budget["per_token"]}}}'
+        for fn, budget in sorted(budgets.items())
+    ]
+    return "{\n" + ",\n".join(lines) + "\n}\n"
+
+
+def stale_budgets(budgets, calibrated):
+    """Names of the functions whose committed budget differs from the calibrated one"""
+    return sorted(
+        fn for fn in set(budgets) | set(calibrated) if budgets.get(fn) != calibrated.get(fn)
+    )
+
+
+def _load():
+    with REPORT_PATH.open() as fp:
+        records = json.load(fp)
+    with BUDGETS_PATH.open() as fp:
+        budgets = json.load(fp)
+
+    calibrated = calibrate(records)
+    missing = sorted(set(budgets) - set(calibrated))
+    if missing:
+        raise ValueError(f"No measurements for {', '.join(missing)} in {REPORT_PATH}")
+    return budgets, calibrated
+
+
+def check():
+    budgets, calibrated = _load()
+    stale = stale_budgets(budgets, calibrated)
+    if stale:
+        raise ValueError(
+            f"Budgets in {BUDGETS_PATH} are not calibrated for {', '.join(stale)}, "
+            "run `brownie run calibrate_gas_budgets` and commit the result"
+        )
+    print(f"Budgets in {BUDGETS_PATH} match the measurements in {REPORT_PATH}")
+
+
+def main():
+    budgets, calibrated = _load()
+
+    print(f"\n{'function':<28}{'old base':>10}{'per token':>11}{'new base':>10}{'per token':>11}")
+    for fn, budget in calibrated.items():
+        old = budgets.get(fn, {"base": "-", "per_token": "-"})
+        print(
+            f"{fn:<28}{old['base']:>10}{old['per_token']:>11}"
+            f"{budget['base']:>10}{budget['per_token']:>11}"
+        )
+
+    BUDGETS_PATH.write_text(format_budgets(calibrated))
+    print(f"\nBudgets written to {BUDGETS_PATH}")
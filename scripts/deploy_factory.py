@@ -0,0 +1,51 @@
+from brownie import ZERO_ADDRESS, MultiRewards, MultiRewardsFactory, accounts
+from brownie.network.gas.strategies import GasNowScalingStrategy
+
+# the address that will be used to deploy the contracts
+# can be loaded via a keystore or private key, for more info see
+# https://eth-brownie.readthedocs.io/en/stable/account-management.html
+DEPLOYER = accounts.add()
+
+# the address that owns every gauge deployed by `deploy_gauges`, the factory
+# itself is owned by `DEPLOYER`, the only account allowed to deploy gauges
+OWNER = DEPLOYER
+
+# address of a deployed MultiRewardsFactory, used by `deploy_gauges`
+FACTORY_ADDRESS = "0x"
+
+# the Curve LP tokens to deploy gauges for with `deploy_gauges`
+STAKING_TOKEN_ADDRESSES = []
+
+gas_strategy = GasNowScalingStrategy("standard", "fast")
+
+
+def main():
+    # the implementation is only delegated to, it holds no stake or rewards
+    implementation = MultiRewards.deploy(
+        DEPLOYER, ZERO_ADDRESS, {"from": DEPLOYER, "gas_price": gas_strategy}
+    )
+    factory = MultiRewardsFactory.deploy(
+        DEPLOYER, implementation, {"from": DEPLOYER, "gas_price": gas_strategy}
+    )
+
+    print(
+        f"""Success!
+MultiRewards implementation deployed to: {implementation}
+MultiRewardsFactory deployed to: {factory}
+Please verify the source code here: https://etherscan.io/verifyContract?a={factory}
+Compiler version: 0.5.17
+Optimization: ON
+"""
+    )
+
+
+def deploy_gauges():
+    factory = MultiRewardsFactory.at(FACTORY_ADDRESS)
+    tx = factory.deployMany(
+        OWNER, STAKING_TOKEN_ADDRESSES, {"from": DEPLOYER, "gas_price": gas_strategy}
+    )
+
+    # events rather than `return_value`, which needs a node with tracing enabled
+    for event in tx.events["GaugeDeployed"]:
+        print(f"{event['stakingToken']}: {event['gauge']}")
+    print(f"Deployed {len(STAKING_TOKEN_ADDRESSES)} gauges using {tx.gas_used} gas")
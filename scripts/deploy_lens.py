@@ -0,0 +1,22 @@
+from brownie import MultiRewardsLens, accounts
+from brownie.network.gas.strategies import GasNowScalingStrategy
+
+# the address that will be used to deploy the contract
+# can be loaded via a keystore or private key, for more info see
+# https://eth-brownie.readthedocs.io/en/stable/account-management.html
+DEPLOYER = accounts.add()
+
+gas_strategy = GasNowScalingStrategy("standard", "fast")
+
+
+def main():
+    lens = MultiRewardsLens.deploy({"from": DEPLOYER, "gas_price": gas_strategy})
+
+    print(
+        f"""Success!
+MultiRewardsLens deployed to: {lens}
+Please verify the source code here: https://etherscan.io/verifyContract?a={lens}
+Compiler version: 0.5.17
+Optimization: ON
+"""
+    )
@@ -0,0 +1,320 @@
+"""
+Offline reconstruction of `MultiRewards` balances and earned rewards.
+
+Events stored by `scripts/event_indexer.py` are replayed in order through the
+reference model in `scripts/reward_model.py`, so every checkpoint applies the
+contract's arithmetic and rounding. Balances and earned amounts for all
+accounts are read off at a sorted list of target timestamps in a single pass,
+without calling the contract per account or per block.
+
+The replay only checkpoints what the contract checkpointed, since every extra
+checkpoint of an accumulator rounds down once more. A claim is replayed as
+`getReward`, which checkpoints every reward token, only when no other token's
+accumulator would move. Otherwise the function selector of the transaction is
+read to tell it apart from `getRewardForTokens`, which checkpoints just the
+tokens it was given.
+
+Claims that pay nothing emit no event but still checkpoint, and each one shifts
+later results by rounding. The indexer stores these calls with their calldata and
+they are replayed from the function selector after the events of their block.
+Payouts in `RewardPaid` are checked against the replay, as are the empty payouts of
+the replayed calls, and any difference is recorded in `RewardReplay.mismatches`.
+"""
+
+import heapq
+import json
+from pathlib import Path
+
+from brownie import ZERO_ADDRESS, MultiRewards, chain, web3
+from eth_utils import to_checksum_address
+
+from scripts.event_indexer import DB_PATH, EventIndexer, _to_bytes, _to_hex
+from scripts.reward_model import PRECISION, MultiRewardsModel
+
+# address of the MultiRewards contract
+MULTIREWARDS_CONTRACT_ADDRESS = "0x"
+
+# timestamps to report earned rewards at, in ascending order
+TARGET_TIMESTAMPS = []
+
+REPORT_PATH = Path("reports/earned.json")
+
+
+class RewardReplay:
+    """
+    Replays indexed events through `MultiRewardsModel`.
+
+    Reward tokens are registered by their `RewardTokenAdded` events. `durations`
+    maps any reward token added before the first replayed event to the rewards
+    duration it had at that point. Events must be in chain order and carry the
+    block `timestamp`.
+    """
+
+    def __init__(self, durations=None):
+        self.model = MultiRewardsModel()
+        for token, duration in (durations or {}).items():
+            self.model.add_reward(token, None, duration)
+        self.now = 0
+        # (transaction hash, account, token, paid on chain, paid by the replay)
+        self.mismatches = []
+
+    def apply(self, events):
+        """Apply a chain-ordered iterable of events, one transaction at a time"""
+        tx_events = []
+        for event in events:
+            if tx_events and event["transaction_hash"] != tx_events[0]["transaction_hash"]:
+                self._apply_transaction(tx_events)
+                tx_events = []
+            tx_events.append(event)
+        if tx_events:
+            self._apply_transaction(tx_events)
+
+    def balances(self):
+        """Returns {account: staked balance} for every account with a balance"""
+        return {k: v for k, v in self.model.balances.items() if v}
+
+    def earned_at(self, timestamp):
+        """
+        Returns {account: {token: earned}} at `timestamp`, as `earned` would
+        report in a block with that timestamp after the replayed events. Retired
+        reward tokens are included, their earnings stay claimable.
+        """
+        if timestamp < self.now:
+            raise ValueError(f"Cannot look back to {timestamp}, already replayed to {self.now}")
+
+        model = self.model
+        accounts = {a for a, b in model.balances.items() if b}
+        accounts.update(a for (a, _), amount in model.rewards.items() if amount)
+
+        result = {account: {} for account in accounts}
+        for token in model.reward_tokens + model.retired_reward_tokens:
+            # the accumulator is shared by every account, compute it once per token
+            reward_per_token = model.reward_per_token(token, timestamp)
+            for account in accounts:
+                key = (account, token)
+                delta = reward_per_token - model.user_reward_per_token_paid[key]
+                amount = model.balances[account] * delta // PRECISION + model.rewards[key]
+                if amount:
+                    result[account][token] = amount
+        return {account: tokens for account, tokens in result.items() if tokens}
+
+    def _apply_transaction(self, events):
+        now = events[0]["timestamp"]
+        self.now = now
+        if events[0]["event"] == "Call":
+            for call in events:
+                self._apply_call(call, now)
+            return
+        model = self.model
+        checkpointed = set()
+        for i, event in enumerate(events):
+            name = event["event"]
+            account = event["account"]
+            value = None if event["value"] is None else int(event["value"])
+            if name == "RewardTokenAdded":
+                if event["token"] not in model.reward_data:
+                    model.add_reward(event["token"], None, value)
+            elif name == "Staked":
+                model.stake(account, value, now)
+                checkpointed.add(account)
+            elif name == "Withdrawn":
+                model.withdraw(account, value, now)
+                checkpointed.add(account)
+            elif name == "Transfer" and ZERO_ADDRESS not in (account, event["recipient"]):
+                # mints and burns are replayed from `Staked` and `Withdrawn`
+                model.transfer(account, event["recipient"], value, now)
+                checkpointed.update((account, event["recipient"]))
+            elif name == "RewardPaid":
+                if account not in checkpointed:
+                    paid_tokens = [
+                        e["token"]
+                        for e in events[i:]
+                        if e["event"] == "RewardPaid" and e["account"] == account
+                    ]
+                    self._checkpoint_claim(account, paid_tokens, now, event["transaction_hash"])
+                    checkpointed.add(account)
+                paid = model._pay_reward(account, event["token"])
+                if paid != value:
+                    self.mismatches.append(
+                        (event["transaction_hash"], account, event["token"], value, paid)
+                    )
+            elif name == "RewardRateUpdated":
+                model.notify_reward_amount(None, event["token"], value, now)
+            elif name == "RewardScheduled":
+                start = int(event["start_time"])
+                duration = int(event["period_finish"]) - start
+                model.schedule_reward_amount(None, event["token"], value, start, duration, now)
+            elif name == "RewardRetired":
+                model.retire_reward(event["token"], now)
+            elif name == "RewardsDurationUpdated":
+                model.set_rewards_duration(None, event["token"], value, now)
+
+    def _apply_call(self, call, now):
+        # a call that emitted nothing, so every claim in it paid nothing
+        model = self.model
+        sender = call["account"]
+        selector = call["input"][:10]
+        signatures = MultiRewards.signatures
+        paid = []
+        if selector == signatures["getReward"]:
+            paid = [(sender, *i) for i in model.get_reward(sender, now).items()]
+        elif selector == signatures["compound"]:
+            model._update_reward(sender, now)
+        elif selector == signatures["getRewardForTokens"]:
+            tokens = _decode_addresses(call["input"])
+            paid = [(sender, *i) for i in model.get_reward_for_tokens(sender, tokens, now).items()]
+        elif selector == signatures["getRetiredRewards"]:
+            paid = [(sender, *i) for i in model.get_retired_rewards(sender, now).items()]
+        elif selector == signatures["getRewardFor"]:
+            paid = model.get_reward_for(_decode_addresses(call["input"]), now)
+        elif selector == signatures["compoundFor"]:
+            model._update_reward(None, now)
+            for account in _decode_addresses(call["input"]):
+                model._update_reward(account, now)
+        for account, token, amount in paid:
+            self.mismatches.append((call["transaction_hash"], account, token, 0, amount))
+
+    def _checkpoint_claim(self, account, paid_tokens, now, tx_hash):
+        model = self.model
+        if self._is_get_reward(account, paid_tokens, now, tx_hash):
+            model._update_reward(account, now)
+        else:
+            for token in paid_tokens:
+                model._update_reward_token(token, account, now)
+
+    def _is_get_reward(self, account, paid_tokens, now, tx_hash):
+        # `getReward` pays every token with a non-zero balance, if one is missing the
+        # claim came from `getRewardForTokens`. Retired tokens are only paid by
+        # `getRetiredRewards` and `getRewardForTokens`, neither checkpoints the others
+        model = self.model
+        others = [t for t in model.reward_tokens if t not in paid_tokens]
+        if len(others) == len(model.reward_tokens):
+            return False
+        if any(model.earned(account, t, now) for t in others):
+            return False
+        if not any(self._moves(t, now) for t in others):
+            # both claims leave the same state behind
+            return True
+        tx_input = web3.eth.get_transaction(tx_hash)["input"]
+        return not _to_hex(tx_input).startswith(MultiRewards.signatures["getRewardForTokens"])
+
+    def _moves(self, token, now):
+        # whether a checkpoint of `token` at `now` would change its stored reward data
+        model = self.model
+        data = model.reward_data[token]
+        return (
+            model._current_reward_data(token, now) is not data
+            or model.reward_per_token(token, now) != data.reward_per_token_stored
+            or model.last_time_reward_applicable(token, now) != data.last_update_time
+        )
+
+
+def replay(events, durations, timestamps):
+    """
+    Replay `events` and report at each of the ascending `timestamps`.
+
+    Returns a list of {"timestamp", "balances", "earned"} dicts, one per target.
+    """
+    replayer = RewardReplay(durations)
+    events = iter(events)
+    pending = next(events, None)
+    results = []
+    for timestamp in timestamps:
+        batch = []
+        while pending is not None and pending["timestamp"] <= timestamp:
+            batch.append(pending)
+            pending = next(events, None)
+        replayer.apply(batch)
+        results.append(
+            {
+                "timestamp": timestamp,
+                "balances": replayer.balances(),
+                "earned": replayer.earned_at(timestamp),
+            }
+        )
+    return results
+
+
+def _decode_addresses(calldata):
+    # the only argument of the call is an `address[]`
+    data = _to_bytes(calldata)[4:]
+    offset = int.from_bytes(data[:32], "big")
+    length = int.from_bytes(data[offset : offset + 32], "big")
+    start = offset + 32
+    return [
+        to_checksum_address(data[start + 32 * i + 12 : start + 32 * (i + 1)]) for i in range(length)
+    ]
+
+
+def _calls(indexer):
+    # calls without events, shaped like the events they are replayed among
+    for call in indexer.calls():
+        call["event"] = "Call"
+        call["account"] = call.pop("sender")
+        yield call
+
+
+def load_events(indexer):
+    """
+    Iterate over the indexed events of `indexer` and the calls without events,
+    adding the block timestamp. Calls follow the events of their block, every
+    checkpoint in a block runs at the same timestamp so their order within it
+    does not change the result.
+    """
+    timestamp = None
+    block_number = None
+    merged = heapq.merge(
+        indexer.events(), _calls(indexer), key=lambda e: (e["block_number"], e["event"] == "Call"),
+    )
+    for event in merged:
+        if event["block_number"] != block_number:
+            block_number = event["block_number"]
+            timestamp = chain[block_number]["timestamp"]
+        event["timestamp"] = timestamp
+        yield event
+
+
+def reward_durations(multi, indexer):
+    """
+    Returns {token: rewards duration before the first indexed event} for the
+    reward tokens whose `RewardTokenAdded` is not indexed. When indexing started
+    at the deployment only the list of reward tokens is read from the contract.
+    """
+    added = {e["token"] for e in indexer.events(event="RewardTokenAdded")}
+    tokens = [multi.rewardTokens(i) for i in range(multi.rewardTokensLength())]
+    tokens += [multi.retiredRewardTokens(i) for i in range(multi.retiredRewardTokensLength())]
+    durations = {}
+    for token in tokens:
+        if token in added:
+            continue
+        updates = indexer.events(event="RewardsDurationUpdated")
+        first = next((e for e in updates if e["token"] == token), None)
+        if first is None:
+            durations[token] = multi.rewardData(token)["rewardsDuration"]
+        else:
+            # the duration was changed since, read it before the first change
+            block = first["block_number"] - 1
+            durations[token] = multi.rewardData(token, block_identifier=block)["rewardsDuration"]
+    return durations
+
+
+def _stringify(value):
+    # amounts can exceed the range of JSON numbers in most parsers
+    if isinstance(value, dict):
+        return {k: _stringify(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_stringify(v) for v in value]
+    return str(value)
+
+
+def main():
+    multi = MultiRewards.at(MULTIREWARDS_CONTRACT_ADDRESS)
+    indexer = EventIndexer(DB_PATH, multi)
+    indexer.sync()
+
+    results = replay(load_events(indexer), reward_durations(multi, indexer), TARGET_TIMESTAMPS)
+
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with REPORT_PATH.open("w") as fp:
+        json.dump(_stringify(results), fp, indent=2)
+    print(f"Earned rewards at {len(results)} timestamps written to {REPORT_PATH}")
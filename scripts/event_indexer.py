@@ -0,0 +1,476 @@
+"""
+Incremental indexer for `MultiRewards` events.
+
+Logs are fetched in block-range batches and written to SQLite together with a
+per-contract checkpoint, one database transaction per batch, so an interrupted
+run resumes where it stopped and memory use is bounded by the batch size. The
+hashes of the most recent blocks are kept so that a reorg is detected on the
+next sync and the orphaned blocks are rolled back before indexing continues.
+
+Changes to balances and reward data are followed by an event with the values
+they left behind, `BalanceUpdated` with the new balance and total supply and
+`RewardRateUpdated` with the new reward rate and period end, so state can be
+rebuilt from the database without calls to the contract. Token amounts can
+exceed SQLite's 64 bit integers and are stored as decimal strings.
+
+Claims that pay nothing still checkpoint the contract but emit no event. Every
+successful call to the contract from a transaction without a single indexed event
+is stored in a separate table, with its sender and calldata. By default they are
+found by scanning the transactions of every block, which only sees calls made
+directly to the contract and costs a request per block. On a node that supports
+`trace_filter`, set `CALL_SOURCE` to "traces" to also catch calls made through
+other contracts.
+"""
+
+import sqlite3
+import time
+
+from brownie import chain, web3
+from eth_utils import keccak, to_checksum_address
+
+# address of the MultiRewards contract
+MULTIREWARDS_CONTRACT_ADDRESS = "0x"
+# block the contract was deployed at, nothing before it is fetched
+START_BLOCK = 0
+
+DB_PATH = "multirewards_events.db"
+
+# blocks requested per `eth_getLogs` call, halved whenever the node rejects a range
+BATCH_SIZE = 5000
+# number of recent block hashes kept for reorg detection
+REORG_DEPTH = 12
+# seconds between syncs when following the chain
+POLL_INTERVAL = 15
+# where calls without events are found, "blocks", "traces" or None to skip them
+CALL_SOURCE = "blocks"
+
+# event name -> (signature, [(column, indexed), ...]) in argument order
+EVENTS = {
+    "RewardTokenAdded": (
+        "RewardTokenAdded(address,address,uint256)",
+        [("token", True), ("distributor", False), ("value", False)],
+    ),
+    "RewardsDistributorUpdated": (
+        "RewardsDistributorUpdated(address,address)",
+        [("token", True), ("distributor", False)],
+    ),
+    "RewardAdded": ("RewardAdded(uint256)", [("value", False)]),
+    "RewardRateUpdated": (
+        "RewardRateUpdated(address,uint256,uint256,uint256)",
+        [("token", True), ("value", False), ("reward_rate", False), ("period_finish", False)],
+    ),
+    "RewardScheduled": (
+        "RewardScheduled(address,uint256,uint256,uint256)",
+        [("token", True), ("value", False), ("start_time", False), ("period_finish", False)],
+    ),
+    "Staked": ("Staked(address,uint256)", [("account", True), ("value", False)]),
+    "Withdrawn": ("Withdrawn(address,uint256)", [("account", True), ("value", False)]),
+    # logged after every `Staked`, `Withdrawn` and for both accounts of a `Transfer`
+    "BalanceUpdated": (
+        "BalanceUpdated(address,uint256,uint256)",
+        [("account", True), ("balance", False), ("total_supply", False)],
+    ),
+    # the staked balance is an ERC20 receipt, `account` is the sender, the zero
+    # address stands in for the other side of a stake or withdrawal
+    "Transfer": (
+        "Transfer(address,address,uint256)",
+        [("account", True), ("recipient", True), ("value", False)],
+    ),
+    "RewardPaid": (
+        "RewardPaid(address,address,uint256)",
+        [("account", True), ("token", True), ("value", False)],
+    ),
+    # `value` is the final reward per token of the retired token
+    "RewardRetired": ("RewardRetired(address,uint256)", [("token", True), ("value", False)],),
+    "RewardsDurationUpdated": (
+        "RewardsDurationUpdated(address,uint256)",
+        [("token", False), ("value", False)],
+    ),
+    "Recovered": ("Recovered(address,uint256)", [("token", False), ("value", False)]),
+}
+
+ADDRESS_COLUMNS = ("account", "recipient", "token", "distributor")
+AMOUNT_COLUMNS = (
+    "value",
+    "balance",
+    "total_supply",
+    "reward_rate",
+    "start_time",
+    "period_finish",
+)
+# decoded event arguments in table order, after the five columns locating the log
+COLUMNS = ADDRESS_COLUMNS + AMOUNT_COLUMNS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    contract TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    account TEXT,
+    recipient TEXT,
+    token TEXT,
+    distributor TEXT,
+    value TEXT,
+    balance TEXT,
+    total_supply TEXT,
+    reward_rate TEXT,
+    start_time TEXT,
+    period_finish TEXT,
+    PRIMARY KEY (contract, block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_account ON events (contract, account, block_number);
+CREATE TABLE IF NOT EXISTS calls (
+    contract TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    transaction_index INTEGER NOT NULL,
+    call_index INTEGER NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    input TEXT NOT NULL,
+    PRIMARY KEY (contract, block_number, transaction_index, call_index)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    contract TEXT PRIMARY KEY,
+    block_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    contract TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    PRIMARY KEY (contract, block_number)
+);
+"""
+
+
+class ReorgTooDeep(Exception):
+    """Raised when no stored block hash matches the chain any more"""
+
+
+def _topic(signature):
+    return "0x" + keccak(text=signature).hex()
+
+
+TOPICS = {_topic(signature): name for name, (signature, _) in EVENTS.items()}
+
+
+def _to_bytes(value):
+    # web3 returns `HexBytes` or hex strings depending on the version
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    return bytes(value)
+
+
+def _to_hex(value):
+    return "0x" + _to_bytes(value).hex()
+
+
+def decode_log(log):
+    """
+    Decode a raw log emitted by `MultiRewards`.
+
+    Returns a dict with `event` and every column in `COLUMNS`, missing
+    arguments are None. Every argument is a static 32 byte word.
+    """
+    topics = [_to_hex(t) for t in log["topics"]]
+    name = TOPICS[topics[0]]
+    indexed = iter(_to_bytes(t) for t in topics[1:])
+    data = _to_bytes(log["data"])
+    words = iter(data[i : i + 32] for i in range(0, len(data), 32))
+
+    row = dict.fromkeys(COLUMNS)
+    row["event"] = name
+    for column, is_indexed in EVENTS[name][1]:
+        word = next(indexed) if is_indexed else next(words)
+        if column in AMOUNT_COLUMNS:
+            row[column] = str(int.from_bytes(word, "big"))
+        else:
+            row[column] = to_checksum_address(word[-20:])
+    return row
+
+
+class EventIndexer:
+    def __init__(
+        self,
+        db_path,
+        address,
+        start_block=0,
+        batch_size=BATCH_SIZE,
+        reorg_depth=REORG_DEPTH,
+        call_source=CALL_SOURCE,
+    ):
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.executescript(SCHEMA)
+        self.address = to_checksum_address(str(address))
+        self.start_block = start_block
+        self.batch_size = batch_size
+        self.reorg_depth = reorg_depth
+        if call_source not in ("blocks", "traces", None):
+            raise ValueError(f"Unknown call source: {call_source}")
+        self.call_source = call_source
+
+    def close(self):
+        self.conn.close()
+
+    @property
+    def checkpoint(self):
+        """Last block that has been fully indexed, or None before the first sync"""
+        row = self.conn.execute(
+            "SELECT block_number FROM checkpoints WHERE contract = ?", (self.address,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def sync(self, to_block=None):
+        """
+        Index every block after the checkpoint up to `to_block`, defaulting to
+        the chain head. Returns the number of events written, calls without
+        events are not counted.
+        """
+        if to_block is None:
+            to_block = chain.height
+        self._rollback_orphaned()
+
+        checkpoint = self.checkpoint
+        from_block = self.start_block if checkpoint is None else checkpoint + 1
+        written = 0
+        while from_block <= to_block:
+            end = min(from_block + self.batch_size - 1, to_block)
+            try:
+                logs = self._get_logs(from_block, end)
+                calls = self._get_calls(
+                    from_block, end, {_to_hex(log["transactionHash"]) for log in logs}
+                )
+            except ValueError:
+                # providers cap the size of a response, retry with a smaller range
+                if self.batch_size == 1:
+                    raise
+                self.batch_size //= 2
+                continue
+            with self.conn:
+                written += self._insert(logs)
+                self._insert_calls(calls)
+                self._set_checkpoint(end)
+            from_block = end + 1
+
+        if self.checkpoint is not None:
+            self._record_hashes(self.checkpoint)
+        return written
+
+    def follow(self, poll_interval=POLL_INTERVAL):
+        """Sync, then keep processing new blocks as they arrive"""
+        while True:
+            written = self.sync()
+            if written:
+                print(f"Indexed {written} events up to block {self.checkpoint}")
+            time.sleep(poll_interval)
+
+    def rollback(self, block_number):
+        """Forget everything indexed after `block_number`"""
+        with self.conn:
+            for table in ("events", "calls", "blocks"):
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE contract = ? AND block_number > ?",
+                    (self.address, block_number),
+                )
+            if block_number < self.start_block:
+                self.conn.execute("DELETE FROM checkpoints WHERE contract = ?", (self.address,))
+            else:
+                self._set_checkpoint(block_number)
+
+    def events(self, event=None, account=None):
+        """Iterate over stored events in chain order without loading them all"""
+        query = "SELECT * FROM events WHERE contract = ?"
+        params = [self.address]
+        if event is not None:
+            query += " AND event = ?"
+            params.append(event)
+        if account is not None:
+            # transfers are listed for both the sender and the recipient
+            query += " AND (account = ? OR recipient = ?)"
+            params += [to_checksum_address(str(account))] * 2
+        cursor = self.conn.execute(query + " ORDER BY block_number, log_index", params)
+        columns = [c[0] for c in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
+
+    def calls(self):
+        """Iterate over stored calls without events in chain order"""
+        cursor = self.conn.execute(
+            "SELECT * FROM calls WHERE contract = ?"
+            " ORDER BY block_number, transaction_index, call_index",
+            (self.address,),
+        )
+        columns = [c[0] for c in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
+
+    def staked_balances(self, block_number=None):
+        """Returns {account: staked balance} as of `block_number`, defaulting to the latest"""
+        balances = {}
+        for event in self._balance_events(block_number):
+            balances[event["account"]] = int(event["balance"])
+        return {k: v for k, v in balances.items() if v}
+
+    def total_supply(self, block_number=None):
+        """Returns the total staked supply after the last `BalanceUpdated`"""
+        supply = 0
+        for event in self._balance_events(block_number):
+            supply = int(event["total_supply"])
+        return supply
+
+    def _balance_events(self, block_number):
+        query = (
+            "SELECT account, balance, total_supply FROM events"
+            " WHERE contract = ? AND event = 'BalanceUpdated'"
+        )
+        params = [self.address]
+        if block_number is not None:
+            query += " AND block_number <= ?"
+            params.append(block_number)
+        cursor = self.conn.execute(query + " ORDER BY block_number, log_index", params)
+        columns = [c[0] for c in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
+
+    def _get_logs(self, from_block, to_block):
+        return web3.eth.get_logs(
+            {
+                "address": self.address,
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "topics": [list(TOPICS)],
+            }
+        )
+
+    def _get_calls(self, from_block, to_block, logged):
+        """
+        Returns [(block number, transaction index, call index, transaction hash, sender,
+        input)] for every successful call to the contract in the range whose transaction
+        is not in `logged`, the hashes of the transactions that emitted an event.
+        """
+        if self.call_source == "traces":
+            return self._get_traced_calls(from_block, to_block, logged)
+        if self.call_source is None:
+            return []
+        calls = []
+        for number in range(from_block, to_block + 1):
+            block = web3.eth.get_block(number, full_transactions=True)
+            for tx in block["transactions"]:
+                tx_hash = _to_hex(tx["hash"])
+                if tx["to"] != self.address or tx_hash in logged:
+                    continue
+                # without an event the transaction may have reverted
+                if web3.eth.get_transaction_receipt(tx_hash)["status"]:
+                    calls.append(
+                        (
+                            number,
+                            tx["transactionIndex"],
+                            0,
+                            tx_hash,
+                            tx["from"],
+                            _to_hex(tx["input"]),
+                        )
+                    )
+        return calls
+
+    def _get_traced_calls(self, from_block, to_block, logged):
+        traces = web3.manager.request_blocking(
+            "trace_filter",
+            [{"fromBlock": hex(from_block), "toBlock": hex(to_block), "toAddress": [self.address]}],
+        )
+        # a call that succeeded is still undone when a call around it failed
+        failed = {}
+        for trace in traces:
+            if trace.get("error"):
+                failed.setdefault(trace["transactionHash"], []).append(trace["traceAddress"])
+
+        calls = []
+        counts = {}
+        for trace in traces:
+            tx_hash = trace["transactionHash"]
+            if trace["type"] != "call" or tx_hash in logged:
+                continue
+            if any(trace["traceAddress"][: len(f)] == f for f in failed.get(tx_hash, [])):
+                continue
+            action = trace["action"]
+            if action["callType"] != "call" or to_checksum_address(action["to"]) != self.address:
+                continue
+            index = counts[tx_hash] = counts.get(tx_hash, -1) + 1
+            calls.append(
+                (
+                    trace["blockNumber"],
+                    trace["transactionPosition"],
+                    index,
+                    tx_hash,
+                    to_checksum_address(action["from"]),
+                    action["input"],
+                )
+            )
+        return calls
+
+    def _insert_calls(self, calls):
+        self.conn.executemany(
+            "INSERT INTO calls VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(self.address,) + call for call in calls],
+        )
+
+    def _insert(self, logs):
+        rows = []
+        for log in logs:
+            row = decode_log(log)
+            rows.append(
+                (
+                    self.address,
+                    log["blockNumber"],
+                    log["logIndex"],
+                    _to_hex(log["transactionHash"]),
+                    row["event"],
+                )
+                + tuple(row[c] for c in COLUMNS)
+            )
+        placeholders = ", ".join("?" * (5 + len(COLUMNS)))
+        self.conn.executemany(f"INSERT INTO events VALUES ({placeholders})", rows)
+        return len(rows)
+
+    def _set_checkpoint(self, block_number):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?)", (self.address, block_number)
+        )
+
+    def _record_hashes(self, head):
+        first = max(head - self.reorg_depth + 1, self.start_block)
+        with self.conn:
+            for number in range(first, head + 1):
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO blocks VALUES (?, ?, ?)",
+                    (self.address, number, _to_hex(chain[number]["hash"])),
+                )
+            self.conn.execute(
+                "DELETE FROM blocks WHERE contract = ? AND block_number < ?", (self.address, first)
+            )
+
+    def _rollback_orphaned(self):
+        # walk back from the newest stored hash to the last block still on chain
+        stored = self.conn.execute(
+            "SELECT block_number, block_hash FROM blocks WHERE contract = ?"
+            " ORDER BY block_number DESC",
+            (self.address,),
+        ).fetchall()
+        if not stored:
+            return
+        height = chain.height
+        for number, block_hash in stored:
+            if number <= height and _to_hex(chain[number]["hash"]) == block_hash:
+                if number < stored[0][0]:
+                    self.rollback(number)
+                return
+        raise ReorgTooDeep(
+            f"No block from {stored[-1][0]} to {stored[0][0]} is on chain any more, "
+            "reindex from an earlier block"
+        )
+
+
+def main():
+    indexer = EventIndexer(DB_PATH, MULTIREWARDS_CONTRACT_ADDRESS, start_block=START_BLOCK)
+    indexer.follow()
@@ -0,0 +1,252 @@
+"""
+Fund many `MultiRewards` gauges from one distributor account.
+
+The manifest is a JSON file of the form:
+
+    {
+        "epoch": "2021-05-06",
+        "rewards": [
+            {"gauge": "0x...", "token": "0x...", "amount": "1000000000000000000000"},
+            ...
+        ]
+    }
+
+Balances, allowances and distributors for every entry are read in one
+aggregated call through `scripts/multicall.py` and checked before anything is
+sent. Approvals are only sent where the current allowance does not cover the
+amount. All transactions are then broadcast back to back with consecutive
+nonces, and confirmations are awaited at the end. The gas strategy may replace
+a slow transaction with a new one at the same nonce, so the transaction that
+was mined is followed and its hash is logged once it confirms.
+
+Every step is appended to a log keyed by (epoch, gauge, token). Each nonce is
+logged before its transaction is broadcast. On a rerun, confirmed entries are
+skipped and submitted ones are awaited rather than resent. An entry whose nonce
+was used without a recorded transaction is reported rather than retried, so a
+crash never funds a gauge twice.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from brownie import Contract, MultiRewards, accounts, chain, history, web3
+from brownie.network.gas.strategies import GasNowScalingStrategy
+from brownie.network.transaction import Status
+from web3.exceptions import TransactionNotFound
+
+from scripts.multicall import MulticallClient
+
+MANIFEST_PATH = Path("rewards_manifest.json")
+LOG_PATH = Path("reports/funding_log.jsonl")
+
+# address that is permitted to fund every gauge in the manifest
+REWARD_ADMIN = accounts.add()
+
+# gas limits are fixed because a notification cannot be estimated before its approval is mined
+APPROVE_GAS_LIMIT = 100_000
+NOTIFY_GAS_LIMIT = 1_000_000
+
+ERC20_ABI = [
+    {
+        "name": "balanceOf",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [{"name": "owner", "type": "address"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    },
+    {
+        "name": "allowance",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [{"name": "owner", "type": "address"}, {"name": "spender", "type": "address"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    },
+    {
+        "name": "approve",
+        "type": "function",
+        "stateMutability": "nonpayable",
+        "inputs": [{"name": "spender", "type": "address"}, {"name": "amount", "type": "uint256"}],
+        "outputs": [{"name": "", "type": "bool"}],
+    },
+]
+
+gas_strategy = GasNowScalingStrategy("standard", "fast")
+
+
+def load_manifest(path):
+    """Returns (epoch, [(gauge, token, amount), ...])"""
+    with Path(path).open() as fp:
+        manifest = json.load(fp)
+    entries = [(r["gauge"], r["token"], int(r["amount"])) for r in manifest["rewards"]]
+    keys = [(gauge.lower(), token.lower()) for gauge, token, _ in entries]
+    if len(set(keys)) != len(keys):
+        raise ValueError("Manifest funds the same gauge and token more than once")
+    return str(manifest["epoch"]), entries
+
+
+class FundingLog:
+    """
+    Append-only JSON lines log of funding steps. Each line records one status
+    change for an entry, the last line for a key is its current state.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            with self.path.open() as fp:
+                for line in fp:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.entries.setdefault(record["key"], {}).update(record)
+
+    @staticmethod
+    def key(epoch, gauge, token):
+        return f"{epoch}:{gauge.lower()}:{token.lower()}"
+
+    def get(self, key):
+        return self.entries.get(key, {})
+
+    def record(self, key, **fields):
+        record = {"key": key, **fields}
+        self.entries.setdefault(key, {}).update(record)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as fp:
+            fp.write(json.dumps(record) + "\n")
+            fp.flush()
+            os.fsync(fp.fileno())
+
+
+def preflight(entries, funder, client):
+    """
+    Read the funder's balance and allowance, and the distributor of every
+    entry, with one aggregated read. Raises `ValueError` listing every problem
+    found.
+
+    Returns a list of allowances, one per entry.
+    """
+    erc20s = {t: Contract.from_abi("ERC20", t, ERC20_ABI) for _, t, _ in entries}
+    gauges = {g: MultiRewards.at(g) for g, _, _ in entries}
+
+    calls = [(erc20.balanceOf, [funder]) for erc20 in erc20s.values()]
+    for gauge, token, _ in entries:
+        calls.append((gauges[gauge].rewardData, [token]))
+        calls.append((erc20s[token].allowance, [funder, gauge]))
+    results = client.read(calls)
+
+    balances = dict(zip(erc20s, results[: len(erc20s)]))
+    reads = [
+        (data["rewardsDistributor"], allowance)
+        for data, allowance in zip(results[len(erc20s) :: 2], results[len(erc20s) + 1 :: 2])
+    ]
+
+    errors = []
+    required = {}
+    for (gauge, token, amount), (distributor, _) in zip(entries, reads):
+        required[token] = required.get(token, 0) + amount
+        if distributor != str(funder):
+            errors.append(f"{funder} is not the distributor of {token} on {gauge}")
+    for token, amount in required.items():
+        if balances[token] < amount:
+            errors.append(f"Balance of {token} is {balances[token]}, {amount} required")
+    if errors:
+        raise ValueError("Pre-flight checks failed:\n" + "\n".join(errors))
+    return [allowance for _, allowance in reads]
+
+
+def fund(epoch, entries, funder, log, client, gas_price=None):
+    """
+    Fund every (gauge, token, amount) entry that `log` does not show as
+    funded for `epoch`. Returns {key: final status}.
+    """
+    statuses = {}
+    todo = []
+    pending = []
+    for entry in entries:
+        key = FundingLog.key(epoch, entry[0], entry[1])
+        state = log.get(key)
+        if state.get("status") == "confirmed":
+            statuses[key] = "confirmed"
+        elif state.get("status") == "submitted":
+            pending.append((key, state["tx"]))
+        elif state.get("status") == "submitting" and _nonce_used(funder, state["nonce"]):
+            # the nonce was consumed but the transaction was never recorded
+            statuses[key] = "unknown"
+        else:
+            todo.append(entry)
+
+    if todo:
+        allowances = preflight(todo, funder, client)
+        nonce = web3.eth.get_transaction_count(str(funder), "pending")
+        tx_params = {"from": funder, "required_confs": 0}
+        if gas_price is not None:
+            tx_params["gas_price"] = gas_price
+
+        for (gauge, token, amount), allowance in zip(todo, allowances):
+            if allowance < amount:
+                erc20 = Contract.from_abi("ERC20", token, ERC20_ABI)
+                erc20.approve(
+                    gauge, amount, dict(tx_params, nonce=nonce, gas_limit=APPROVE_GAS_LIMIT)
+                )
+                nonce += 1
+
+            key = FundingLog.key(epoch, gauge, token)
+            log.record(key, status="submitting", nonce=nonce, amount=str(amount))
+            tx = MultiRewards.at(gauge).notifyRewardAmount(
+                token, amount, dict(tx_params, nonce=nonce, gas_limit=NOTIFY_GAS_LIMIT)
+            )
+            log.record(key, status="submitted", tx=tx.txid)
+            pending.append((key, tx))
+            nonce += 1
+
+    for key, tx in pending:
+        tx = _wait(tx)
+        if tx is None:
+            # replaced by a transaction this run never saw, it may or may not have funded
+            statuses[key] = "unknown"
+            continue
+        status = "confirmed" if tx.status == Status.Confirmed else "reverted"
+        log.record(key, status=status, tx=tx.txid, block=tx.block_number)
+        statuses[key] = status
+    return statuses
+
+
+def _wait(tx):
+    """
+    Wait for one confirmation of `tx`, a transaction or the hash of one sent by
+    an earlier run. Returns the transaction that was mined at its nonce, following
+    replacements sent by the gas strategy, or None when it cannot be found.
+    """
+    if isinstance(tx, str):
+        try:
+            tx = chain.get_transaction(tx)
+        except TransactionNotFound:
+            return None
+    tx.wait(1)
+    if tx.status != Status.Dropped:
+        return tx
+    for replacement in history.filter(sender=tx.sender, nonce=tx.nonce):
+        if replacement.txid != tx.txid:
+            replacement.wait(1)
+            if replacement.status != Status.Dropped:
+                return replacement
+    return None
+
+
+def _nonce_used(funder, nonce):
+    # pending transactions count as well, one may still be waiting in the mempool
+    return web3.eth.get_transaction_count(str(funder), "pending") > nonce
+
+
+def main():
+    epoch, entries = load_manifest(MANIFEST_PATH)
+    log = FundingLog(LOG_PATH)
+    statuses = fund(epoch, entries, REWARD_ADMIN, log, MulticallClient(), gas_price=gas_strategy)
+
+    for key, status in statuses.items():
+        print(f"{key}: {status}")
+    failed = [k for k, s in statuses.items() if s != "confirmed"]
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(statuses)} entries were not funded")
+    print(f"Success! {len(statuses)} gauges funded for epoch {epoch}")
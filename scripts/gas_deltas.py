@@ -0,0 +1,88 @@
+"""
+Tabulate gas before and after the gas work from a benchmark gas report.
+
+Run the benchmark suite, or take the `gas-report` artifact of the CI benchmark job,
+then:
+
+    brownie run gas_deltas
+
+Measurements are only compared within the test that took them, at the same reward
+token and staker count. The table is printed and written to `reports/gas_deltas.md`.
+"""
+
+import json
+import os
+from pathlib import Path
+
+# (comparison, functions whose gas adds up to the cost before, function measured after)
+COMPARISONS = (
+    ("stake", ("baseline.stake",), "stake"),
+    ("withdraw", ("baseline.withdraw",), "withdraw"),
+    ("getReward", ("baseline.getReward",), "getReward"),
+    ("notifyRewardAmount", ("baseline.notifyRewardAmount",), "notifyRewardAmount"),
+    ("exit", ("baseline.exit",), "exit"),
+    ("deploy", ("deployFull",), "deploy"),
+    ("transfer", ("exit", "stake"), "transfer"),
+)
+
+REPORT_PATH = Path(os.environ.get("GAS_REPORT_PATH", "reports/gas.json"))
+DELTAS_PATH = Path("reports/gas_deltas.md")
+
+
+def gas_deltas(records):
+    """
+    Compare the records of a gas report.
+
+    Returns a list of dicts with the comparison, the reward token and staker counts,
+    the gas before and after and the change in percent, sorted by comparison.
+    """
+    groups = {}
+    for record in records:
+        key = (record.get("test"), record["reward_tokens"], record["stakers"])
+        groups.setdefault(key, {})[record["function"]] = record["gas_used"]
+
+    deltas = []
+    for (_, reward_tokens, stakers), gas in groups.items():
+        for name, before_fns, after_fn in COMPARISONS:
+            if after_fn not in gas or not all(fn in gas for fn in before_fns):
+                continue
+            before = sum(gas[fn] for fn in before_fns)
+            deltas.append(
+                {
+                    "comparison": name,
+                    "reward_tokens": reward_tokens,
+                    "stakers": stakers,
+                    "before": before,
+                    "after": gas[after_fn],
+                    "change": round((gas[after_fn] - before) * 100 / before, 1),
+                }
+            )
+    order = [name for name, _, _ in COMPARISONS]
+    return sorted(
+        deltas, key=lambda d: (order.index(d["comparison"]), d["reward_tokens"], d["stakers"])
+    )
+
+
+def format_deltas(deltas):
+    lines = [
+        "| function | reward tokens | stakers | before | after | change |",
+        "| --- | ---: | ---: | ---: | ---: | ---: |",
+    ]
+    for d in deltas:
+        lines.append(
+            f"| {d['comparison']} | {d['reward_tokens']} | {d['stakers']} "
+            f"| {d['before']} | {d['after']} | {d['change']:+.1f}% |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    with REPORT_PATH.open() as fp:
+        deltas = gas_deltas(json.load(fp))
+    if not deltas:
+        raise ValueError(f"Nothing to compare in {REPORT_PATH}")
+
+    table = format_deltas(deltas)
+    DELTAS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    DELTAS_PATH.write_text(table)
+    print(f"\n{table}\nDeltas written to {DELTAS_PATH}")
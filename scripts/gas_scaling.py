@@ -0,0 +1,135 @@
+"""
+Measure how the gas of each user action grows with the number of reward tokens.
+
+A fresh `MultiRewards` is deployed and reward tokens are registered until each
+count in `TOKEN_COUNTS` is reached, where `stake`, `withdraw`, `getReward` and
+`exit` are measured from new accounts so first-time storage writes are included.
+Run on a local or forked network:
+
+    brownie run gas_scaling
+
+Each action is fitted as a base cost plus a cost per reward token. The report in
+`reports/gas_scaling.json` lists the measurements, the fitted `intercept` and
+`per_token` gas, and the largest reward token count that fits under each ceiling
+in `GAS_CEILINGS`, as `max_reward_tokens`. A summary table is printed.
+"""
+
+import json
+from pathlib import Path
+
+from brownie import MultiRewards, accounts, chain
+from brownie_tokens.template import ERC20
+
+# reward token counts to measure, the linear fit is extrapolated past the largest
+TOKEN_COUNTS = [1, 2, 4, 8, 16, 24, 32]
+
+# gas ceilings that each entry point is checked against
+GAS_CEILINGS = {
+    "block gas limit": 30_000_000,
+    "block gas target": 15_000_000,
+    "single tx (8M)": 8_000_000,
+}
+
+ENTRY_POINTS = ("stake", "withdraw", "getReward", "exit")
+
+# long enough that every reward token stays active while measuring
+REWARD_DURATION = 365 * 86400
+
+REPORT_PATH = Path("reports/gas_scaling.json")
+
+
+def _fresh_staker(multi, base_token, funder, amount):
+    # a new account every time so each measurement includes first-time storage writes
+    staker = accounts.add()
+    funder.transfer(staker, "1 ether")
+    base_token._mint_for_testing(staker, amount)
+    base_token.approve(multi, amount, {"from": staker})
+    return staker
+
+
+def measure_gas(multi, base_token, owner, token_counts, amount=10 ** 18):
+    """
+    Register reward tokens on `multi` until each count in `token_counts` is reached
+    and measure the worst case of every user action at that count.
+
+    Returns a dict of {entry point: [(reward token count, gas used), ...]}.
+    """
+    results = {fn: [] for fn in ENTRY_POINTS}
+    registered = multi.rewardTokensLength()
+
+    for count in sorted(token_counts):
+        while registered < count:
+            token = ERC20()
+            token._mint_for_testing(owner, amount)
+            token.approve(multi, amount, {"from": owner})
+            multi.addReward(token, owner, REWARD_DURATION, {"from": owner})
+            multi.notifyRewardAmount(token, amount, {"from": owner})
+            registered += 1
+
+        staker = _fresh_staker(multi, base_token, owner, amount)
+        leaver = _fresh_staker(multi, base_token, owner, amount)
+        results["stake"].append((count, multi.stake(amount, {"from": staker}).gas_used))
+        multi.stake(amount, {"from": leaver})
+        chain.sleep(3600)
+
+        tx = multi.withdraw(amount // 2, {"from": staker})
+        results["withdraw"].append((count, tx.gas_used))
+        chain.sleep(3600)
+
+        results["getReward"].append((count, multi.getReward({"from": staker}).gas_used))
+        results["exit"].append((count, multi.exit({"from": leaver}).gas_used))
+
+    return results
+
+
+def fit_linear(points):
+    """Least squares fit of `gas = intercept + slope * tokens`, returns (intercept, slope)"""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        raise ValueError("Need measurements at two or more token counts")
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+    return mean_y - slope * mean_x, slope
+
+
+def max_reward_tokens(intercept, slope, ceiling):
+    """Largest reward token count whose fitted gas stays within `ceiling`"""
+    if slope <= 0:
+        return None
+    return max(int((ceiling - intercept) // slope), 0)
+
+
+def scaling_report(results, ceilings):
+    report = {}
+    for fn, points in results.items():
+        intercept, slope = fit_linear(points)
+        report[fn] = {
+            "measurements": [{"reward_tokens": x, "gas_used": y} for x, y in points],
+            "intercept": round(intercept),
+            "per_token": round(slope),
+            "max_reward_tokens": {
+                name: max_reward_tokens(intercept, slope, gas) for name, gas in ceilings.items()
+            },
+        }
+    return report
+
+
+def main():
+    owner = accounts[0]
+    base_token = ERC20()
+    multi = MultiRewards.deploy(owner, base_token, {"from": owner})
+
+    report = scaling_report(measure_gas(multi, base_token, owner, TOKEN_COUNTS), GAS_CEILINGS)
+
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with REPORT_PATH.open("w") as fp:
+        json.dump(report, fp, indent=2)
+
+    names = list(GAS_CEILINGS)
+    print(f"\n{'function':<12}{'base':>10}{'per token':>11}" + "".join(f"{n:>20}" for n in names))
+    for fn, data in report.items():
+        limits = "".join(f"{str(data['max_reward_tokens'][n]):>20}" for n in names)
+        print(f"{fn:<12}{data['intercept']:>10}{data['per_token']:>11}{limits}")
+    print(f"\nReport written to {REPORT_PATH}")
@@ -0,0 +1,102 @@
+"""
+Batched, cached reads of contract view functions.
+
+`MulticallClient.read` takes a list of brownie contract calls with their
+arguments, for example `(multi.rewardData, [token])` or
+`(erc20.balanceOf, [account])`. Every call that is not cached for the block is
+sent in one aggregated `eth_call` through a Multicall contract. All results of
+a read come from the same block. Results are cached by (block, target,
+calldata) with LRU eviction, and `hits` and `misses` count cache lookups.
+"""
+
+from collections import OrderedDict
+
+from brownie import Multicall, chain
+
+# Multicall2 deployment shared by mainnet and most testnets
+MULTICALL_ADDRESS = "0x5BA1e12693Dc8F9c48aAD8770482f4739bEeD696"
+
+# cached results kept before the least recently used are evicted
+CACHE_SIZE = 4096
+# calls per aggregated `eth_call`, bounded by the node's gas cap for calls
+BATCH_SIZE = 500
+
+
+class MulticallError(Exception):
+    """Raised when an aggregated call reverts and failures are not allowed"""
+
+
+class MulticallClient:
+    def __init__(self, multicall=None, cache_size=CACHE_SIZE, batch_size=BATCH_SIZE):
+        if multicall is None:
+            multicall = Multicall.at(MULTICALL_ADDRESS)
+        self.multicall = multicall
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def read(self, calls, block=None, require_success=True):
+        """
+        Read every (contract call, args) pair in `calls` at `block`, defaulting
+        to the latest block. Returns the decoded results in order.
+
+        A reverted call raises `MulticallError`, or returns None when
+        `require_success` is False.
+        """
+        if block is None:
+            block = chain.height
+        keys = []
+        found = {}
+        missing = {}
+        for fn, args in calls:
+            key = (block, fn._address, fn.encode_input(*args))
+            keys.append(key)
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                found[key] = self._cache[key]
+            elif key not in found and key not in missing:
+                self.misses += 1
+                missing[key] = fn
+
+        # results are taken from `found`, a large read can evict its own cache entries
+        items = list(missing.items())
+        for i in range(0, len(items), self.batch_size):
+            found.update(self._aggregate(items[i : i + self.batch_size], block))
+
+        results = []
+        for key in keys:
+            result = found[key]
+            if isinstance(result, MulticallError):
+                if require_success:
+                    raise result
+                result = None
+            results.append(result)
+        return results
+
+    def read_one(self, fn, *args, block=None):
+        return self.read([(fn, args)], block=block)[0]
+
+    def clear(self):
+        self._cache.clear()
+
+    def _aggregate(self, items, block):
+        payload = [(key[1], key[2]) for key, _ in items]
+        _, _, returned = self.multicall.tryBlockAndAggregate(False, payload, block_identifier=block)
+        results = {}
+        for (key, fn), (success, data) in zip(items, returned):
+            if success:
+                result = fn.decode_output(data)
+            else:
+                result = MulticallError(f"{fn._name} on {key[1]} reverted at block {block}")
+            self._store(key, result)
+            results[key] = result
+        return results
+
+    def _store(self, key, result):
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -0,0 +1,187 @@
+"""
+Bring the reward configuration of many `MultiRewards` gauges in line with a
+YAML description:
+
+    gauges:
+      "0xGaugeAddress":
+        "0xRewardToken":
+          distributor: "0xDistributorAddress"
+          duration: 604800
+
+The current reward tokens, distributors and durations are read through
+`MultiRewardsLens`, every gauge in one aggregated read. Only the `addReward`,
+`setRewardsDistributor` and `setRewardsDuration` calls needed to reach the
+desired state are planned. Reward tokens that are on chain but missing from the
+file are left untouched. A duration cannot change while a reward period is
+running, so such changes are reported as blocked until `periodFinish`. A
+retired reward token can never be added or reconfigured again, any config for
+it is reported as blocked until it is removed from the file.
+
+    brownie run reconcile_rewards --network mainnet          # print the plan
+    brownie run reconcile_rewards apply --network mainnet    # send it
+"""
+
+from collections import namedtuple
+from pathlib import Path
+
+import yaml
+from brownie import MultiRewards, MultiRewardsLens, accounts, chain
+from brownie.network.gas.strategies import GasNowScalingStrategy
+from eth_utils import to_checksum_address
+
+from scripts.multicall import MulticallClient
+
+CONFIG_PATH = Path("rewards.yaml")
+
+# address of the deployed MultiRewardsLens
+LENS_ADDRESS = "0x"
+
+# address that owns every gauge in the config
+OWNER = accounts.add()
+
+gas_strategy = GasNowScalingStrategy("standard", "fast")
+
+RewardConfig = namedtuple("RewardConfig", ["distributor", "duration"])
+RewardState = namedtuple(
+    "RewardState", ["distributor", "duration", "period_finish", "retired"], defaults=[False]
+)
+# state of a token retired with `retireReward`, which the lens no longer reports
+RETIRED = RewardState(None, None, None, True)
+
+# `sender` is "owner" or the distributor address, `blocked` explains why the
+# action cannot be sent yet and is None otherwise
+Action = namedtuple("Action", ["gauge", "function", "args", "sender", "blocked"])
+
+
+def load_config(path):
+    """Returns {gauge: {token: RewardConfig}} with checksummed addresses"""
+    with Path(path).open() as fp:
+        config = yaml.safe_load(fp)
+
+    desired = {}
+    for gauge, rewards in (config.get("gauges") or {}).items():
+        gauge_rewards = desired.setdefault(_address(gauge), {})
+        for token, reward in (rewards or {}).items():
+            duration = int(reward["duration"])
+            if duration <= 0:
+                raise ValueError(f"Duration of {token} on {gauge} must be positive")
+            gauge_rewards[_address(token)] = RewardConfig(_address(reward["distributor"]), duration)
+    return desired
+
+
+def _address(value):
+    # YAML reads an unquoted 0x... value as a hexadecimal integer
+    if not isinstance(value, str):
+        raise ValueError(f"Addresses must be quoted in the config, got {value!r}")
+    return to_checksum_address(value)
+
+
+def read_state(client, lens, gauges):
+    """
+    Returns {gauge: {token: RewardState}}, the reward tokens of every gauge
+    read in one aggregated lens read and the retired ones in two more.
+    """
+    gauges = list(gauges)
+    contracts = [MultiRewards.at(g) for g in gauges]
+    block = chain.height
+    calls = [(lens.getRewardInfo, [g]) for g in gauges]
+    calls += [(c.retiredRewardTokensLength, []) for c in contracts]
+    results = client.read(calls, block)
+    infos, lengths = results[: len(gauges)], results[len(gauges) :]
+    retired = iter(
+        client.read(
+            [(c.retiredRewardTokens, [i]) for c, n in zip(contracts, lengths) for i in range(n)],
+            block,
+        )
+    )
+
+    state = {}
+    for gauge, info, length in zip(gauges, infos, lengths):
+        state[gauge] = {
+            i["token"]: RewardState(
+                i["rewardsDistributor"], i["rewardsDuration"], i["periodFinish"]
+            )
+            for i in info
+        }
+        state[gauge].update((next(retired), RETIRED) for _ in range(length))
+    return state
+
+
+def plan_changes(desired, current, now):
+    """
+    Compare the desired configuration with the current state and return the
+    list of actions to send, in order.
+    """
+    actions = []
+    for gauge, rewards in desired.items():
+        on_chain = current.get(gauge, {})
+        for token, config in rewards.items():
+            state = on_chain.get(token)
+            if state is None or state.retired:
+                args = (token, config.distributor, config.duration)
+                blocked = "reward token is retired, remove it from the config" if state else None
+                actions.append(Action(gauge, "addReward", args, "owner", blocked))
+                continue
+
+            if state.distributor != config.distributor:
+                args = (token, config.distributor)
+                actions.append(Action(gauge, "setRewardsDistributor", args, "owner", None))
+            if state.duration != config.duration:
+                blocked = None
+                if now <= state.period_finish:
+                    blocked = f"reward period still active until {state.period_finish}"
+                # sent by the desired distributor, after any change of distributor
+                args = (token, config.duration)
+                actions.append(
+                    Action(gauge, "setRewardsDuration", args, config.distributor, blocked)
+                )
+    return actions
+
+
+def format_action(action):
+    args = ", ".join(str(a) for a in action.args)
+    line = f"{action.gauge}  {action.function}({args})  from {action.sender}"
+    if action.blocked:
+        line += f"  BLOCKED: {action.blocked}"
+    return line
+
+
+def send_actions(actions, owner, gas_price=None):
+    """
+    Send every action that is not blocked and whose sender is available.
+    Returns the list of actions that were skipped.
+    """
+    signers = {str(a): a for a in accounts}
+    skipped = []
+    for action in actions:
+        sender = owner if action.sender == "owner" else signers.get(action.sender)
+        if action.blocked or sender is None:
+            skipped.append(action)
+            continue
+        tx_params = {"from": sender}
+        if gas_price is not None:
+            tx_params["gas_price"] = gas_price
+        getattr(MultiRewards.at(action.gauge), action.function)(*action.args, tx_params)
+    return skipped
+
+
+def _plan():
+    desired = load_config(CONFIG_PATH)
+    current = read_state(MulticallClient(), MultiRewardsLens.at(LENS_ADDRESS), desired)
+    actions = plan_changes(desired, current, chain.time())
+
+    if not actions:
+        print("Nothing to do, on-chain state matches the config")
+    for action in actions:
+        print(format_action(action))
+    return actions
+
+
+def main():
+    _plan()
+
+
+def apply():
+    skipped = send_actions(_plan(), OWNER, gas_price=gas_strategy)
+    for action in skipped:
+        print(f"Skipped: {format_action(action)}")
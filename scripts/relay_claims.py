@@ -0,0 +1,74 @@
+"""
+Claim rewards on behalf of many accounts with `MultiRewards.getRewardFor`.
+
+Accounts with nothing to claim are filtered out with one aggregated lens read,
+and the rest are claimed in batches of `CLAIM_BATCH_SIZE`. Rewards are paid to
+each account. `RELAYER` must be a claim relayer set by the owner with
+`setClaimRelayer`, or be approved by every account with `setClaimApproval`.
+
+With `COMPOUND` set, rewards in the staking token are restaked instead with
+`MultiRewards.compoundFor`, and only accounts with such rewards are sent.
+"""
+
+from brownie import MultiRewards, MultiRewardsLens, accounts
+from brownie.network.gas.strategies import GasNowScalingStrategy
+
+from scripts.multicall import MulticallClient
+
+# address of the MultiRewards contract
+MULTIREWARDS_CONTRACT_ADDRESS = "0x"
+
+# address of the deployed MultiRewardsLens
+LENS_ADDRESS = "0x"
+
+# account that sends the claims and pays the gas
+RELAYER = accounts.add()
+
+# accounts to claim for
+ACCOUNTS = []
+
+# accounts per transaction, each one adds a checkpoint and a transfer per reward token
+CLAIM_BATCH_SIZE = 200
+
+# restake staking token rewards with `compoundFor` instead of paying out every reward
+COMPOUND = False
+
+gas_strategy = GasNowScalingStrategy("standard", "fast")
+
+
+def claimable(client, lens, gauge, accounts, token=None):
+    """
+    Returns the accounts with a non-zero amount to claim of any reward token,
+    or only of `token` if given
+    """
+    if token is not None:
+        earned = client.read([(gauge.earned, [a, token]) for a in accounts])
+        return [a for a, amount in zip(accounts, earned) if amount]
+    earned = client.read([(lens.getEarned, [gauge, a]) for a in accounts])
+    return [a for a, amounts in zip(accounts, earned) if any(amounts)]
+
+
+def relay_claims(
+    gauge, accounts, relayer, batch_size=CLAIM_BATCH_SIZE, gas_price=None, compound=False
+):
+    """Claim, or restake with `compound`, for `accounts` in batches, returns the transactions"""
+    tx_params = {"from": relayer}
+    if gas_price is not None:
+        tx_params["gas_price"] = gas_price
+    fn = gauge.compoundFor if compound else gauge.getRewardFor
+    txs = []
+    for i in range(0, len(accounts), batch_size):
+        txs.append(fn(accounts[i : i + batch_size], tx_params))
+    return txs
+
+
+def main():
+    gauge = MultiRewards.at(MULTIREWARDS_CONTRACT_ADDRESS)
+    lens = MultiRewardsLens.at(LENS_ADDRESS)
+    token = gauge.stakingToken() if COMPOUND else None
+    pending = claimable(MulticallClient(), lens, gauge, ACCOUNTS, token)
+    print(f"{len(pending)} of {len(ACCOUNTS)} accounts have rewards to claim")
+
+    txs = relay_claims(gauge, pending, RELAYER, gas_price=gas_strategy, compound=COMPOUND)
+    for tx in txs:
+        print(f"{tx.txid}: {len(tx.events['RewardPaid'])} payouts, {tx.gas_used} gas")
@@ -0,0 +1,262 @@
+"""
+Keeper that tops up `MultiRewards` reward streams before they run dry.
+
+Every `POLL_BLOCKS` blocks the reward data of all watched gauges is read
+through `MultiRewardsLens`, all gauges and the block timestamp in one
+aggregated read.
+Any stream whose `periodFinish` falls within `TOP_UP_WINDOW` seconds of the
+latest block is funded again with `notifyRewardAmount`. Streams that have
+already finished, or never started, are funded on the next check. Streams
+with a period queued by `scheduleRewardAmount` that has not started yet are
+already funded and skipped. Once every queued period has started, the stream
+is watched again until the last one finishes, read from `rewardStreams` in
+the same block since the gauge only switches over on its next checkpoint.
+
+Top-ups are broadcast with locally assigned nonces, and at most
+`MAX_IN_FLIGHT` of them wait for confirmation at any time. The next check
+starts once every top-up of the current one has confirmed. Confirmation follows
+the transaction that was mined when the gas strategy replaced a slow one. A
+top-up still unconfirmed after `CONFIRM_TIMEOUT` seconds is reported, and the
+next check takes its nonce from the mined transaction count, so the next top-up
+replaces whatever is stuck instead of queueing behind it. The keeper must be
+the distributor of every stream and have approved each gauge to pull the
+reward. Streams whose token is not registered on the gauge are ignored.
+"""
+
+import asyncio
+from collections import namedtuple
+
+from brownie import MultiRewards, MultiRewardsLens, accounts, chain, history, web3
+from brownie.network.gas.strategies import GasNowScalingStrategy
+from brownie.network.transaction import Status
+from eth_utils import to_checksum_address
+
+from scripts.multicall import MulticallClient
+
+# address of the deployed MultiRewardsLens
+LENS_ADDRESS = "0x"
+
+# distributor account that funds every stream
+KEEPER = accounts.add()
+
+# (gauge, reward token, amount added on every top-up)
+STREAMS = []
+
+# top up streams that finish within this many seconds of the latest block
+TOP_UP_WINDOW = 6 * 3600
+# check every this many blocks
+POLL_BLOCKS = 5
+# seconds between polls for a new block
+POLL_INTERVAL = 3
+# top-ups broadcast but not yet confirmed
+MAX_IN_FLIGHT = 4
+# seconds to wait for a top-up to confirm
+CONFIRM_TIMEOUT = 600
+
+gas_strategy = GasNowScalingStrategy("standard", "fast")
+
+Stream = namedtuple("Stream", ["gauge", "token", "amount"])
+# `status` is "confirmed", "reverted", "dropped", "timeout" or "failed", `txid` is the
+# transaction that was mined or last sent, None if nothing was sent
+TopUp = namedtuple("TopUp", ["stream", "txid", "status"])
+
+
+class RewardKeeper:
+    def __init__(
+        self,
+        lens,
+        client,
+        streams,
+        keeper,
+        window=TOP_UP_WINDOW,
+        max_in_flight=MAX_IN_FLIGHT,
+        poll_blocks=POLL_BLOCKS,
+        gas_price=None,
+        confirm_timeout=CONFIRM_TIMEOUT,
+    ):
+        self.lens = lens
+        self.client = client
+        self.streams = [
+            Stream(to_checksum_address(g), to_checksum_address(t), int(a)) for g, t, a in streams
+        ]
+        self.gauges = {s.gauge: MultiRewards.at(s.gauge) for s in self.streams}
+        self.keeper = keeper
+        self.window = window
+        self.max_in_flight = max_in_flight
+        self.poll_blocks = poll_blocks
+        self.gas_price = gas_price
+        self.confirm_timeout = confirm_timeout
+
+        self.history = []
+        # highest number of unconfirmed top-ups seen at once
+        self.peak_in_flight = 0
+        self._in_flight = 0
+        self._nonce = None
+        # set when a top-up did not confirm, the pending nonce may be held by a stuck transaction
+        self._resync = False
+
+    def due(self, reward_info, now):
+        """
+        Returns the streams that finish within the window of `now`, given
+        {gauge: {token: periodFinish}}.
+        """
+        due = []
+        for stream in self.streams:
+            finish = reward_info[stream.gauge].get(stream.token)
+            if finish is not None and finish - now <= self.window:
+                due.append(stream)
+        return due
+
+    async def check(self):
+        """Read every watched gauge, send the top-ups that are due and wait for them"""
+        gauges = sorted(self.gauges)
+        block = await self._call(lambda: chain.height)
+        calls = [(self.lens.getRewardInfo, [g]) for g in gauges]
+        calls.append((self.client.multicall.getCurrentBlockTimestamp, []))
+        *infos, now = await self._call(self.client.read, calls, block)
+
+        reward_info = {gauge: {} for gauge in gauges}
+        started = []
+        for gauge, info in zip(gauges, infos):
+            for i in info:
+                if not i["nextStreamStart"]:
+                    reward_info[gauge][i["token"]] = i["periodFinish"]
+                elif i["nextStreamStart"] <= now:
+                    started.append((gauge, i["token"]))
+        if started:
+            finishes = await self._started_finishes(started, now, block)
+            for (gauge, token), finish in zip(started, finishes):
+                if finish is not None:
+                    reward_info[gauge][token] = finish
+        due = self.due(reward_info, now)
+
+        # every earlier top-up has confirmed unless `_resync` is set, the nonce is read again
+        self._nonce = None
+        # created here so they belong to the running event loop
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        nonce_lock = asyncio.Lock()
+        return await asyncio.gather(*(self._top_up(s, semaphore, nonce_lock) for s in due))
+
+    async def _started_finishes(self, started, now, block):
+        """
+        Returns the end of the current period of each (gauge, token) in `started`,
+        whose next scheduled stream has started but is not switched to yet. None
+        when a later stream is still queued, the stream is then already funded.
+        """
+        calls = []
+        for gauge, token in started:
+            calls.append((self.gauges[gauge].nextRewardStream, [token]))
+            calls.append((self.gauges[gauge].rewardStreamsLength, [token]))
+        indexes = await self._call(self.client.read, calls, block)
+
+        ranges = [range(indexes[2 * i], indexes[2 * i + 1]) for i in range(len(started))]
+        calls = [
+            (self.gauges[gauge].rewardStreams, [token, j])
+            for (gauge, token), streams in zip(started, ranges)
+            for j in streams
+        ]
+        results = iter(await self._call(self.client.read, calls, block))
+
+        finishes = []
+        for streams in ranges:
+            pending = [next(results) for _ in streams]
+            if not pending or any(start > now for start, _, _ in pending):
+                finishes.append(None)
+            else:
+                finishes.append(pending[-1][1])
+        return finishes
+
+    async def run(self, poll_interval=POLL_INTERVAL, max_checks=None):
+        """Check every `poll_blocks` blocks, forever or for `max_checks` checks"""
+        last_checked = None
+        checks = 0
+        while max_checks is None or checks < max_checks:
+            height = await self._call(lambda: chain.height)
+            if last_checked is None or height >= last_checked + self.poll_blocks:
+                last_checked = height
+                for top_up in await self.check():
+                    print(f"{top_up.stream.gauge} {top_up.stream.token}: {top_up.status}")
+                checks += 1
+            else:
+                await asyncio.sleep(poll_interval)
+
+    async def _top_up(self, stream, semaphore, nonce_lock):
+        txid = None
+        status = "failed"
+        async with semaphore:
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+            try:
+                async with nonce_lock:
+                    tx = await self._call(self._send, stream)
+                txid = tx.txid
+                tx = await asyncio.wait_for(self._call(_confirm, tx), self.confirm_timeout)
+                txid = tx.txid
+                if tx.status == Status.Dropped:
+                    status = "dropped"
+                    self._resync = True
+                else:
+                    status = "confirmed" if tx.status == Status.Confirmed else "reverted"
+            except asyncio.TimeoutError:
+                status = "timeout"
+                self._resync = True
+                print(f"Top-up of {stream.token} on {stream.gauge} is not confirmed: {txid}")
+            except Exception as exc:
+                print(f"Top-up of {stream.token} on {stream.gauge} failed: {exc}")
+            finally:
+                self._in_flight -= 1
+
+        top_up = TopUp(stream, txid, status)
+        self.history.append(top_up)
+        return top_up
+
+    def _send(self, stream):
+        # called with the nonce lock held, so nonces are assigned in order
+        if self._nonce is None:
+            block = "latest" if self._resync else "pending"
+            self._nonce = web3.eth.get_transaction_count(str(self.keeper), block)
+            self._resync = False
+        tx_params = {"from": self.keeper, "nonce": self._nonce, "required_confs": 0}
+        if self.gas_price is not None:
+            tx_params["gas_price"] = self.gas_price
+        try:
+            tx = self.gauges[stream.gauge].notifyRewardAmount(
+                stream.token, stream.amount, tx_params
+            )
+        except Exception:
+            # the nonce may or may not have been used, read it again next time
+            self._nonce = None
+            raise
+        self._nonce += 1
+        return tx
+
+    async def _call(self, fn, *args):
+        # brownie is synchronous, run each call in the default thread pool
+        return await asyncio.get_event_loop().run_in_executor(None, fn, *args)
+
+
+def _confirm(tx):
+    """
+    Wait for one confirmation of `tx`. Returns the transaction mined at its nonce,
+    which is a replacement sent by the gas strategy when `tx` was dropped.
+    """
+    tx.wait(1)
+    if tx.status == Status.Dropped:
+        for replacement in history.filter(sender=tx.sender, nonce=tx.nonce):
+            if replacement.txid != tx.txid:
+                replacement.wait(1)
+                if replacement.status != Status.Dropped:
+                    return replacement
+    return tx
+
+
+def main():
+    keeper = RewardKeeper(
+        MultiRewardsLens.at(LENS_ADDRESS),
+        MulticallClient(),
+        STREAMS,
+        KEEPER,
+        gas_price=gas_strategy,
+    )
+    print(f"Watching {len(STREAMS)} reward streams")
+    asyncio.run(keeper.run())
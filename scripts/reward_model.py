@@ -0,0 +1,323 @@
+"""
+Integer-exact reference model of the `MultiRewards` accounting.
+
+Every mutative method takes the block timestamp as `now` and mirrors the
+contract's arithmetic, including rounding, so stored state can be compared
+value for value with a deployed contract. Calls the contract would reject
+raise `ModelRevert`. Ownership and pausing are not modelled.
+"""
+
+from collections import defaultdict
+
+PRECISION = 10 ** 18
+MAX_SCHEDULED_STREAMS = 16
+
+
+class ModelRevert(Exception):
+    """Raised wherever the contract would revert"""
+
+
+class Reward:
+    __slots__ = (
+        "rewards_distributor",
+        "rewards_duration",
+        "period_finish",
+        "reward_rate",
+        "last_update_time",
+        "reward_per_token_stored",
+        "next_stream_start",
+    )
+
+    def __init__(self, rewards_distributor, rewards_duration):
+        self.rewards_distributor = rewards_distributor
+        self.rewards_duration = rewards_duration
+        self.period_finish = 0
+        self.reward_rate = 0
+        self.last_update_time = 0
+        self.reward_per_token_stored = 0
+        self.next_stream_start = 0
+
+    def as_tuple(self):
+        """Fields in the order returned by `MultiRewards.rewardData`"""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def copy(self):
+        data = Reward(self.rewards_distributor, self.rewards_duration)
+        for name in self.__slots__:
+            setattr(data, name, getattr(self, name))
+        return data
+
+
+class MultiRewardsModel:
+    def __init__(self):
+        self.total_supply = 0
+        self.balances = defaultdict(int)
+        self.reward_tokens = []
+        self.retired_reward_tokens = []
+        self.reward_data = {}
+        # reward token -> [(start, period finish, reward rate)], and the next one to start
+        self.reward_streams = defaultdict(list)
+        self.next_reward_stream = defaultdict(int)
+        # (account, reward token) -> amount
+        self.user_reward_per_token_paid = defaultdict(int)
+        self.rewards = defaultdict(int)
+
+    # views
+
+    def last_time_reward_applicable(self, token, now):
+        return min(now, self._current_reward_data(token, now).period_finish)
+
+    def reward_per_token(self, token, now):
+        data = self._current_reward_data(token, now)
+        if self.total_supply == 0:
+            return data.reward_per_token_stored
+        elapsed = min(now, data.period_finish) - data.last_update_time
+        return (
+            data.reward_per_token_stored
+            + elapsed * data.reward_rate * PRECISION // self.total_supply
+        )
+
+    def earned(self, account, token, now):
+        paid = self.user_reward_per_token_paid[account, token]
+        accrued = self.balances[account] * (self.reward_per_token(token, now) - paid)
+        return accrued // PRECISION + self.rewards[account, token]
+
+    def get_reward_for_duration(self, token):
+        data = self.reward_data[token]
+        return data.reward_rate * data.rewards_duration
+
+    def _current_reward_data(self, token, now):
+        data = self.reward_data[token]
+        if data.next_stream_start and data.next_stream_start <= now:
+            data = data.copy()
+            self._advance_streams(token, data, now)
+        return data
+
+    # checkpoints
+
+    def _advance_streams(self, token, data, now):
+        # switch `data` to every stream started by `now`, returns the next stream index
+        streams = self.reward_streams[token]
+        index = self.next_reward_stream[token]
+        while data.next_stream_start and data.next_stream_start <= now:
+            if self.total_supply:
+                elapsed = data.period_finish - data.last_update_time
+                accrued = elapsed * data.reward_rate * PRECISION // self.total_supply
+                data.reward_per_token_stored += accrued
+            start, finish, rate = streams[index]
+            data.reward_rate = rate
+            data.last_update_time = start
+            data.period_finish = finish
+            index += 1
+            data.next_stream_start = streams[index][0] if index < len(streams) else 0
+        return index
+
+    def _update_reward_token(self, token, account, now):
+        data = self.reward_data[token]
+        self.next_reward_stream[token] = self._advance_streams(token, data, now)
+        data.reward_per_token_stored = self.reward_per_token(token, now)
+        data.last_update_time = self.last_time_reward_applicable(token, now)
+        if account is not None:
+            self.rewards[account, token] = self.earned(account, token, now)
+            self.user_reward_per_token_paid[account, token] = data.reward_per_token_stored
+
+    def _update_reward(self, account, now):
+        # tokens the contract skips as inactive or retired have a settled accumulator,
+        # so checkpointing them here changes nothing
+        for token in self.reward_tokens + self.retired_reward_tokens:
+            self._update_reward_token(token, account, now)
+
+    def _pay_reward(self, account, token):
+        reward = self.rewards[account, token]
+        self.rewards[account, token] = 0
+        return reward
+
+    def _validate_notify(self, sender, token, now):
+        # the contract reverts the whole call, so validate before changing anything
+        data = self.reward_data.get(token)
+        if data is None or data.rewards_distributor != sender:
+            raise ModelRevert("Not the rewards distributor")
+        if data.rewards_duration == 0:
+            raise ModelRevert("SafeMath: division by zero")
+        next_stream_start = self._current_reward_data(token, now).next_stream_start
+        if next_stream_start and now + data.rewards_duration > next_stream_start:
+            raise ModelRevert("Overlaps a scheduled period")
+
+    def _notify_reward_amount(self, sender, token, reward, now):
+        data = self.reward_data[token]
+        if now >= data.period_finish:
+            data.reward_rate = reward // data.rewards_duration
+        else:
+            leftover = (data.period_finish - now) * data.reward_rate
+            data.reward_rate = (reward + leftover) // data.rewards_duration
+
+        data.last_update_time = now
+        data.period_finish = now + data.rewards_duration
+
+    # mutative functions
+
+    def add_reward(self, token, distributor, duration):
+        if token in self.reward_data:
+            raise ModelRevert("Reward already added")
+        self.reward_tokens.append(token)
+        self.reward_data[token] = Reward(distributor, duration)
+
+    def set_rewards_distributor(self, token, distributor):
+        if token in self.retired_reward_tokens:
+            raise ModelRevert("Reward token is retired")
+        self.reward_data[token].rewards_distributor = distributor
+
+    def retire_reward(self, token, now):
+        if token in self.reward_data:
+            data = self._current_reward_data(token, now)
+            if now < data.period_finish or data.next_stream_start:
+                raise ModelRevert("Reward period still active")
+        if token not in self.reward_tokens:
+            raise ModelRevert("Not a reward token")
+        self._update_reward(None, now)
+        # swap and pop, so the order of `reward_tokens` matches the contract
+        index = self.reward_tokens.index(token)
+        self.reward_tokens[index] = self.reward_tokens[-1]
+        self.reward_tokens.pop()
+        self.retired_reward_tokens.append(token)
+        self.reward_data[token].rewards_distributor = None
+
+    def stake(self, account, amount, now):
+        if amount == 0:
+            raise ModelRevert("Cannot stake 0")
+        self._update_reward(account, now)
+        self.total_supply += amount
+        self.balances[account] += amount
+
+    def withdraw(self, account, amount, now):
+        if amount == 0:
+            raise ModelRevert("Cannot withdraw 0")
+        if amount > self.balances[account]:
+            raise ModelRevert("SafeMath: subtraction overflow")
+        self._update_reward(account, now)
+        self.total_supply -= amount
+        self.balances[account] -= amount
+
+    def transfer(self, sender, recipient, amount, now):
+        """Move staked balance, checkpointing both accounts"""
+        if amount > self.balances[sender]:
+            raise ModelRevert("SafeMath: subtraction overflow")
+        self._update_reward(sender, now)
+        self._update_reward(recipient, now)
+        self.balances[sender] -= amount
+        self.balances[recipient] += amount
+
+    def get_reward(self, account, now):
+        """Returns {reward token: amount paid} for every non-zero payout"""
+        self._update_reward(account, now)
+        paid = {token: self._pay_reward(account, token) for token in self.reward_tokens}
+        return {token: amount for token, amount in paid.items() if amount}
+
+    def get_reward_for_tokens(self, account, tokens, now):
+        paid = {}
+        for token in tokens:
+            if token not in self.reward_data:
+                continue
+            self._update_reward_token(token, account, now)
+            amount = self._pay_reward(account, token)
+            if amount:
+                paid[token] = paid.get(token, 0) + amount
+        return paid
+
+    def get_reward_for(self, accounts, now):
+        """Returns [(account, reward token, amount paid)] for every non-zero payout, in order"""
+        self._update_reward(None, now)
+        paid = []
+        for account in accounts:
+            for token in self.reward_tokens:
+                self._update_reward_token(token, account, now)
+                amount = self._pay_reward(account, token)
+                if amount:
+                    paid.append((account, token, amount))
+            for token in self.retired_reward_tokens:
+                self._update_reward_token(token, account, now)
+        return paid
+
+    def compound(self, account, token, now):
+        """Restake the `token` rewards of `account`, `token` being the staking token"""
+        if token not in self.reward_data:
+            raise ModelRevert("Staking token is not a reward token")
+        self._update_reward(account, now)
+        return self._compound(account, token)
+
+    def compound_for(self, accounts, token, now):
+        """Returns [(account, amount restaked)] for every non-zero amount, in order"""
+        if token not in self.reward_data:
+            raise ModelRevert("Staking token is not a reward token")
+        self._update_reward(None, now)
+        restaked = []
+        for account in accounts:
+            self._update_reward(account, now)
+            amount = self._compound(account, token)
+            if amount:
+                restaked.append((account, amount))
+        return restaked
+
+    def get_retired_rewards(self, account, now):
+        """Returns {retired reward token: amount paid} for every non-zero payout"""
+        for token in self.retired_reward_tokens:
+            self._update_reward_token(token, account, now)
+        paid = {token: self._pay_reward(account, token) for token in self.retired_reward_tokens}
+        return {token: amount for token, amount in paid.items() if amount}
+
+    def _compound(self, account, token):
+        amount = self._pay_reward(account, token)
+        self.total_supply += amount
+        self.balances[account] += amount
+        return amount
+
+    def exit(self, account, now):
+        """Returns (amount withdrawn, {reward token: amount paid})"""
+        amount = self.balances[account]
+        self.withdraw(account, amount, now)
+        paid = {token: self._pay_reward(account, token) for token in self.reward_tokens}
+        return amount, {token: amount for token, amount in paid.items() if amount}
+
+    def notify_reward_amount(self, sender, token, reward, now):
+        self._validate_notify(sender, token, now)
+        self._update_reward(None, now)
+        self._notify_reward_amount(sender, token, reward, now)
+
+    def notify_reward_amounts(self, sender, tokens, rewards, now):
+        if len(tokens) != len(rewards):
+            raise ModelRevert("Array lengths differ")
+        for token in tokens:
+            self._validate_notify(sender, token, now)
+        self._update_reward(None, now)
+        for token, reward in zip(tokens, rewards):
+            self._notify_reward_amount(sender, token, reward, now)
+
+    def schedule_reward_amount(self, sender, token, reward, start, duration, now):
+        data = self.reward_data.get(token)
+        if data is None or data.rewards_distributor != sender:
+            raise ModelRevert("Not the rewards distributor")
+        if duration == 0:
+            raise ModelRevert("Reward duration must be non-zero")
+        if start < now:
+            raise ModelRevert("Stream starts in the past")
+        streams = self.reward_streams[token]
+        pending = len(streams) - self.next_reward_stream[token]
+        if pending >= MAX_SCHEDULED_STREAMS:
+            raise ModelRevert("Too many scheduled streams")
+        previous_finish = streams[-1][1] if pending else data.period_finish
+        if start < previous_finish:
+            raise ModelRevert("Overlaps a scheduled period")
+
+        streams.append((start, start + duration, reward // duration))
+        if not pending:
+            data.next_stream_start = start
+
+    def set_rewards_duration(self, sender, token, duration, now):
+        data = self.reward_data.get(token)
+        if data is None or now <= data.period_finish:
+            raise ModelRevert("Reward period still active")
+        if data.rewards_distributor != sender:
+            raise ModelRevert("Not the rewards distributor")
+        if duration == 0:
+            raise ModelRevert("Reward duration must be non-zero")
+        data.rewards_duration = duration
@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+from brownie_tokens.template import ERC20
+
+REWARD_DURATION = 7 * 86400
+
+BUDGETS_PATH = Path(__file__).parent.joinpath("gas_budgets.json")
+REPORT_PATH = Path(
+    os.environ.get("GAS_REPORT_PATH", Path(__file__).parents[2].joinpath("reports/gas.json"))
+)
+
+
+@pytest.fixture(scope="session")
+def reward_duration():
+    return REWARD_DURATION
+
+
+# Register `n` reward tokens distributed by Alice and start a period for each
+@pytest.fixture(scope="module")
+def add_reward_tokens(multi, alice):
+    def _add(n, amount=10 ** 18):
+        tokens = []
+        for i in range(n):
+            token = ERC20()
+            token._mint_for_testing(alice, 10 * amount, {"from": alice})
+            token.approve(multi, 2 ** 256 - 1, {"from": alice})
+            multi.addReward(token, alice, REWARD_DURATION, {"from": alice})
+            multi.notifyRewardAmount(token, amount, {"from": alice})
+            tokens.append(token)
+        return tokens
+
+    return _add
+
+
+# Stake from `n` accounts other than Alice and Bob so the gauge has company
+@pytest.fixture(scope="module")
+def add_stakers(multi, accounts, base_token):
+    def _add(n, amount=10 ** 18):
+        stakers = accounts[2 : 2 + n]
+        for acct in stakers:
+            base_token._mint_for_testing(acct, amount)
+            base_token.approve(multi, amount, {"from": acct})
+            multi.stake(amount, {"from": acct})
+        return stakers
+
+    return _add
+
+
+# Budgets are linear in the number of registered reward tokens
+@pytest.fixture(scope="session")
+def gas_budgets():
+    with BUDGETS_PATH.open() as fp:
+        return json.load(fp)
+
+
+# Every measurement of the session, written as JSON and printed as a table on teardown
+@pytest.fixture(scope="session")
+def gas_report():
+    records = []
+    yield records
+
+    if not records:
+        return
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with REPORT_PATH.open("w") as fp:
+        json.dump(records, fp, indent=2, sort_keys=True)
+
+    print(f"\n{'function':<24}{'tokens':>8}{'stakers':>8}{'gas':>12}{'budget':>12}")
+    for r in sorted(records, key=lambda r: (r["function"], r["reward_tokens"], r["stakers"])):
+        print(
+            f"{r['function']:<24}{r['reward_tokens']:>8}{r['stakers']:>8}"
+            f"{r['gas_used']:>12}{r['budget']:>12}"
+        )
+    print(f"Gas report written to {REPORT_PATH}")
+
+
+# Record the gas used by a transaction and fail if it exceeds the stored budget, tagged
+# with the test so `scripts/gas_deltas.py` only compares measurements taken together
+@pytest.fixture
+def record_gas(gas_budgets, gas_report, request):
+    def _record(fn, tx, reward_tokens, stakers):
+        budget = gas_budgets[fn]["base"] + gas_budgets[fn]["per_token"] * reward_tokens
+        gas_report.append(
+            {
+                "test": request.node.name,
+                "function": fn,
+                "reward_tokens": reward_tokens,
+                "stakers": stakers,
+                "gas_used": tx.gas_used,
+                "budget": budget,
+            }
+        )
+        assert tx.gas_used <= budget, f"{fn} used {tx.gas_used} gas, budget is {budget}"
+
+    return _record
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+
+import pytest
+from brownie_tokens.template import ERC20
+
+ENTRY_POINTS = ("stake", "withdraw", "getReward", "notifyRewardAmount", "exit")
+
+
+# The gauge as it was before the gas work, with the same staking token and owner
+@pytest.fixture(scope="module")
+def baseline(BaselineMultiRewards, base_token, alice):
+    return BaselineMultiRewards.deploy(alice, base_token, {"from": alice})
+
+
+def _measure(gauge, base_token, alice, bob, chain, n_tokens, reward_duration):
+    tokens = []
+    for _ in range(n_tokens):
+        token = ERC20()
+        token._mint_for_testing(alice, 2 * 10 ** 18, {"from": alice})
+        token.approve(gauge, 2 ** 256 - 1, {"from": alice})
+        gauge.addReward(token, alice, reward_duration, {"from": alice})
+        gauge.notifyRewardAmount(token, 10 ** 18, {"from": alice})
+        tokens.append(token)
+    base_token.approve(gauge, 2 ** 256 - 1, {"from": bob})
+
+    # the first stake initializes bob's checkpoints, later calls only update them
+    gauge.stake(10 ** 18, {"from": bob})
+    chain.sleep(3600)
+
+    txs = {"stake": gauge.stake(10 ** 18, {"from": bob})}
+    chain.sleep(3600)
+    txs["withdraw"] = gauge.withdraw(10 ** 18, {"from": bob})
+    chain.sleep(3600)
+    txs["getReward"] = gauge.getReward({"from": bob})
+    chain.sleep(3600)
+    # checkpoints every accumulator without an account, the old `updateReward(address(0))`
+    txs["notifyRewardAmount"] = gauge.notifyRewardAmount(tokens[0], 10 ** 18, {"from": alice})
+    chain.sleep(3600)
+    txs["exit"] = gauge.exit({"from": bob})
+    return txs
+
+
+# Gas used by each user action on the baseline contract and on the current one, side by side
+# in the report
+@pytest.mark.parametrize("n_tokens", range(1, 11))
+def test_baseline_gas(
+    multi, baseline, base_token, alice, bob, chain, record_gas, reward_duration, n_tokens
+):
+    before = _measure(baseline, base_token, alice, bob, chain, n_tokens, reward_duration)
+    after = _measure(multi, base_token, alice, bob, chain, n_tokens, reward_duration)
+
+    for fn in ENTRY_POINTS:
+        record_gas(f"baseline.{fn}", before[fn], n_tokens, 1)
+        record_gas(fn, after[fn], n_tokens, 1)
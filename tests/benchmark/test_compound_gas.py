@@ -0,0 +1,22 @@
+#!/usr/bin/python3
+
+
+# Compounding costs less than claiming, approving and staking the reward again
+def test_compound_gas(multi, base_token, alice, chain, record_gas, add_reward_tokens, add_stakers):
+    tokens = add_reward_tokens(2)
+    base_token._mint_for_testing(alice, 10 ** 20)
+    base_token.approve(multi, 2 ** 256 - 1, {"from": alice})
+    multi.addReward(base_token, alice, 86400, {"from": alice})
+    multi.notifyRewardAmount(base_token, 10 ** 18, {"from": alice})
+    staker = add_stakers(1)[0]
+    chain.sleep(3600)
+
+    tx = multi.compound({"from": staker})
+    record_gas("compound", tx, len(tokens) + 1, 1)
+    chain.undo()
+
+    claim = multi.getReward({"from": staker})
+    reward = [e for e in claim.events["RewardPaid"] if e["rewardsToken"] == base_token][0]
+    approve = base_token.approve(multi, reward["reward"], {"from": staker})
+    stake = multi.stake(reward["reward"], {"from": staker})
+    assert tx.gas_used < claim.gas_used + approve.gas_used + stake.gas_used
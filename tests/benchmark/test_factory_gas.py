@@ -0,0 +1,23 @@
+#!/usr/bin/python3
+
+import pytest
+from brownie_tokens.template import ERC20
+
+
+# A clone costs a fraction of deploying the full MultiRewards bytecode
+def test_clone_deploy_gas(MultiRewards, factory, base_token, alice, record_gas):
+    full = MultiRewards.deploy(alice, base_token, {"from": alice}).tx
+    record_gas("deployFull", full, 0, 0)
+
+    tx = factory.deploy(alice, base_token, {"from": alice})
+    record_gas("deploy", tx, 0, 0)
+    assert tx.gas_used * 5 < full.gas_used
+
+
+# Batch deployment spreads the base transaction cost over every gauge
+@pytest.mark.parametrize("n_gauges", [2, 5, 10])
+def test_deploy_many_gas(factory, alice, n_gauges):
+    single = factory.deploy(alice, ERC20(), {"from": alice}).gas_used
+
+    tx = factory.deployMany(alice, [ERC20() for i in range(n_gauges)], {"from": alice})
+    assert tx.gas_used // n_gauges < single
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+
+import pytest
+
+from scripts.gas_scaling import (
+    ENTRY_POINTS,
+    fit_linear,
+    max_reward_tokens,
+    measure_gas,
+    scaling_report,
+)
+
+# every user action must fit in a block with at least this many reward tokens
+MIN_REWARD_TOKENS = 50
+BLOCK_GAS_TARGET = 15_000_000
+
+
+def test_fit_linear():
+    assert fit_linear([(1, 150), (2, 250), (4, 450)]) == pytest.approx((50, 100))
+
+
+def test_fit_needs_two_counts():
+    with pytest.raises(ValueError):
+        fit_linear([(3, 100), (3, 110)])
+
+
+def test_max_reward_tokens():
+    assert max_reward_tokens(50, 100, 1050) == 10
+    assert max_reward_tokens(50, 100, 1049) == 9
+    assert max_reward_tokens(2000, 100, 1000) == 0
+    assert max_reward_tokens(50, 0, 1000) is None
+
+
+# Measured gas is linear in the reward token count and stays under the block gas
+# target with the supported number of reward tokens
+def test_reward_token_scaling_limit(multi, base_token, alice):
+    results = measure_gas(multi, base_token, alice, [1, 2, 4, 8])
+    report = scaling_report(results, {"target": BLOCK_GAS_TARGET})
+
+    for fn in ENTRY_POINTS:
+        intercept, slope = fit_linear(results[fn])
+        assert slope > 0
+        for count, gas_used in results[fn]:
+            assert gas_used == pytest.approx(intercept + slope * count, rel=0.05)
+        assert report[fn]["max_reward_tokens"]["target"] >= MIN_REWARD_TOKENS
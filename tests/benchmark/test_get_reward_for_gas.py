@@ -0,0 +1,17 @@
+#!/usr/bin/python3
+
+import pytest
+
+
+# Claiming for many accounts in one transaction costs less per account than getReward
+@pytest.mark.parametrize("n_tokens", [1, 5])
+def test_get_reward_for_gas(multi, alice, bob, chain, add_reward_tokens, add_stakers, n_tokens):
+    add_reward_tokens(n_tokens)
+    stakers = add_stakers(8)
+    multi.setClaimRelayer(alice, True, {"from": alice})
+    chain.sleep(3600)
+
+    batch = multi.getRewardFor(stakers, {"from": alice}).gas_used
+    chain.undo()
+    single = multi.getReward({"from": stakers[0]}).gas_used
+    assert batch // len(stakers) < single
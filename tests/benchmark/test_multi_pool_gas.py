@@ -0,0 +1,28 @@
+#!/usr/bin/python3
+
+import pytest
+from brownie_tokens.template import ERC20
+
+
+# One claim across pools that share a reward token costs less than a claim per pool
+@pytest.mark.parametrize("n_pools", [2, 5])
+def test_get_reward_many_gas(MultiPoolRewards, alice, bob, chain, reward_duration, n_pools):
+    multi_pool = MultiPoolRewards.deploy(alice, {"from": alice})
+    reward = ERC20()
+    reward._mint_for_testing(alice, 10 ** 20)
+    reward.approve(multi_pool, 2 ** 256 - 1, {"from": alice})
+
+    for pool_id in range(n_pools):
+        lp_token = ERC20()
+        lp_token._mint_for_testing(bob, 10 ** 18)
+        lp_token.approve(multi_pool, 10 ** 18, {"from": bob})
+        multi_pool.addPool(lp_token, {"from": alice})
+        multi_pool.addReward(pool_id, reward, alice, reward_duration, {"from": alice})
+        multi_pool.stake(pool_id, 10 ** 18, {"from": bob})
+        multi_pool.notifyRewardAmount(pool_id, reward, 10 ** 18, {"from": alice})
+    chain.sleep(3600)
+
+    many = multi_pool.getRewardMany(list(range(n_pools)), {"from": bob}).gas_used
+    chain.undo()
+    separate = sum(multi_pool.getReward(i, {"from": bob}).gas_used for i in range(n_pools))
+    assert many < separate
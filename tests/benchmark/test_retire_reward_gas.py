@@ -0,0 +1,24 @@
+#!/usr/bin/python3
+
+
+# Retiring a finished token takes its share out of every later claim
+def test_retire_reward_gas(
+    multi, base_token, alice, bob, chain, add_reward_tokens, record_gas, reward_duration
+):
+    tokens = add_reward_tokens(4)
+    base_token.approve(multi, 2 ** 256 - 1, {"from": bob})
+    multi.stake(10 ** 18, {"from": bob})
+    chain.sleep(reward_duration + 1)
+    # the first claim settles and deactivates every finished token
+    multi.getReward({"from": bob})
+    before = multi.getReward({"from": bob})
+
+    tx = multi.retireReward(tokens[0], {"from": alice})
+    record_gas("retireReward", tx, len(tokens), 1)
+
+    # the next checkpoint settles the retired token once, later ones skip it
+    multi.getReward({"from": bob})
+    after = multi.getReward({"from": bob})
+    record_gas("getReward", before, len(tokens), 1)
+    record_gas("getReward", after, len(tokens) - 1, 1)
+    assert after.gas_used < before.gas_used
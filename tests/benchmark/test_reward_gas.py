@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+
+import pytest
+from brownie_tokens.template import ERC20
+
+
+# Gas used by every entry point as the number of reward tokens and stakers grows
+@pytest.mark.parametrize("n_stakers", [1, 8])
+@pytest.mark.parametrize("n_tokens", range(1, 11))
+def test_entry_point_gas(
+    multi,
+    base_token,
+    alice,
+    bob,
+    chain,
+    add_reward_tokens,
+    add_stakers,
+    record_gas,
+    reward_duration,
+    n_tokens,
+    n_stakers,
+):
+    tokens = add_reward_tokens(n_tokens)
+    add_stakers(n_stakers - 1)
+    base_token.approve(multi, 2 ** 256 - 1, {"from": bob})
+
+    # the first stake initializes bob's checkpoints, later calls only update them
+    multi.stake(10 ** 18, {"from": bob})
+    chain.sleep(3600)
+
+    tx = multi.stake(10 ** 18, {"from": bob})
+    record_gas("stake", tx, n_tokens, n_stakers)
+    chain.sleep(3600)
+
+    tx = multi.withdraw(10 ** 18, {"from": bob})
+    record_gas("withdraw", tx, n_tokens, n_stakers)
+    chain.sleep(3600)
+
+    tx = multi.getReward({"from": bob})
+    assert len(tx.events["RewardPaid"]) == n_tokens
+    record_gas("getReward", tx, n_tokens, n_stakers)
+    chain.sleep(3600)
+
+    tx = multi.notifyRewardAmount(tokens[0], 10 ** 18, {"from": alice})
+    record_gas("notifyRewardAmount", tx, n_tokens, n_stakers)
+    chain.sleep(3600)
+
+    tx = multi.exit({"from": bob})
+    record_gas("exit", tx, n_tokens, n_stakers)
+
+    stray_token = ERC20()
+    stray_token._mint_for_testing(multi, 10 ** 18)
+    tx = multi.recoverERC20(stray_token, 10 ** 18, {"from": alice})
+    record_gas("recoverERC20", tx, n_tokens, n_stakers)
+
+    chain.sleep(reward_duration)
+    tx = multi.setRewardsDuration(tokens[0], reward_duration * 2, {"from": alice})
+    record_gas("setRewardsDuration", tx, n_tokens, n_stakers)
+
+
+# Packed fields round-trip through the public getter
+def test_packed_reward_data(multi, alice, add_reward_tokens, reward_duration):
+    (token,) = add_reward_tokens(1)
+    data = multi.rewardData(token)
+    assert data["rewardsDistributor"] == alice
+    assert data["rewardsDuration"] == reward_duration
+    assert data["periodFinish"] == data["lastUpdateTime"] + reward_duration
+    assert data["rewardRate"] == 10 ** 18 // reward_duration
+    assert data["rewardPerTokenStored"] == 0
+
+
+# An account that lags one deactivation behind settles only that token on its next
+# checkpoint, so the extra cost does not grow with the number of reward tokens
+@pytest.mark.parametrize("n_tokens", [1, 4, 10])
+def test_lagging_checkpoint_gas(
+    multi, base_token, alice, bob, chain, add_reward_tokens, add_stakers, record_gas, n_tokens
+):
+    add_reward_tokens(n_tokens)
+    short_token = ERC20()
+    short_token._mint_for_testing(alice, 10 ** 18)
+    short_token.approve(multi, 2 ** 256 - 1, {"from": alice})
+    multi.addReward(short_token, alice, 3600, {"from": alice})
+    multi.notifyRewardAmount(short_token, 10 ** 18, {"from": alice})
+
+    (staker,) = add_stakers(1)
+    base_token.approve(multi, 2 ** 256 - 1, {"from": bob})
+    multi.stake(10 ** 18, {"from": bob})
+    chain.sleep(7200)
+
+    # another account's checkpoint drops the expired token, bob's epoch now lags behind
+    multi.getReward({"from": staker})
+    assert multi.rewardsEpoch() == 1
+
+    tx = multi.stake(10 ** 18, {"from": bob})
+    record_gas("stakeAfterDeactivation", tx, n_tokens + 1, 2)
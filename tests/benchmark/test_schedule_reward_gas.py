@@ -0,0 +1,27 @@
+#!/usr/bin/python3
+
+from brownie_tokens.template import ERC20
+
+STREAM_DURATION = 60
+
+
+# A checkpoint that switches through a full queue of streams stays within the stake budget
+def test_switch_all_streams_gas(multi, alice, chain, record_gas, add_stakers):
+    token = ERC20()
+    token._mint_for_testing(alice, 10 ** 20, {"from": alice})
+    token.approve(multi, 2 ** 256 - 1, {"from": alice})
+    multi.addReward(token, alice, STREAM_DURATION, {"from": alice})
+    stakers = add_stakers(1)
+
+    start = chain.time() + 100
+    limit = multi.MAX_SCHEDULED_STREAMS()
+    for i in range(limit):
+        tx = multi.scheduleRewardAmount(
+            token, 10 ** 18, start + i * STREAM_DURATION, STREAM_DURATION, {"from": alice}
+        )
+    record_gas("scheduleRewardAmount", tx, 1, len(stakers))
+
+    chain.sleep(100 + limit * STREAM_DURATION)
+    tx = multi.stake(10 ** 17, {"from": alice})
+    assert multi.nextRewardStream(token) == limit
+    record_gas("stake", tx, 1, len(stakers))
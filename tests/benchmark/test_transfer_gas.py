@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+
+import pytest
+
+
+# Moving a position costs less than exiting and staking it again from the new wallet
+@pytest.mark.parametrize("n_tokens", [1, 4, 10])
+def test_transfer_gas(
+    multi, base_token, chain, record_gas, add_reward_tokens, add_stakers, n_tokens
+):
+    add_reward_tokens(n_tokens)
+    sender, recipient = add_stakers(2)
+    base_token.approve(multi, 2 ** 256 - 1, {"from": recipient})
+    chain.sleep(3600)
+
+    tx = multi.transfer(recipient, 10 ** 18, {"from": sender})
+    record_gas("transfer", tx, n_tokens, 2)
+    chain.undo()
+
+    exit_tx = multi.exit({"from": sender})
+    base_token.transfer(recipient, 10 ** 18, {"from": sender})
+    stake_tx = multi.stake(10 ** 18, {"from": recipient})
+    record_gas("exit", exit_tx, n_tokens, 2)
+    record_gas("stake", stake_tx, n_tokens, 2)
+    assert tx.gas_used < exit_tx.gas_used + stake_tx.gas_used
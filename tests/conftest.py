@@ -1,8 +1,11 @@
 #!/usr/bin/python3
 
 import pytest
+from brownie import ZERO_ADDRESS
 from brownie_tokens.template import ERC20
 
+from scripts.multicall import MulticallClient
+
 
 # Reset
 @pytest.fixture(scope="function", autouse=True)
@@ -18,6 +21,53 @@ def multi(MultiRewards, base_token, alice, bob):
     return _mr
 
 
+# Multi-pool contract with pool 0 staking the base token and pool 1 a second LP token
+@pytest.fixture(scope="module")
+def multi_pool(MultiPoolRewards, base_token, lp_token, accounts, alice):
+    _mp = MultiPoolRewards.deploy(alice, {"from": alice})
+    _mp.addPool(base_token, {"from": alice})
+    _mp.addPool(lp_token, {"from": alice})
+    for acct in accounts[:5]:
+        base_token.approve(_mp, 2 ** 256 - 1, {"from": acct})
+        lp_token.approve(_mp, 2 ** 256 - 1, {"from": acct})
+    return _mp
+
+
+# Second staking token with the same balances as the base token
+@pytest.fixture(scope="module")
+def lp_token(accounts, alice):
+    token = ERC20()
+    token._mint_for_testing(alice, 10 ** 18, {"from": alice})
+    for idx in range(1, 5):
+        token._mint_for_testing(accounts[idx], 10 ** 19)
+    return token
+
+
+# Deploy the stateless lens used for batched reads
+@pytest.fixture(scope="module")
+def lens(MultiRewardsLens, alice):
+    return MultiRewardsLens.deploy({"from": alice})
+
+
+# Factory cloning a MultiRewards implementation that is never used directly
+@pytest.fixture(scope="module")
+def factory(MultiRewards, MultiRewardsFactory, alice):
+    implementation = MultiRewards.deploy(alice, ZERO_ADDRESS, {"from": alice})
+    return MultiRewardsFactory.deploy(alice, implementation, {"from": alice})
+
+
+# Deploy the Multicall used by the batched read client
+@pytest.fixture(scope="module")
+def multicall(Multicall, alice):
+    return Multicall.deploy({"from": alice})
+
+
+# Fresh read client per test, cached results do not survive chain reverts
+@pytest.fixture
+def client(multicall):
+    return MulticallClient(multicall)
+
+
 # Instantiate base token and provide 5 addresses a balance
 @pytest.fixture(scope="module")
 def base_token(accounts, alice):
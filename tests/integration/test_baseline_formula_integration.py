@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+
+import random
+
+import pytest
+from brownie_tokens.template import ERC20
+
+# reward durations and amounts chosen so that every accrual rounds
+REWARDS = [(60, 10 ** 18 + 7), (333, 10 ** 15 + 1), (1000, 10 ** 6 + 999)]
+
+
+class BaselineRewards:
+    """
+    The accounting of the contract before the gas work, a checkpoint updates every
+    reward token with the unmodified `rewardPerToken` and `earned` formulas.
+    """
+
+    def __init__(self, tokens):
+        self.data = {token: {"rate": 0, "finish": 0, "last": 0, "stored": 0} for token in tokens}
+        self.paid = {}
+        self.rewards = {}
+        self.balances = {}
+        self.supply = 0
+
+    def reward_per_token(self, token, now):
+        data = self.data[token]
+        if self.supply == 0:
+            return data["stored"]
+        elapsed = min(now, data["finish"]) - data["last"]
+        return data["stored"] + elapsed * data["rate"] * 10 ** 18 // self.supply
+
+    def earned(self, account, token, now):
+        balance = self.balances.get(account, 0)
+        accrued = self.reward_per_token(token, now) - self.paid.get((account, token), 0)
+        return balance * accrued // 10 ** 18 + self.rewards.get((account, token), 0)
+
+    def update_reward(self, account, now):
+        for token, data in self.data.items():
+            data["stored"] = self.reward_per_token(token, now)
+            data["last"] = min(now, data["finish"])
+            if account is not None:
+                self.rewards[(account, token)] = self.earned(account, token, now)
+                self.paid[(account, token)] = data["stored"]
+
+    def notify(self, token, reward, duration, now):
+        self.update_reward(None, now)
+        data = self.data[token]
+        if now >= data["finish"]:
+            data["rate"] = reward // duration
+        else:
+            data["rate"] = (reward + (data["finish"] - now) * data["rate"]) // duration
+        data["last"] = now
+        data["finish"] = now + duration
+
+    def stake(self, account, amount, now):
+        self.update_reward(account, now)
+        self.supply += amount
+        self.balances[account] = self.balances.get(account, 0) + amount
+
+    def withdraw(self, account, amount, now):
+        self.update_reward(account, now)
+        self.supply -= amount
+        self.balances[account] -= amount
+
+    def get_reward(self, account, now):
+        self.update_reward(account, now)
+        for token in self.data:
+            self.rewards[(account, token)] = 0
+
+
+# Many short intervals between checkpoints, each one rounding down, leave every
+# accumulator and every account's reward exactly where the baseline formulas do
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_baseline_formulas(multi, base_token, accounts, alice, chain, seed):
+    rng = random.Random(seed)
+    tokens = []
+    for duration, _ in REWARDS:
+        token = ERC20()
+        token._mint_for_testing(alice, 10 ** 20)
+        token.approve(multi, 2 ** 256 - 1, {"from": alice})
+        multi.addReward(token, alice, duration, {"from": alice})
+        tokens.append(token)
+    stakers = accounts[1:4]
+    for acct in stakers:
+        base_token.approve(multi, 2 ** 256 - 1, {"from": acct})
+
+    baseline = BaselineRewards(tokens)
+    for (duration, reward), token in zip(REWARDS, tokens):
+        tx = multi.notifyRewardAmount(token, reward, {"from": alice})
+        baseline.notify(token, reward, duration, tx.timestamp)
+
+    for _ in range(40):
+        chain.sleep(rng.randint(1, 5))
+        acct = rng.choice(stakers)
+        action = rng.choice(["stake", "stake", "withdraw", "getReward", "notify"])
+        balance = baseline.balances.get(acct, 0)
+        if action == "withdraw" and balance > 0:
+            amount = rng.randint(1, balance)
+            tx = multi.withdraw(amount, {"from": acct})
+            baseline.withdraw(acct, amount, tx.timestamp)
+        elif action == "getReward":
+            tx = multi.getReward({"from": acct})
+            baseline.get_reward(acct, tx.timestamp)
+        elif action == "notify":
+            idx = rng.randrange(len(tokens))
+            duration, reward = REWARDS[idx]
+            tx = multi.notifyRewardAmount(tokens[idx], reward, {"from": alice})
+            baseline.notify(tokens[idx], reward, duration, tx.timestamp)
+            continue
+        else:
+            amount = rng.randint(1, 10 ** 18)
+            tx = multi.stake(amount, {"from": acct})
+            baseline.stake(acct, amount, tx.timestamp)
+
+        for token in tokens:
+            data = multi.rewardData(token)
+            assert data["rewardPerTokenStored"] == baseline.data[token]["stored"]
+            assert data["lastUpdateTime"] == baseline.data[token]["last"]
+            assert multi.rewards(acct, token) == baseline.rewards[(acct, token)]
+            assert multi.userRewardPerTokenPaid(acct, token) == baseline.paid[(acct, token)]
+
+    # once every period is over the views no longer depend on the time of the call
+    chain.sleep(max(duration for duration, _ in REWARDS) + 1)
+    chain.mine()
+    now = chain[-1].timestamp
+    for token in tokens:
+        assert multi.rewardPerToken(token) == baseline.reward_per_token(token, now)
+        for acct in stakers:
+            assert multi.earned(acct, token) == baseline.earned(acct, token, now)
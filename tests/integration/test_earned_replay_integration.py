@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+
+import pytest
+
+from scripts.earned_replay import RewardReplay, load_events, replay, reward_durations
+from scripts.event_indexer import EventIndexer
+
+
+@pytest.fixture
+def indexer(multi, tmp_path):
+    _indexer = EventIndexer(tmp_path.joinpath("events.db"), multi)
+    yield _indexer
+    _indexer.close()
+
+
+# Two stakers, two reward tokens, a transfer, a renewed period and a changed duration
+@pytest.fixture
+def history(multi, base_token, reward_token, slow_token, bob, charlie, chain):
+    base_token.approve(multi, 2 ** 256 - 1, {"from": bob})
+    base_token.approve(multi, 2 ** 256 - 1, {"from": charlie})
+    reward_token.approve(multi, 2 ** 256 - 1, {"from": bob})
+    multi.notifyRewardAmount(reward_token, 10 ** 18, {"from": bob})
+
+    multi.stake(5 * 10 ** 18, {"from": bob})
+    chain.sleep(10)
+    multi.stake(3 * 10 ** 18, {"from": charlie})
+    chain.sleep(20)
+    multi.withdraw(10 ** 18, {"from": bob})
+    chain.sleep(5)
+    multi.getReward({"from": charlie})
+    chain.sleep(20)
+    multi.transfer(charlie, 10 ** 18, {"from": bob})
+    chain.sleep(80)
+    multi.setRewardsDuration(reward_token, 120, {"from": bob})
+    multi.notifyRewardAmount(reward_token, 10 ** 17, {"from": bob})
+    chain.sleep(30)
+    multi.stake(10 ** 18, {"from": charlie})
+    chain.sleep(30)
+
+
+def _replayed_state(multi, indexer):
+    indexer.sync()
+    replayer = RewardReplay(reward_durations(multi, indexer))
+    replayer.apply(load_events(indexer))
+    return replayer
+
+
+# Earned amounts at later timestamps match what the contract pays out
+def test_earned_matches_payouts(multi, indexer, history, bob, charlie):
+    indexer.sync()
+    durations = reward_durations(multi, indexer)
+    events = list(load_events(indexer))
+
+    tx_bob = multi.getReward({"from": bob})
+    tx_charlie = multi.getReward({"from": charlie})
+    results = replay(events, durations, [tx_bob.timestamp, tx_charlie.timestamp])
+
+    for result, acct, tx in [(results[0], bob, tx_bob), (results[1], charlie, tx_charlie)]:
+        paid = {e["rewardsToken"]: e["reward"] for e in tx.events["RewardPaid"]}
+        assert result["earned"][acct.address] == paid
+        assert result["balances"][acct.address] == multi.balanceOf(acct)
+
+
+# Replayed storage matches the contract value for value
+def test_replayed_state_matches(multi, indexer, history, reward_token, slow_token, bob, charlie):
+    multi.getRewardForTokens([slow_token], {"from": bob})
+    replayer = _replayed_state(multi, indexer)
+    model = replayer.model
+
+    assert replayer.mismatches == []
+    assert model.total_supply == multi.totalSupply()
+    for token in (reward_token, slow_token):
+        data = model.reward_data[token.address]
+        assert data.as_tuple()[1:] == tuple(multi.rewardData(token))[1:]
+        for acct in (bob, charlie):
+            key = (acct.address, token.address)
+            assert model.rewards[key] == multi.rewards(acct, token)
+            paid = multi.userRewardPerTokenPaid(acct, token)
+            assert model.user_reward_per_token_paid[key] == paid
+
+
+# Targets before the last replayed event cannot be reported
+def test_cannot_look_back(multi, indexer, history, chain):
+    replayer = _replayed_state(multi, indexer)
+    with pytest.raises(ValueError):
+        replayer.earned_at(replayer.now - 1)
+
+
+# Indexing from the deployment registers every reward token from its events
+def test_tokens_from_events(multi, indexer, history, reward_token, slow_token):
+    indexer.sync()
+    assert reward_durations(multi, indexer) == {}
+
+    replayer = RewardReplay()
+    replayer.apply(load_events(indexer))
+    assert replayer.model.reward_tokens == [reward_token.address, slow_token.address]
+
+
+# Scheduled streams switch over in the replay as they do on chain
+def test_scheduled_stream(multi, indexer, history, reward_token, bob, chain):
+    finish = multi.rewardData(reward_token)["periodFinish"]
+    multi.scheduleRewardAmount(reward_token, 10 ** 17, finish + 10, 60, {"from": bob})
+    chain.sleep(200)
+    multi.stake(10 ** 18, {"from": bob})
+
+    replayer = _replayed_state(multi, indexer)
+    data = replayer.model.reward_data[reward_token.address]
+    assert data.as_tuple()[1:] == tuple(multi.rewardData(reward_token))[1:]
+    assert replayer.model.next_reward_stream[reward_token.address] == 1
+
+
+# Retired tokens are swapped out and still settle and pay as on chain
+def test_retired_reward(multi, indexer, history, reward_token, slow_token, alice, bob, chain):
+    chain.sleep(200)
+    multi.retireReward(reward_token, {"from": alice})
+    multi.stake(10 ** 18, {"from": bob})
+    multi.getRetiredRewards({"from": bob})
+
+    replayer = _replayed_state(multi, indexer)
+    model = replayer.model
+    assert replayer.mismatches == []
+    assert model.reward_tokens == [slow_token.address]
+    assert model.retired_reward_tokens == [reward_token.address]
+    key = (bob.address, reward_token.address)
+    assert model.rewards[key] == multi.rewards(bob, reward_token) == 0
+    assert model.user_reward_per_token_paid[key] == multi.userRewardPerTokenPaid(bob, reward_token)
+
+
+# Unclaimed earnings in a retired token are still reported, as the contract still pays them
+def test_earned_retired_reward(multi, indexer, history, reward_token, alice, bob, charlie, chain):
+    chain.sleep(200)
+    multi.retireReward(reward_token, {"from": alice})
+    indexer.sync()
+    durations = reward_durations(multi, indexer)
+    events = list(load_events(indexer))
+
+    tx = multi.getRetiredRewards({"from": bob})
+    earned = replay(events, durations, [tx.timestamp])[0]["earned"]
+
+    assert earned[bob.address][reward_token.address] == tx.events["RewardPaid"]["reward"] > 0
+    assert earned[charlie.address][reward_token.address] == multi.earned(charlie, reward_token)
+    assert multi.earned(charlie, reward_token) > 0
+
+
+# Claims that pay nothing emit no event but still checkpoint, the replay follows them
+def test_silent_claims(multi, indexer, history, reward_token, slow_token, accounts, bob, chain):
+    chain.sleep(7)
+    silent = [multi.getReward({"from": accounts[3]})]
+    chain.sleep(3)
+    silent.append(multi.getRewardForTokens([reward_token], {"from": accounts[3]}))
+    chain.sleep(5)
+    # bob's payout accrues over both silent checkpoints
+    multi.getRewardForTokens([reward_token], {"from": bob})
+
+    replayer = _replayed_state(multi, indexer)
+    assert [c["transaction_hash"] for c in indexer.calls()] == [tx.txid for tx in silent]
+    assert replayer.mismatches == []
+    for token in (reward_token, slow_token):
+        data = replayer.model.reward_data[token.address]
+        assert data.as_tuple()[1:] == tuple(multi.rewardData(token))[1:]
+        key = (bob.address, token.address)
+        assert replayer.model.rewards[key] == multi.rewards(bob, token)
+        assert replayer.model.user_reward_per_token_paid[key] == multi.userRewardPerTokenPaid(
+            bob, token
+        )
+
+
+# Many short intervals, each checkpoint rounding down, and single-token claims while
+# the other token is still accruing, replay to exactly the contract's storage
+def test_short_intervals_exact(
+    multi, indexer, base_token, reward_token, slow_token, bob, charlie, chain
+):
+    reward_token.approve(multi, 2 ** 256 - 1, {"from": bob})
+    multi.setRewardsDuration(reward_token, 600, {"from": bob})
+    multi.notifyRewardAmount(reward_token, 10 ** 18 + 7, {"from": bob})
+    base_token.approve(multi, 2 ** 256 - 1, {"from": bob})
+    base_token.approve(multi, 2 ** 256 - 1, {"from": charlie})
+    multi.stake(10 ** 18 + 3, {"from": bob})
+
+    for i in range(12):
+        chain.sleep(1 + i % 3)
+        multi.stake(10 ** 17 + 7 * i, {"from": charlie})
+        chain.sleep(2)
+        multi.withdraw(multi.balanceOf(charlie), {"from": charlie})
+        chain.sleep(1)
+        multi.getRewardForTokens([reward_token], {"from": charlie})
+        chain.sleep(1)
+        # charlie holds nothing and is owed nothing else, but only this token is checkpointed
+        multi.getRewardForTokens([slow_token], {"from": charlie})
+        multi.withdraw(10 ** 15 + i, {"from": bob})
+
+    replayer = _replayed_state(multi, indexer)
+    model = replayer.model
+    assert replayer.mismatches == []
+    for token in (reward_token, slow_token):
+        data = model.reward_data[token.address]
+        assert data.as_tuple()[1:] == tuple(multi.rewardData(token))[1:]
+        for acct in (bob, charlie):
+            key = (acct.address, token.address)
+            assert model.rewards[key] == multi.rewards(acct, token)
+            paid = multi.userRewardPerTokenPaid(acct, token)
+            assert model.user_reward_per_token_paid[key] == paid
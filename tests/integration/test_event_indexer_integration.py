@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+
+import pytest
+from brownie import ZERO_ADDRESS
+
+from scripts.event_indexer import EventIndexer
+
+
+@pytest.fixture
+def indexer(multi, tmp_path):
+    _indexer = EventIndexer(tmp_path.joinpath("events.db"), multi, batch_size=3, reorg_depth=5)
+    yield _indexer
+    _indexer.close()
+
+
+# Fill the gauge with every indexed event type
+@pytest.fixture
+def activity(multi, base_token, reward_token, err_token, alice, bob, chain):
+    base_token.approve(multi, 10 ** 18, {"from": bob})
+    multi.stake(10 ** 18, {"from": alice})
+    multi.stake(10 ** 18, {"from": bob})
+    reward_token.approve(multi, 10 ** 18, {"from": bob})
+    multi.notifyRewardAmount(reward_token, 10 ** 18, {"from": bob})
+    chain.sleep(120)
+    multi.withdraw(10 ** 17, {"from": alice})
+    multi.getReward({"from": alice})
+    multi.setRewardsDuration(reward_token, 3600, {"from": bob})
+    multi.recoverERC20(err_token, 10 ** 18, {"from": alice})
+
+
+# Every event is stored with its decoded arguments
+def test_indexes_all_events(indexer, activity, multi, reward_token, err_token, alice, bob):
+    indexer.sync()
+    events = list(indexer.events())
+
+    assert [e["event"] for e in events] == [
+        "RewardTokenAdded",
+        "Staked",
+        "Transfer",
+        "BalanceUpdated",
+        "Staked",
+        "Transfer",
+        "BalanceUpdated",
+        "RewardAdded",
+        "RewardRateUpdated",
+        "Withdrawn",
+        "Transfer",
+        "BalanceUpdated",
+        "RewardPaid",
+        "RewardsDurationUpdated",
+        "Recovered",
+    ]
+    added, staked, minted, _, staked_bob, _, balance_bob, notified, rate = events[:9]
+    withdrawn, burned, balance, paid, updated, recovered = events[9:]
+    assert added["token"] == reward_token
+    assert added["distributor"] == bob
+    assert int(added["value"]) == 60
+    assert staked["account"] == alice
+    assert minted["account"] == ZERO_ADDRESS
+    assert minted["recipient"] == alice
+    assert staked_bob["account"] == bob
+    assert int(staked_bob["value"]) == 10 ** 18
+    assert balance_bob["account"] == bob
+    assert int(balance_bob["balance"]) == 10 ** 18
+    assert int(balance_bob["total_supply"]) == 2 * 10 ** 18
+    assert int(notified["value"]) == 10 ** 18
+    assert rate["token"] == reward_token
+    assert int(rate["value"]) == 10 ** 18
+    assert int(rate["reward_rate"]) == 10 ** 18 // 60
+    assert int(rate["period_finish"]) == multi.rewardData(reward_token)["periodFinish"]
+    assert int(withdrawn["value"]) == 10 ** 17
+    assert burned["account"] == alice
+    assert burned["recipient"] == ZERO_ADDRESS
+    assert int(balance["balance"]) == multi.balanceOf(alice)
+    assert paid["token"] == reward_token
+    assert int(paid["value"]) == reward_token.balanceOf(alice) - 10 ** 18
+    assert updated["token"] == reward_token
+    assert int(updated["value"]) == 3600
+    assert recovered["token"] == err_token
+
+
+# Successful calls that emit no indexed event are stored with their sender and calldata
+def test_indexes_calls_without_events(indexer, activity, multi, reward_token, accounts, alice):
+    claim = multi.getRewardForTokens([reward_token], {"from": accounts[3]})
+    approval = multi.setClaimApproval(alice, True, {"from": accounts[3]})
+    multi.getReward({"from": alice})
+    indexer.sync()
+
+    calls = list(indexer.calls())
+    assert [c["transaction_hash"] for c in calls] == [claim.txid, approval.txid]
+    assert {c["sender"] for c in calls} == {accounts[3]}
+    assert calls[0]["input"] == claim.input
+
+
+# Balances rebuilt from the store match the contract
+def test_staked_balances(indexer, activity, multi, alice, bob):
+    indexer.sync()
+    assert indexer.staked_balances() == {
+        alice: multi.balanceOf(alice),
+        bob: multi.balanceOf(bob),
+    }
+    assert indexer.total_supply() == multi.totalSupply()
+
+
+# Receipt transfers move balances between accounts and keep the supply
+def test_transfer_balances(indexer, activity, multi, alice, bob, charlie):
+    multi.transfer(charlie, 10 ** 17, {"from": bob})
+    multi.transfer(alice, 10 ** 18 - 10 ** 17, {"from": bob})
+    indexer.sync()
+
+    transfer = list(indexer.events(event="Transfer"))[0]
+    assert transfer["account"] == bob
+    assert transfer["recipient"] == charlie
+    assert int(transfer["value"]) == 10 ** 17
+    assert [e["event"] for e in indexer.events(account=charlie)] == ["Transfer", "BalanceUpdated"]
+    assert indexer.staked_balances() == {
+        alice: multi.balanceOf(alice),
+        charlie: 10 ** 17,
+    }
+    assert indexer.total_supply() == multi.totalSupply()
+
+
+# A second sync only processes new blocks
+def test_resumes_from_checkpoint(indexer, multi, alice, chain, tmp_path):
+    indexer.sync()
+    multi.stake(10 ** 17, {"from": alice})
+    assert indexer.sync() == 3
+    assert indexer.checkpoint == chain.height
+    assert indexer.sync() == 0
+
+    multi.withdraw(10 ** 17, {"from": alice})
+    indexer.close()
+    resumed = EventIndexer(tmp_path.joinpath("events.db"), multi)
+    assert resumed.sync() == 3
+    assert [e["event"] for e in resumed.events(account=alice)] == [
+        "Staked",
+        "Transfer",
+        "BalanceUpdated",
+        "Withdrawn",
+        "Transfer",
+        "BalanceUpdated",
+    ]
+    resumed.close()
+
+
+# The batch size does not change what is stored
+def test_batch_size_independent(indexer, activity, multi, tmp_path):
+    indexer.sync()
+    single = EventIndexer(tmp_path.joinpath("single.db"), multi, batch_size=10 ** 6)
+    single.sync()
+    assert list(single.events()) == list(indexer.events())
+    assert list(single.calls()) == list(indexer.calls())
+    single.close()
+
+
+# Blocks replaced by a reorg are rolled back and reindexed
+def test_reorg_rollback(indexer, multi, base_token, alice, bob, chain):
+    base_token.approve(multi, 10 ** 18, {"from": bob})
+    multi.stake(10 ** 17, {"from": alice})
+    indexer.sync()
+    height = chain.height
+
+    multi.stake(10 ** 17, {"from": alice})
+    multi.stake(10 ** 17, {"from": alice})
+    indexer.sync()
+    assert len(list(indexer.events(event="Staked"))) == 3
+
+    # replace the last two blocks with different ones at the same heights
+    chain.undo(2)
+    multi.stake(10 ** 17, {"from": bob})
+    multi.stake(10 ** 17, {"from": bob})
+    assert chain.height == height + 2
+
+    indexer.sync()
+    assert [e["account"] for e in indexer.events(event="Staked")] == [alice, bob, bob]
+    assert indexer.staked_balances() == {alice: 10 ** 17, bob: 2 * 10 ** 17}
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 
 from brownie.test import given, strategy
+from brownie_tokens.template import ERC20
 
 
 # Does the RewardAdded event fire?
@@ -12,14 +13,25 @@ def test_reward_added_fires(multi, reward_token, alice, _amt):
     tx = multi.notifyRewardAmount(reward_token, _amt, {"from": alice})
 
     assert tx.events["RewardAdded"].values() == [_amt]
+    data = multi.rewardData(reward_token)
+    assert tx.events["RewardRateUpdated"].values() == [
+        reward_token,
+        _amt,
+        data["rewardRate"],
+        data["periodFinish"],
+    ]
 
 
 # Does the Staked event fire?
 @given(_amt=strategy("uint256", max_value=(10 ** 18), exclude=0))
 def test_staked_fires(multi, alice, _amt):
     tx = multi.stake(_amt, {"from": alice})
-    assert tx.events["Staked"].values()[0] == alice
-    assert tx.events["Staked"].values()[1] == _amt
+    assert tx.events["Staked"].values() == [alice, _amt]
+    assert tx.events["BalanceUpdated"].values() == [
+        alice,
+        multi.balanceOf(alice),
+        multi.totalSupply(),
+    ]
 
 
 # Does the Withdrawn event fire?
@@ -27,8 +39,12 @@ def test_staked_fires(multi, alice, _amt):
 def test_withdrawn_event_fires(multi, alice, amount):
     multi.stake(amount, {"from": alice})
     tx = multi.withdraw(amount // 2, {"from": alice})
-    assert tx.events["Withdrawn"].values()[0] == alice
-    assert tx.events["Withdrawn"].values()[1] == amount // 2
+    assert tx.events["Withdrawn"].values() == [alice, amount // 2]
+    assert tx.events["BalanceUpdated"].values() == [
+        alice,
+        amount - amount // 2,
+        multi.totalSupply(),
+    ]
 
 
 # Does the RewardPaid event fire?
@@ -56,6 +72,16 @@ def test_reward_paid_event_fires(
     assert tx.events["RewardPaid"].values()[2] == value_earned
 
 
+# Do the reward configuration events fire?
+def test_reward_config_events_fire(multi, alice, bob):
+    token = ERC20()
+    tx = multi.addReward(token, alice, 3600, {"from": alice})
+    assert tx.events["RewardTokenAdded"].values() == [token, alice, 3600]
+
+    tx = multi.setRewardsDistributor(token, bob, {"from": alice})
+    assert tx.events["RewardsDistributorUpdated"].values() == [token, bob]
+
+
 # Does the RewardsDurationUpdated event fire?
 @given(duration=strategy("uint256", max_value=(10 ** 5), exclude=0))
 def test_rewards_duration_fires(multi, alice, reward_token, duration):
@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+
+import json
+
+import pytest
+from brownie_tokens.template import ERC20
+
+from scripts.fund_rewards import FundingLog, fund, load_manifest
+
+EPOCH = "epoch-1"
+AMOUNT = 10 ** 18
+
+
+# Two gauges that each distribute the same two tokens, all funded by Alice
+@pytest.fixture(scope="module")
+def gauges(MultiRewards, multi, base_token, alice):
+    return [multi, MultiRewards.deploy(alice, base_token, {"from": alice})]
+
+
+@pytest.fixture(scope="module")
+def tokens(gauges, alice):
+    _tokens = [ERC20(), ERC20()]
+    for token in _tokens:
+        token._mint_for_testing(alice, 10 * AMOUNT)
+        for gauge in gauges:
+            gauge.addReward(token, alice, 86400, {"from": alice})
+    return _tokens
+
+
+@pytest.fixture(scope="module")
+def entries(gauges, tokens):
+    return [(g.address, t.address, AMOUNT) for g in gauges for t in tokens]
+
+
+@pytest.fixture
+def log(tmp_path):
+    return FundingLog(tmp_path.joinpath("funding.jsonl"))
+
+
+# Every entry starts a reward period
+def test_funds_all_entries(gauges, tokens, entries, log, client, alice):
+    statuses = fund(EPOCH, entries, alice, log, client)
+
+    assert len(statuses) == len(entries)
+    assert set(statuses.values()) == {"confirmed"}
+    for gauge in gauges:
+        for token in tokens:
+            assert gauge.rewardData(token)["rewardRate"] == AMOUNT // 86400
+            assert token.balanceOf(gauge) == AMOUNT
+
+
+# Approvals are sent only where the allowance does not cover the amount
+def test_skips_covered_approvals(gauges, tokens, entries, log, client, alice):
+    tokens[0].approve(gauges[0], AMOUNT, {"from": alice})
+    tokens[1].approve(gauges[0], AMOUNT - 1, {"from": alice})
+    nonce = alice.nonce
+
+    fund(EPOCH, entries, alice, log, client)
+    # one notification per entry, one approval for all but the covered entry
+    assert alice.nonce == nonce + 2 * len(entries) - 1
+
+
+# A rerun with the same log sends nothing
+def test_rerun_does_not_double_fund(tokens, entries, log, client, alice):
+    fund(EPOCH, entries, alice, log, client)
+    balances = [t.balanceOf(alice) for t in tokens]
+    nonce = alice.nonce
+
+    statuses = fund(EPOCH, entries, alice, FundingLog(log.path), client)
+    assert set(statuses.values()) == {"confirmed"}
+    assert alice.nonce == nonce
+    assert [t.balanceOf(alice) for t in tokens] == balances
+
+
+# The same entries are funded again for a new epoch
+def test_new_epoch(tokens, entries, log, client, alice):
+    fund(EPOCH, entries, alice, log, client)
+    balance = tokens[0].balanceOf(alice)
+    fund("epoch-2", entries, alice, log, client)
+    assert tokens[0].balanceOf(alice) == balance - 2 * AMOUNT
+
+
+# A crash after broadcasting but before recording the transaction is not retried
+def test_used_nonce_not_retried(gauges, tokens, entries, log, client, alice):
+    gauge, token, _ = entries[0]
+    log.record(FundingLog.key(EPOCH, gauge, token), status="submitting", nonce=alice.nonce - 1)
+    balance = tokens[0].balanceOf(gauges[0])
+
+    statuses = fund(EPOCH, entries, alice, log, client)
+    assert statuses[FundingLog.key(EPOCH, gauge, token)] == "unknown"
+    assert tokens[0].balanceOf(gauges[0]) == balance
+    assert list(statuses.values()).count("confirmed") == len(entries) - 1
+
+
+# A submitted entry is awaited through its transaction and logged once it confirms
+def test_submitted_awaited(gauges, tokens, entries, log, client, alice):
+    gauge, token, amount = entries[0]
+    tokens[0].approve(gauge, amount, {"from": alice})
+    tx = gauges[0].notifyRewardAmount(token, amount, {"from": alice, "required_confs": 0})
+    key = FundingLog.key(EPOCH, gauge, token)
+    log.record(key, status="submitted", tx=tx.txid)
+
+    statuses = fund(EPOCH, entries, alice, log, client)
+    assert set(statuses.values()) == {"confirmed"}
+    assert log.get(key)["tx"] == tx.txid
+    assert log.get(key)["block"] == tx.block_number
+    assert tokens[0].balanceOf(gauges[0]) == AMOUNT
+
+
+# A submitted transaction that was replaced outside of the run is reported, not resent
+def test_unknown_transaction_not_retried(gauges, tokens, entries, log, client, alice):
+    gauge, token, _ = entries[0]
+    key = FundingLog.key(EPOCH, gauge, token)
+    log.record(key, status="submitted", tx="0x" + "11" * 32)
+
+    statuses = fund(EPOCH, entries, alice, log, client)
+    assert statuses[key] == "unknown"
+    assert tokens[0].balanceOf(gauges[0]) == 0
+    assert list(statuses.values()).count("confirmed") == len(entries) - 1
+
+
+# A crash before broadcasting leaves an unused nonce and the entry is funded
+def test_unused_nonce_retried(gauges, tokens, entries, log, client, alice):
+    gauge, token, _ = entries[0]
+    log.record(FundingLog.key(EPOCH, gauge, token), status="submitting", nonce=alice.nonce)
+
+    statuses = fund(EPOCH, entries, alice, log, client)
+    assert set(statuses.values()) == {"confirmed"}
+    assert tokens[0].balanceOf(gauges[0]) == AMOUNT
+
+
+# Nothing is sent when the funder cannot cover every entry
+def test_insufficient_balance(tokens, entries, log, client, alice, bob):
+    tokens[1].transfer(bob, tokens[1].balanceOf(alice) - AMOUNT, {"from": alice})
+    nonce = alice.nonce
+
+    with pytest.raises(ValueError, match="Balance of"):
+        fund(EPOCH, entries, alice, log, client)
+    assert alice.nonce == nonce
+    assert log.entries == {}
+
+
+# Nothing is sent when the funder is not the distributor of every entry
+def test_not_distributor(gauges, tokens, entries, log, client, alice, bob):
+    gauges[1].setRewardsDistributor(tokens[0], bob, {"from": alice})
+    nonce = alice.nonce
+
+    with pytest.raises(ValueError, match="not the distributor"):
+        fund(EPOCH, entries, alice, log, client)
+    assert alice.nonce == nonce
+
+
+# Manifests are parsed and duplicate entries are rejected
+def test_load_manifest(entries, tmp_path):
+    path = tmp_path.joinpath("manifest.json")
+    rewards = [{"gauge": g, "token": t, "amount": str(a)} for g, t, a in entries]
+    path.write_text(json.dumps({"epoch": EPOCH, "rewards": rewards}))
+    assert load_manifest(path) == (EPOCH, entries)
+
+    path.write_text(json.dumps({"epoch": EPOCH, "rewards": rewards + rewards[:1]}))
+    with pytest.raises(ValueError):
+        load_manifest(path)
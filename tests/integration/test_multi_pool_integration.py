@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+
+import pytest
+from brownie_tokens.template import ERC20
+
+DURATION = 1000
+
+
+# The same actions in a pool and in a single-pool gauge earn the same rewards
+def test_pool_matches_single_gauge(multi, multi_pool, base_token, alice, bob, charlie, chain):
+    token = ERC20()
+    token._mint_for_testing(bob, 10 ** 20)
+    base_token.approve(multi, 2 ** 256 - 1, {"from": charlie})
+    token.approve(multi, 2 ** 256 - 1, {"from": bob})
+    token.approve(multi_pool, 2 ** 256 - 1, {"from": bob})
+    multi.addReward(token, bob, DURATION, {"from": alice})
+    multi_pool.addReward(0, token, bob, DURATION, {"from": alice})
+
+    multi.stake(10 ** 10, {"from": alice})
+    multi_pool.stake(0, 10 ** 10, {"from": alice})
+    multi.stake(3 * 10 ** 10, {"from": charlie})
+    multi_pool.stake(0, 3 * 10 ** 10, {"from": charlie})
+    multi.notifyRewardAmount(token, 10 ** 18, {"from": bob})
+    multi_pool.notifyRewardAmount(0, token, 10 ** 18, {"from": bob})
+
+    chain.sleep(DURATION // 2)
+    multi.withdraw(2 * 10 ** 10, {"from": charlie})
+    multi_pool.withdraw(0, 2 * 10 ** 10, {"from": charlie})
+    chain.sleep(DURATION)
+    chain.mine()
+
+    for acct in (alice, charlie):
+        single = multi.earned(acct, token)
+        assert multi_pool.earned(0, acct, token) == pytest.approx(single, rel=1e-2)
+
+    multi.exit({"from": charlie})
+    multi_pool.exit(0, {"from": charlie})
+    assert multi_pool.rewardData(0, token)["periodFinish"] == pytest.approx(
+        multi.rewardData(token)["periodFinish"], abs=2
+    )
+    assert multi_pool.totalSupply(0) == multi.totalSupply()
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+
+from brownie_tokens.template import ERC20
+
+from scripts.reconcile_rewards import RewardConfig, plan_changes, read_state, send_actions
+
+
+# The plan reaches the desired state and only blocked changes remain
+def test_reconcile(multi, lens, client, reward_token, slow_token, alice, bob, charlie, chain):
+    new_token = ERC20()
+    desired = {
+        multi.address: {
+            # new distributor and duration, no period has started
+            reward_token.address: RewardConfig(charlie.address, 120),
+            # duration change while the period is running
+            slow_token.address: RewardConfig(alice.address, 86400),
+            new_token.address: RewardConfig(bob.address, 3600),
+        }
+    }
+
+    actions = plan_changes(desired, read_state(client, lens, desired), chain.time())
+    assert [a.function for a in actions] == [
+        "setRewardsDistributor",
+        "setRewardsDuration",
+        "setRewardsDuration",
+        "addReward",
+    ]
+
+    skipped = send_actions(actions, alice)
+    assert [a.args[0] for a in skipped] == [slow_token.address]
+
+    assert multi.rewardData(reward_token)["rewardsDistributor"] == charlie
+    assert multi.rewardData(reward_token)["rewardsDuration"] == 120
+    assert multi.rewardData(new_token)["rewardsDistributor"] == bob
+    assert multi.rewardData(new_token)["rewardsDuration"] == 3600
+
+    remaining = plan_changes(desired, read_state(client, lens, desired), chain.time())
+    assert remaining == skipped
+
+
+# A retired token is read from the gauge and its config is skipped
+def test_reconcile_retired(multi, lens, client, alice, bob, chain):
+    token = ERC20()
+    multi.addReward(token, bob, 60, {"from": alice})
+    multi.retireReward(token, {"from": alice})
+    desired = {multi.address: {token.address: RewardConfig(bob.address, 60)}}
+
+    state = read_state(client, lens, desired)
+    assert state[multi.address][token.address].retired
+    (action,) = plan_changes(desired, state, chain.time())
+    assert action.function == "addReward"
+    assert action.blocked is not None
+    assert send_actions([action], alice) == [action]
+
+
+# A matching config plans nothing
+def test_reconcile_no_changes(multi, lens, client, reward_token, bob, chain):
+    desired = {multi.address: {reward_token.address: RewardConfig(bob.address, 60)}}
+    assert plan_changes(desired, read_state(client, lens, desired), chain.time()) == []
@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+
+from scripts.relay_claims import claimable, relay_claims
+
+
+# Only accounts with rewards are claimed, in batches
+def test_relay_claims(multi, lens, client, base_token, issue, accounts, alice, chain):
+    stakers = list(accounts[1:4])
+    for acct in stakers:
+        base_token.approve(multi, 10 ** 18, {"from": acct})
+        multi.stake(10 ** 18, {"from": acct})
+    multi.setClaimRelayer(alice, True, {"from": alice})
+    chain.mine(timedelta=120)
+
+    pending = claimable(client, lens, multi, stakers + list(accounts[5:7]))
+    assert pending == stakers
+
+    txs = relay_claims(multi, pending, alice, batch_size=2)
+    assert [len(tx.events["RewardPaid"]) for tx in txs] == [2, 1]
+    assert claimable(client, lens, multi, stakers) == []
+
+
+# Staking token rewards are restaked for the accounts that have them
+def test_relay_compound(multi, lens, client, base_token, accounts, alice, chain):
+    base_token._mint_for_testing(alice, 10 ** 19)
+    base_token.approve(multi, 2 ** 256 - 1, {"from": alice})
+    multi.addReward(base_token, alice, 60, {"from": alice})
+    stakers = list(accounts[1:4])
+    for acct in stakers:
+        base_token.approve(multi, 10 ** 18, {"from": acct})
+        multi.stake(10 ** 18, {"from": acct})
+    multi.notifyRewardAmount(base_token, 10 ** 18, {"from": alice})
+    multi.setClaimRelayer(alice, True, {"from": alice})
+    chain.mine(timedelta=120)
+
+    pending = claimable(client, lens, multi, stakers + [accounts[5]], base_token)
+    assert pending == stakers
+
+    txs = relay_claims(multi, pending, alice, compound=True)
+    assert [e["user"] for e in txs[0].events["Staked"]] == stakers
+    assert claimable(client, lens, multi, stakers, base_token) == []
@@ -0,0 +1,137 @@
+#!/usr/bin/python3
+
+import asyncio
+
+import pytest
+from brownie_tokens.template import ERC20
+
+from scripts.reward_keeper import RewardKeeper
+
+DURATION = 1000
+WINDOW = 300
+AMOUNT = 10 ** 18
+
+
+# Three streams funded by Alice, started 400 seconds apart
+@pytest.fixture(scope="module")
+def streams(multi, alice, chain):
+    _streams = []
+    for i in range(3):
+        token = ERC20()
+        token._mint_for_testing(alice, 10 * AMOUNT)
+        token.approve(multi, 2 ** 256 - 1, {"from": alice})
+        multi.addReward(token, alice, DURATION, {"from": alice})
+        multi.notifyRewardAmount(token, AMOUNT, {"from": alice})
+        _streams.append((multi.address, token.address, AMOUNT))
+        chain.sleep(400)
+    chain.mine()
+    return _streams
+
+
+@pytest.fixture
+def keeper(lens, client, streams, alice):
+    return RewardKeeper(lens, client, streams, alice, window=WINDOW, max_in_flight=1, poll_blocks=1)
+
+
+def _finish(multi, stream):
+    return multi.rewardData(stream[1])["periodFinish"]
+
+
+# Only streams finishing within the window are topped up
+def test_tops_up_expiring_stream(multi, keeper, streams, chain):
+    # the first stream finishes in 1000 - 3 * 400 < 0, the second in 200
+    finishes = [_finish(multi, s) for s in streams]
+    top_ups = asyncio.run(keeper.check())
+
+    assert [t.stream.token for t in top_ups] == [streams[0][1], streams[1][1]]
+    assert {t.status for t in top_ups} == {"confirmed"}
+    assert _finish(multi, streams[0]) > finishes[0]
+    assert _finish(multi, streams[1]) > finishes[1]
+    assert _finish(multi, streams[2]) == finishes[2]
+
+    # nothing is due straight after a top-up
+    assert asyncio.run(keeper.check()) == []
+
+
+# Streams with a scheduled period are already funded
+def test_skips_scheduled_stream(multi, keeper, streams, alice):
+    finish = _finish(multi, streams[1])
+    multi.scheduleRewardAmount(streams[1][1], AMOUNT, finish, DURATION, {"from": alice})
+
+    top_ups = asyncio.run(keeper.check())
+    assert [t.stream.token for t in top_ups] == [streams[0][1]]
+
+
+# A scheduled period that has started is watched until it finishes
+def test_watches_started_stream(multi, keeper, streams, alice, chain):
+    token = streams[2][1]
+    finish = _finish(multi, streams[2])
+    multi.scheduleRewardAmount(token, AMOUNT, finish, DURATION, {"from": alice})
+    chain.sleep(finish + DURATION - WINDOW // 2 - chain.time())
+    chain.mine()
+    # nothing checkpointed the token, the stored data still points at the queued period
+    assert 0 < multi.rewardData(token)["nextStreamStart"] <= chain[-1].timestamp
+
+    top_ups = asyncio.run(keeper.check())
+    assert token in [t.stream.token for t in top_ups]
+    assert {t.status for t in top_ups} == {"confirmed"}
+    assert multi.rewardData(token)["nextStreamStart"] == 0
+    assert _finish(multi, streams[2]) > finish + DURATION
+
+
+# Streams come due as time passes
+def test_due_after_sleep(multi, keeper, streams, chain):
+    asyncio.run(keeper.check())
+    assert asyncio.run(keeper.check()) == []
+
+    chain.sleep(DURATION - WINDOW)
+    chain.mine()
+    top_ups = asyncio.run(keeper.check())
+    assert len(top_ups) == 3
+    assert len(keeper.history) == 5
+
+
+# No more transactions are in flight than allowed
+@pytest.mark.parametrize("max_in_flight", [1, 3])
+def test_in_flight_limit(lens, client, streams, alice, chain, max_in_flight):
+    chain.sleep(2 * DURATION)
+    chain.mine()
+    keeper = RewardKeeper(lens, client, streams, alice, window=WINDOW, max_in_flight=max_in_flight)
+    top_ups = asyncio.run(keeper.check())
+
+    assert {t.status for t in top_ups} == {"confirmed"}
+    assert len(top_ups) == 3
+    assert keeper.peak_in_flight <= max_in_flight
+
+
+# A failed top-up is recorded and does not stop the others
+def test_failed_top_up(multi, lens, client, streams, alice, bob, chain):
+    multi.setRewardsDistributor(streams[0][1], bob, {"from": alice})
+    chain.sleep(2 * DURATION)
+    chain.mine()
+    keeper = RewardKeeper(lens, client, streams, alice, window=WINDOW)
+    top_ups = asyncio.run(keeper.check())
+
+    # depending on the node the revert surfaces on broadcast or in the receipt
+    assert top_ups[0].status in ("failed", "reverted")
+    assert [t.status for t in top_ups[1:]] == ["confirmed", "confirmed"]
+
+
+# A top-up that does not confirm in time is reported, and the next nonce comes from the chain
+def test_confirm_timeout(lens, client, streams, alice, chain):
+    keeper = RewardKeeper(lens, client, streams, alice, window=WINDOW, confirm_timeout=0)
+    top_ups = asyncio.run(keeper.check())
+    assert [t.status for t in top_ups] == ["timeout", "timeout"]
+    assert all(t.txid is not None for t in top_ups)
+
+    chain.sleep(2 * DURATION)
+    chain.mine()
+    keeper.confirm_timeout = 60
+    top_ups = asyncio.run(keeper.check())
+    assert [t.status for t in top_ups] == ["confirmed"] * 3
+
+
+# The polling loop checks once per new block
+def test_run(multi, keeper, streams, chain):
+    asyncio.run(keeper.run(poll_interval=0, max_checks=1))
+    assert len(keeper.history) == 2
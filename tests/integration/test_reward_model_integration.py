@@ -0,0 +1,239 @@
+#!/usr/bin/python3
+
+import pytest
+from brownie import ZERO_ADDRESS, chain
+from brownie.exceptions import VirtualMachineError
+from brownie.test import strategy
+
+from scripts.reward_model import ModelRevert, MultiRewardsModel
+
+
+# Replays random operations against both the contract and the reference model and
+# compares all stored state after every step
+class StateMachine:
+
+    st_staker = strategy("uint8", max_value=3)
+    st_staker2 = strategy("uint8", max_value=3)
+    st_token = strategy("uint8", max_value=1)
+    st_amount = strategy("uint256", max_value=10 ** 20)
+    st_reward = strategy("uint256", max_value=10 ** 18)
+    st_sleep = strategy("uint256", max_value=3600)
+    st_duration = strategy("uint256", min_value=1, max_value=3600)
+    st_gap = strategy("uint256", max_value=600)
+
+    def __init__(cls, accounts, multi, base_token, reward_token, reward_token2, alice):
+        cls.multi = multi
+        cls.distributor = alice
+        cls.stakers = list(accounts[1:5])
+        cls.tokens = [reward_token, reward_token2]
+
+        for acct in cls.stakers:
+            base_token._mint_for_testing(acct, 10 ** 22)
+            base_token.approve(multi, 2 ** 256 - 1, {"from": acct})
+        for token in cls.tokens:
+            token._mint_for_testing(alice, 10 ** 22)
+            token.approve(multi, 2 ** 256 - 1, {"from": alice})
+            multi.setRewardsDistributor(token, alice, {"from": alice})
+        multi.setClaimRelayer(alice, True, {"from": alice})
+
+    def setup(self):
+        self.model = MultiRewardsModel()
+        for token in self.tokens:
+            duration = self.multi.rewardData(token)["rewardsDuration"]
+            self.model.add_reward(token.address, self.distributor.address, duration)
+
+    def _transact(self, fn, args, sender, model_fn, *model_args):
+        # run `fn` on chain and `model_fn` on the model, both must revert or neither
+        try:
+            tx = fn(*args, {"from": sender})
+        except VirtualMachineError:
+            with pytest.raises(ModelRevert):
+                model_fn(*model_args, chain.time())
+            return None, None
+        return tx, model_fn(*model_args, tx.timestamp)
+
+    def _check_paid(self, tx, paid):
+        events = tx.events["RewardPaid"] if "RewardPaid" in tx.events else []
+        assert {e["rewardsToken"]: e["reward"] for e in events} == paid
+
+    def rule_sleep(self, st_sleep):
+        chain.sleep(st_sleep)
+
+    def rule_stake(self, st_staker, st_amount):
+        acct = self.stakers[st_staker]
+        addr = acct.address
+        self._transact(self.multi.stake, [st_amount], acct, self.model.stake, addr, st_amount)
+
+    def rule_withdraw(self, st_staker, st_amount):
+        acct = self.stakers[st_staker]
+        addr = acct.address
+        self._transact(self.multi.withdraw, [st_amount], acct, self.model.withdraw, addr, st_amount)
+
+    def rule_transfer(self, st_staker, st_staker2, st_amount):
+        acct = self.stakers[st_staker]
+        addr, addr2 = acct.address, self.stakers[st_staker2].address
+        self._transact(
+            self.multi.transfer,
+            [addr2, st_amount],
+            acct,
+            self.model.transfer,
+            addr,
+            addr2,
+            st_amount,
+        )
+
+    def rule_self_transfer(self, st_staker, st_amount):
+        acct = self.stakers[st_staker]
+        addr = acct.address
+        balance, supply = self.multi.balanceOf(acct), self.multi.totalSupply()
+        self._transact(
+            self.multi.transfer,
+            [acct, st_amount],
+            acct,
+            self.model.transfer,
+            addr,
+            addr,
+            st_amount,
+        )
+        # whether or not it reverted, a transfer to oneself leaves the stake as it was
+        assert self.multi.balanceOf(acct) == balance
+        assert self.multi.totalSupply() == supply
+
+    def rule_get_reward(self, st_staker):
+        acct = self.stakers[st_staker]
+        addr = acct.address
+        tx, paid = self._transact(self.multi.getReward, [], acct, self.model.get_reward, addr)
+        self._check_paid(tx, paid)
+
+    def rule_get_reward_for_token(self, st_staker, st_token):
+        acct = self.stakers[st_staker]
+        addr = acct.address
+        tokens = [self.tokens[st_token].address]
+        tx, paid = self._transact(
+            self.multi.getRewardForTokens,
+            [tokens],
+            acct,
+            self.model.get_reward_for_tokens,
+            addr,
+            tokens,
+        )
+        self._check_paid(tx, paid)
+
+    def rule_get_reward_for(self, st_staker, st_staker2):
+        accts = [self.stakers[st_staker], self.stakers[st_staker2]]
+        addrs = [a.address for a in accts]
+        tx, paid = self._transact(
+            self.multi.getRewardFor, [accts], self.distributor, self.model.get_reward_for, addrs
+        )
+        events = tx.events["RewardPaid"] if "RewardPaid" in tx.events else []
+        assert [(e["user"], e["rewardsToken"], e["reward"]) for e in events] == paid
+
+    def rule_exit(self, st_staker):
+        acct = self.stakers[st_staker]
+        addr = acct.address
+        tx, result = self._transact(self.multi.exit, [], acct, self.model.exit, addr)
+        if tx is not None:
+            assert tx.events["Withdrawn"]["amount"] == result[0]
+            self._check_paid(tx, result[1])
+
+    def rule_notify(self, st_token, st_reward):
+        token = self.tokens[st_token]
+        data = self.model._current_reward_data(token.address, chain.time())
+        finish = chain.time() + data.rewards_duration
+        if data.next_stream_start and abs(finish - data.next_stream_start) < 3:
+            # the revert depends on the exact block timestamp, which we cannot predict
+            return
+        self._transact(
+            self.multi.notifyRewardAmount,
+            [token, st_reward],
+            self.distributor,
+            self.model.notify_reward_amount,
+            self.distributor.address,
+            token.address,
+            st_reward,
+        )
+
+    def rule_schedule(self, st_token, st_reward, st_gap, st_duration):
+        token = self.tokens[st_token]
+        streams = self.model.reward_streams[token.address]
+        pending = len(streams) - self.model.next_reward_stream[token.address]
+        finish = streams[-1][1] if pending else self.model.reward_data[token.address].period_finish
+        start = max(finish, chain.time() + 10) + st_gap
+        self._transact(
+            self.multi.scheduleRewardAmount,
+            [token, st_reward, start, st_duration],
+            self.distributor,
+            self.model.schedule_reward_amount,
+            self.distributor.address,
+            token.address,
+            st_reward,
+            start,
+            st_duration,
+        )
+
+    def rule_retire(self, st_token):
+        token = self.tokens[st_token]
+        data = self.model._current_reward_data(token.address, chain.time())
+        if abs(chain.time() - data.period_finish) < 3:
+            # the revert depends on the exact block timestamp, which we cannot predict
+            return
+        self._transact(
+            self.multi.retireReward,
+            [token],
+            self.distributor,
+            self.model.retire_reward,
+            token.address,
+        )
+
+    def rule_get_retired(self, st_staker):
+        acct = self.stakers[st_staker]
+        addr = acct.address
+        tx, paid = self._transact(
+            self.multi.getRetiredRewards, [], acct, self.model.get_retired_rewards, addr
+        )
+        self._check_paid(tx, paid)
+
+    def rule_set_duration(self, st_token, st_duration):
+        token = self.tokens[st_token]
+        if abs(chain.time() - self.model.reward_data[token.address].period_finish) < 3:
+            # the revert depends on the exact block timestamp, which we cannot predict
+            return
+        self._transact(
+            self.multi.setRewardsDuration,
+            [token, st_duration],
+            self.distributor,
+            self.model.set_rewards_duration,
+            self.distributor.address,
+            token.address,
+            st_duration,
+        )
+
+    def invariant_state(self):
+        assert self.multi.totalSupply() == self.model.total_supply
+        for acct in self.stakers:
+            assert self.multi.balanceOf(acct) == self.model.balances[acct.address]
+        for token in self.tokens:
+            data = self.model.reward_data[token.address]
+            # the model clears the distributor of a retired token to None
+            expected = (data.rewards_distributor or ZERO_ADDRESS,) + data.as_tuple()[1:]
+            assert tuple(self.multi.rewardData(token)) == expected
+            for acct in self.stakers:
+                key = (acct.address, token.address)
+                assert self.multi.rewards(acct, token) == self.model.rewards[key]
+                paid = self.multi.userRewardPerTokenPaid(acct, token)
+                assert paid == self.model.user_reward_per_token_paid[key]
+
+
+def test_contract_matches_model(
+    state_machine, accounts, multi, base_token, reward_token, reward_token2, alice
+):
+    state_machine(
+        StateMachine,
+        accounts,
+        multi,
+        base_token,
+        reward_token,
+        reward_token2,
+        alice,
+        settings={"max_examples": 25, "stateful_step_count": 20},
+    )
@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+
+import brownie
+
+
+# Registered tokens are not checkpointed until they are funded
+def test_added_token_inactive(multi, reward_token):
+    with brownie.reverts():
+        multi.activeRewardTokens(0)
+
+
+# Notifying a reward activates the token
+def test_notify_activates(multi, reward_token, issue):
+    assert multi.activeRewardTokens(0) == reward_token
+
+
+# Expired tokens are dropped from the active set on the next checkpoint
+def test_expired_token_deactivated(multi, base_token, reward_token, bob, issue, chain):
+    base_token.approve(multi, 10 ** 18, {"from": bob})
+    multi.stake(10 ** 18, {"from": bob})
+    chain.sleep(100)
+    multi.withdraw(10 ** 18, {"from": bob})
+
+    assert multi.rewardsEpoch() == 1
+    assert multi.deactivatedRewardTokens(0) == reward_token
+    with brownie.reverts():
+        multi.activeRewardTokens(0)
+
+
+# Rewards earned before a token was deactivated remain claimable
+def test_claim_after_deactivation(multi, base_token, reward_token, bob, charlie, issue, chain):
+    base_token.approve(multi, 10 ** 18, {"from": bob})
+    multi.stake(10 ** 18, {"from": bob})
+    chain.sleep(100)
+
+    # charlie's stake settles the expired period and drops the token
+    base_token.approve(multi, 10 ** 18, {"from": charlie})
+    multi.stake(10 ** 18, {"from": charlie})
+    earnings = multi.earned(bob, reward_token)
+    assert earnings > 0
+
+    init_balance = reward_token.balanceOf(bob)
+    multi.withdraw(10 ** 18, {"from": bob})
+    multi.getReward({"from": bob})
+    assert reward_token.balanceOf(bob) - init_balance == earnings
+    assert multi.earned(charlie, reward_token) == 0
+
+
+# A new notification reactivates a settled token
+def test_notify_reactivates(multi, reward_token, alice, issue, chain):
+    multi.stake(10 ** 10, {"from": alice})
+    chain.sleep(100)
+    multi.getReward({"from": alice})
+    with brownie.reverts():
+        multi.activeRewardTokens(0)
+
+    reward_token._mint_for_testing(alice, 10 ** 18)
+    reward_token.approve(multi, 10 ** 18, {"from": alice})
+    multi.notifyRewardAmount(reward_token, 10 ** 18, {"from": alice})
+    assert multi.activeRewardTokens(0) == reward_token
+
+    chain.mine(timedelta=30)
+    assert multi.earned(alice, reward_token) > 0
+
+
+# A lagging account settles the tokens deactivated since its last checkpoint, and a
+# token that was deactivated and funded again keeps accruing without a gap
+def test_lagging_account_settles_deactivated(
+    multi, base_token, reward_token, reward_token2, alice, bob, charlie, issue, chain
+):
+    reward_token2.approve(multi, 10 ** 18, {"from": charlie})
+    multi.setRewardsDuration(reward_token2, 1000, {"from": charlie})
+    multi.notifyRewardAmount(reward_token2, 10 ** 18, {"from": charlie})
+    base_token.approve(multi, 10 ** 18, {"from": bob})
+    multi.stake(10 ** 17, {"from": bob})
+    chain.sleep(100)
+
+    # alice's stake settles the expired period of the first token and drops it
+    multi.stake(10 ** 10, {"from": alice})
+    assert multi.rewardsEpoch() == 1
+    earned = multi.earned(bob, reward_token)
+
+    multi.stake(10 ** 17, {"from": bob})
+    assert multi.userRewardsEpoch(bob) == 1
+    assert multi.rewards(bob, reward_token) == earned
+
+    reward_token._mint_for_testing(alice, 10 ** 18)
+    reward_token.approve(multi, 10 ** 18, {"from": alice})
+    multi.notifyRewardAmount(reward_token, 10 ** 18, {"from": alice})
+    chain.sleep(100)
+    multi.stake(10 ** 17, {"from": bob})
+
+    assert multi.userRewardsEpoch(bob) == 2
+    assert multi.rewards(bob, reward_token) > earned
+    assert multi.rewards(bob, reward_token) == multi.earned(bob, reward_token)
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+
+import json
+
+from scripts.calibrate_gas_budgets import (
+    BUDGETS_PATH,
+    calibrate,
+    fit_budget,
+    format_budgets,
+    stale_budgets,
+)
+
+
+# The fitted line is raised over every measurement and given two percent headroom
+def test_fit_budget():
+    assert fit_budget([(1, 150000), (2, 200000), (4, 300000)]) == {
+        "base": 102000,
+        "per_token": 51000,
+    }
+    assert fit_budget([(1, 150000), (2, 210000), (4, 300000)])["base"] == 114000
+
+
+# Functions measured at one token count are budgeted at their largest measurement
+def test_fit_budget_single_count():
+    assert fit_budget([(4, 123456), (4, 120000)]) == {"base": 126000, "per_token": 0}
+
+
+# Every measurement of a function is fitted together, whatever the staker count
+def test_calibrate():
+    records = [
+        {"function": "stake", "reward_tokens": 1, "stakers": 1, "gas_used": 100000},
+        {"function": "stake", "reward_tokens": 2, "stakers": 8, "gas_used": 150000},
+        {"function": "deploy", "reward_tokens": 0, "stakers": 0, "gas_used": 50000},
+    ]
+    assert calibrate(records) == {
+        "deploy": {"base": 51000, "per_token": 0},
+        "stake": {"base": 51000, "per_token": 51000},
+    }
+
+
+# Any committed budget that differs from the calibrated one is stale, tighter or looser
+def test_stale_budgets():
+    calibrated = {
+        "stake": {"base": 51000, "per_token": 51000},
+        "deploy": {"base": 51000, "per_token": 0},
+    }
+    assert stale_budgets(dict(calibrated), calibrated) == []
+    budgets = dict(calibrated, stake={"base": 130000, "per_token": 51000})
+    assert stale_budgets(budgets, calibrated) == ["stake"]
+    del budgets["deploy"]
+    budgets["exit"] = {"base": 1000, "per_token": 0}
+    assert stale_budgets(budgets, calibrated) == ["deploy", "exit", "stake"]
+
+
+# The committed budgets keep the layout the script writes
+def test_budgets_layout():
+    with BUDGETS_PATH.open() as fp:
+        budgets = json.load(fp)
+    assert BUDGETS_PATH.read_text() == format_budgets(budgets)
@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+
+import brownie
+import pytest
+from brownie import ZERO_ADDRESS
+
+DURATION = 100
+
+
+# The staking token is also distributed as a reward by Alice
+@pytest.fixture(scope="module")
+def compounding(multi, base_token, accounts, alice):
+    base_token._mint_for_testing(alice, 10 ** 20)
+    base_token.approve(multi, 2 ** 256 - 1, {"from": alice})
+    multi.addReward(base_token, alice, DURATION, {"from": alice})
+    for acct in accounts[1:3]:
+        base_token.approve(multi, 2 ** 256 - 1, {"from": acct})
+        multi.stake(10 ** 18, {"from": acct})
+    multi.notifyRewardAmount(base_token, 10 ** 18, {"from": alice})
+    return base_token
+
+
+# Rewards are added to the stake without moving any tokens
+def test_compound(multi, compounding, bob, chain):
+    chain.sleep(DURATION // 2)
+    balance = multi.balanceOf(bob)
+    supply = multi.totalSupply()
+    held = compounding.balanceOf(multi)
+
+    tx = multi.compound({"from": bob})
+
+    reward = tx.events["RewardPaid"]["reward"]
+    assert reward > 0
+    # only the receipt is minted, no staking token moves
+    assert tx.events["Transfer"].values() == [ZERO_ADDRESS, bob, reward]
+    assert multi.balanceOf(bob) == balance + reward
+    assert multi.totalSupply() == supply + reward
+    assert compounding.balanceOf(multi) == held
+    assert multi.rewards(bob, compounding) == 0
+    assert tx.events["Staked"].values() == [bob, reward]
+    assert tx.events["BalanceUpdated"].values() == [bob, balance + reward, supply + reward]
+
+
+# Compounding restakes the same amount getReward would have paid out
+def test_compound_matches_get_reward(multi, compounding, bob, chain):
+    chain.sleep(DURATION)
+    events = multi.getReward({"from": bob}).events["RewardPaid"]
+    paid = [e["reward"] for e in events if e["rewardsToken"] == compounding]
+    chain.undo()
+
+    tx = multi.compound({"from": bob})
+    assert [e["reward"] for e in tx.events["RewardPaid"]] == paid
+
+
+# Other reward tokens are settled before the balance grows
+def test_other_tokens_settled(multi, compounding, reward_token, issue, bob, chain):
+    chain.sleep(30)
+    multi.compound({"from": bob})
+
+    stored = multi.rewardData(reward_token)["rewardPerTokenStored"]
+    assert multi.userRewardPerTokenPaid(bob, reward_token) == stored
+    assert multi.rewards(bob, reward_token) > 0
+
+
+# A relayer compounds for many accounts in one transaction
+def test_compound_for(multi, compounding, alice, bob, charlie, chain):
+    multi.setClaimRelayer(alice, True, {"from": alice})
+    chain.sleep(DURATION)
+    balances = [multi.balanceOf(acct) for acct in (bob, charlie)]
+
+    tx = multi.compoundFor([bob, charlie], {"from": alice})
+
+    events = tx.events["RewardPaid"]
+    assert [e["user"] for e in events] == [bob, charlie]
+    for acct, balance, event in zip((bob, charlie), balances, events):
+        assert multi.balanceOf(acct) == balance + event["reward"]
+    minted = [[ZERO_ADDRESS, e["user"], e["reward"]] for e in events]
+    assert [e.values() for e in tx.events["Transfer"]] == minted
+
+
+# Batch compounding needs the same approval as claiming for others
+def test_compound_for_approval(multi, compounding, alice, bob, chain):
+    with brownie.reverts("Not approved to claim"):
+        multi.compoundFor([bob], {"from": alice})
+
+    multi.setClaimApproval(alice, True, {"from": bob})
+    chain.sleep(DURATION)
+    tx = multi.compoundFor([bob], {"from": alice})
+    assert tx.events["Staked"]["user"] == bob
+
+
+# Nothing is restaked without a reward
+def test_nothing_to_compound(multi, compounding, accounts):
+    tx = multi.compound({"from": accounts[5]})
+    assert "RewardPaid" not in tx.events
+    assert "Staked" not in tx.events
+
+
+# Compounding needs the staking token to be a reward token
+def test_not_compoundable(MultiRewards, lp_token, alice):
+    gauge = MultiRewards.deploy(alice, lp_token, {"from": alice})
+    with brownie.reverts("Staking token is not a reward token"):
+        gauge.compound({"from": alice})
+    with brownie.reverts("Staking token is not a reward token"):
+        gauge.compoundFor([alice], {"from": alice})
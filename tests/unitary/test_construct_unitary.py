@@ -39,6 +39,16 @@ def test_contract_not_pausable_by_public(multi, accounts, alice, idx):
     assert multi.paused() is False
 
 
+# The deployed bytecode of every deployable contract, as compiled with the optimizer
+# settings in brownie-config.yaml, fits within the EIP-170 contract size limit
+def test_bytecode_size(MultiRewards, MultiPoolRewards, MultiRewardsFactory, MultiRewardsLens):
+    sizes = {
+        c._name: len(c._build["deployedBytecode"]) // 2
+        for c in (MultiRewards, MultiPoolRewards, MultiRewardsFactory, MultiRewardsLens)
+    }
+    assert max(sizes.values()) <= 24576, f"Deployed bytecode sizes: {sizes}"
+
+
 # Can the ownership be transferred?
 def test_replace_owner(multi, accounts, alice, bob):
     multi.nominateNewOwner(bob, {"from": alice})
@@ -40,3 +40,18 @@ def test_unstaked_reverts_on_exit(multi, alice, bob, base_token, reward_token, i
     assert multi.balanceOf(bob) == 0
     with brownie.reverts():
         multi.exit({"from": bob})
+
+
+# Exit pays out every reward token alongside the withdrawal
+def test_exit_pays_all_rewards(multi, bob, base_token, reward_token, slow_token, issue, chain):
+    amount = base_token.balanceOf(bob)
+    base_token.approve(multi, amount, {"from": bob})
+    multi.stake(amount, {"from": bob})
+    chain.mine(timedelta=100)
+
+    tx = multi.exit({"from": bob})
+    assert len(tx.events["Withdrawn"]) == 1
+    assert tx.events["Withdrawn"]["amount"] == amount
+    assert {e["rewardsToken"] for e in tx.events["RewardPaid"]} == {reward_token, slow_token}
+    assert multi.earned(bob, reward_token) == 0
+    assert multi.earned(bob, slow_token) == 0
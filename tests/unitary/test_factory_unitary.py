@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+
+import brownie
+import pytest
+from brownie_tokens.template import ERC20
+
+
+@pytest.fixture(scope="module")
+def clone(MultiRewards, factory, base_token, alice, bob):
+    tx = factory.deploy(bob, base_token, {"from": alice})
+    gauge = MultiRewards.at(tx.return_value)
+    base_token.approve(gauge, 2 ** 256 - 1, {"from": alice})
+    return gauge
+
+
+# A clone is initialized with its own owner and staking token
+def test_clone_initialized(clone, base_token, bob):
+    assert clone.owner() == bob
+    assert clone.stakingToken() == base_token
+    assert clone.paused() is False
+    assert clone.rewardTokensLength() == 0
+
+
+# The clone is recorded in the registry
+def test_clone_registered(factory, clone, base_token):
+    assert factory.gauges(factory.gaugesLength() - 1) == clone
+    assert clone in factory.getGauges(base_token)
+    assert factory.isGauge(clone) is True
+
+
+# Deployment emits the gauge, staking token and owner
+def test_deploy_event(factory, base_token, alice, bob):
+    tx = factory.deploy(bob, base_token, {"from": alice})
+    assert tx.events["GaugeDeployed"]["gauge"] == tx.return_value
+    assert tx.events["GaugeDeployed"]["stakingToken"] == base_token
+    assert tx.events["GaugeDeployed"]["owner"] == bob
+
+
+# Only the factory owner registers gauges
+def test_deploy_only_owner(factory, base_token, bob):
+    with brownie.reverts("Only the contract owner may perform this action"):
+        factory.deploy(bob, base_token, {"from": bob})
+    with brownie.reverts("Only the contract owner may perform this action"):
+        factory.deployMany(bob, [base_token], {"from": bob})
+
+
+# Ownership of the factory passes like that of a gauge
+def test_transfer_factory_ownership(factory, base_token, alice, bob):
+    factory.nominateNewOwner(bob, {"from": alice})
+    factory.acceptOwnership({"from": bob})
+    tx = factory.deploy(bob, base_token, {"from": bob})
+    assert factory.isGauge(tx.return_value)
+    with brownie.reverts("Only the contract owner may perform this action"):
+        factory.deploy(alice, base_token, {"from": alice})
+
+
+# Clones cannot be initialized again
+def test_cannot_reinitialize(clone, base_token, alice):
+    with brownie.reverts("Already initialized"):
+        clone.initialize(alice, base_token, {"from": alice})
+
+
+# The implementation is owned from its constructor and cannot be initialized
+def test_implementation_not_initializable(MultiRewards, factory, base_token, alice):
+    implementation = MultiRewards.at(factory.implementation())
+    with brownie.reverts("Already initialized"):
+        implementation.initialize(alice, base_token, {"from": alice})
+
+
+# A clone needs an owner
+def test_zero_owner(factory, base_token, alice):
+    with brownie.reverts("Owner address cannot be 0"):
+        factory.deploy(brownie.ZERO_ADDRESS, base_token, {"from": alice})
+
+
+# Clones keep separate state and distribute rewards like a directly deployed gauge
+def test_clone_rewards(clone, base_token, alice, bob, chain):
+    token = ERC20()
+    token._mint_for_testing(bob, 10 ** 18)
+    token.approve(clone, 10 ** 18, {"from": bob})
+    clone.addReward(token, bob, 1000, {"from": bob})
+    clone.stake(10 ** 18, {"from": alice})
+    clone.notifyRewardAmount(token, 10 ** 18, {"from": bob})
+
+    chain.sleep(2000)
+    clone.exit({"from": alice})
+    assert token.balanceOf(alice) == pytest.approx(10 ** 18, rel=1e-3)
+    assert base_token.balanceOf(clone) == 0
+
+
+# Batch deployment registers one gauge per staking token
+def test_deploy_many(MultiRewards, factory, alice, bob):
+    staking_tokens = [ERC20(), ERC20(), ERC20()]
+    registered = factory.gaugesLength()
+    tx = factory.deployMany(bob, staking_tokens, {"from": alice})
+    deployed = tx.return_value
+
+    assert len(set(deployed)) == 3
+    assert factory.gaugesLength() == registered + 3
+    for gauge, token in zip(deployed, staking_tokens):
+        assert MultiRewards.at(gauge).stakingToken() == token
+        assert MultiRewards.at(gauge).owner() == bob
+        assert factory.getGauges(token) == [gauge]
+
+
+# Several gauges for one staking token are enumerable in deployment order
+def test_gauges_by_staking_token(factory, alice, bob):
+    staking_token = ERC20()
+    first = factory.deploy(alice, staking_token, {"from": alice}).return_value
+    second = factory.deploy(bob, staking_token, {"from": alice}).return_value
+
+    assert factory.gaugesByStakingTokenLength(staking_token) == 2
+    assert factory.gaugesByStakingToken(staking_token, 0) == first
+    assert factory.gaugesByStakingToken(staking_token, 1) == second
+    assert factory.getGauges(staking_token) == [first, second]
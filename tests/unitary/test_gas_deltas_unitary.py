@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+
+from scripts.gas_deltas import format_deltas, gas_deltas
+
+
+def _record(test, fn, reward_tokens, stakers, gas_used):
+    return {
+        "test": test,
+        "function": fn,
+        "reward_tokens": reward_tokens,
+        "stakers": stakers,
+        "gas_used": gas_used,
+    }
+
+
+# The baseline is compared with the current contract at the same counts
+def test_baseline_deltas():
+    records = [
+        _record("test_baseline_gas[1]", "baseline.stake", 1, 1, 100000),
+        _record("test_baseline_gas[1]", "stake", 1, 1, 80000),
+        _record("test_baseline_gas[4]", "baseline.stake", 4, 1, 200000),
+        _record("test_baseline_gas[4]", "stake", 4, 1, 120000),
+    ]
+    assert gas_deltas(records) == [
+        {
+            "comparison": "stake",
+            "reward_tokens": 1,
+            "stakers": 1,
+            "before": 100000,
+            "after": 80000,
+            "change": -20.0,
+        },
+        {
+            "comparison": "stake",
+            "reward_tokens": 4,
+            "stakers": 1,
+            "before": 200000,
+            "after": 120000,
+            "change": -40.0,
+        },
+    ]
+
+
+# A transfer is compared with exit and stake taken together in the same test
+def test_transfer_delta():
+    records = [
+        _record("test_transfer_gas[4]", "transfer", 4, 2, 150000),
+        _record("test_transfer_gas[4]", "exit", 4, 2, 200000),
+        _record("test_transfer_gas[4]", "stake", 4, 2, 100000),
+    ]
+    assert [(d["comparison"], d["before"], d["after"]) for d in gas_deltas(records)] == [
+        ("transfer", 300000, 150000)
+    ]
+
+
+# Measurements from different tests are never paired
+def test_deltas_within_test():
+    records = [
+        _record("test_reward_gas[1-1]", "stake", 1, 1, 80000),
+        _record("test_baseline_gas[1]", "baseline.stake", 1, 1, 100000),
+        _record("test_retire_reward_gas", "getReward", 1, 1, 50000),
+    ]
+    assert gas_deltas(records) == []
+
+
+# Every comparison is a row of a markdown table
+def test_format_deltas():
+    records = [
+        _record("test_clone_deploy_gas", "deployFull", 0, 0, 4000000),
+        _record("test_clone_deploy_gas", "deploy", 0, 0, 300000),
+    ]
+    assert format_deltas(gas_deltas(records)).splitlines()[2:] == [
+        "| deploy | 0 | 0 | 4000000 | 300000 | -92.5% |"
+    ]
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+
+import brownie
+import pytest
+
+
+# Bob and Charlie stake while both reward tokens are distributed
+@pytest.fixture
+def stakers(multi, base_token, reward_token, slow_token, issue, bob, charlie, chain):
+    for acct in (bob, charlie):
+        base_token.approve(multi, 10 ** 18, {"from": acct})
+        multi.stake(10 ** 18, {"from": acct})
+    chain.mine(timedelta=30)
+    return [bob, charlie]
+
+
+# Only the owner sets claim relayers
+def test_set_relayer_only_owner(multi, bob):
+    with brownie.reverts("Only the contract owner may perform this action"):
+        multi.setClaimRelayer(bob, True, {"from": bob})
+
+
+# A relayer claims for every account and each account is paid
+def test_relayer_claims(multi, reward_token, slow_token, stakers, alice, charlie):
+    multi.setClaimRelayer(charlie, True, {"from": alice})
+    initial = {acct: reward_token.balanceOf(acct) for acct in stakers}
+
+    tx = multi.getRewardFor(stakers, {"from": charlie})
+
+    events = tx.events["RewardPaid"]
+    assert [(e["user"], e["rewardsToken"]) for e in events] == [
+        (stakers[0], reward_token),
+        (stakers[0], slow_token),
+        (stakers[1], reward_token),
+        (stakers[1], slow_token),
+    ]
+    for acct, event in zip(stakers, events[::2]):
+        assert reward_token.balanceOf(acct) - initial[acct] == event["reward"]
+    for acct in stakers:
+        for token in (reward_token, slow_token):
+            assert multi.rewards(acct, token) == 0
+            stored = multi.rewardData(token)["rewardPerTokenStored"]
+            assert multi.userRewardPerTokenPaid(acct, token) == stored
+
+
+# A batch claim pays the same as each account claiming for itself
+def test_matches_get_reward(multi, stakers, alice, chain):
+    # once every period is over the payouts no longer depend on when they are claimed
+    chain.sleep(2630000)
+    multi.setClaimRelayer(alice, True, {"from": alice})
+    tx = multi.getRewardFor(stakers, {"from": alice})
+    batch = [e["reward"] for e in tx.events["RewardPaid"]]
+    chain.undo()
+
+    txs = [multi.getReward({"from": acct}) for acct in stakers]
+    assert [e["reward"] for t in txs for e in t.events["RewardPaid"]] == batch
+
+
+# Without relayer status, every account must have approved the caller
+def test_user_approval(multi, reward_token, stakers, alice, bob, charlie):
+    with brownie.reverts("Not approved to claim"):
+        multi.getRewardFor([bob], {"from": alice})
+
+    tx = multi.setClaimApproval(alice, True, {"from": bob})
+    assert tx.events["ClaimApprovalSet"].values() == [bob, alice, True]
+    multi.getRewardFor([bob], {"from": alice})
+    stored = multi.rewardData(reward_token)["rewardPerTokenStored"]
+    assert multi.userRewardPerTokenPaid(bob, reward_token) == stored
+
+    with brownie.reverts("Not approved to claim"):
+        multi.getRewardFor([bob, charlie], {"from": alice})
+
+
+# Approvals can be withdrawn
+def test_revoke_approval(multi, stakers, alice, bob):
+    multi.setClaimApproval(alice, True, {"from": bob})
+    multi.setClaimApproval(alice, False, {"from": bob})
+    with brownie.reverts("Not approved to claim"):
+        multi.getRewardFor([bob], {"from": alice})
+
+
+# Any account can claim for itself, and repeated accounts are only paid once
+def test_claim_for_self(multi, stakers, bob):
+    tx = multi.getRewardFor([bob, bob], {"from": bob})
+    assert {e["user"] for e in tx.events["RewardPaid"]} == {bob}
+    assert len(tx.events["RewardPaid"]) == 2
+
+
+# Accounts with nothing to claim are skipped without events
+def test_nothing_to_claim(multi, issue, alice, accounts):
+    multi.setClaimRelayer(alice, True, {"from": alice})
+    tx = multi.getRewardFor(accounts[5:8], {"from": alice})
+    assert "RewardPaid" not in tx.events
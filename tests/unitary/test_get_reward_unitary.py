@@ -178,3 +178,25 @@ def test_withdrawn_user_can_claim(multi, slow_token, base_token, alice, charlie,
             token_log = e
     assert token_log["reward"] == earned_calc
     assert slow_token.balanceOf(charlie) - reward_init_bal == earned_calc
+
+
+# Selective claim only checkpoints and pays the requested tokens
+def test_get_reward_for_tokens(multi, reward_token, slow_token, base_token, charlie, issue, chain):
+    amount = base_token.balanceOf(charlie)
+    base_token.approve(multi, amount, {"from": charlie})
+    multi.stake(amount, {"from": charlie})
+    chain.mine(timedelta=60)
+
+    earnings = multi.earned(charlie, reward_token)
+    tx = multi.getRewardForTokens([reward_token], {"from": charlie})
+    assert len(tx.events["RewardPaid"]) == 1
+    assert tx.events["RewardPaid"]["rewardsToken"] == reward_token
+    assert tx.events["RewardPaid"]["reward"] == earnings
+    assert multi.earned(charlie, reward_token) == 0
+    assert multi.earned(charlie, slow_token) > 0
+
+
+# Selective claim of a token that is not a reward does nothing
+def test_get_reward_for_unregistered_token(multi, err_token, charlie):
+    tx = multi.getRewardForTokens([err_token], {"from": charlie})
+    assert "RewardPaid" not in tx.events
@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+
+
+# Reward token count is exposed for enumeration
+def test_reward_tokens_length(multi, reward_token, reward_token2):
+    assert multi.rewardTokensLength() == 2
+
+
+# Empty gauge returns empty arrays
+def test_no_rewards(multi, lens, alice):
+    assert lens.getRewardInfo(multi) == []
+    assert lens.getEarned(multi, alice) == []
+
+
+# Bulk reward info matches the per-token views
+def test_reward_info(multi, lens, base_token, reward_token, slow_token, alice, issue, chain):
+    multi.stake(10 ** 10, {"from": alice})
+    chain.mine(timedelta=30)
+
+    info = lens.getRewardInfo(multi)
+    assert [i["token"] for i in info] == [reward_token, slow_token]
+    for token, reward in zip([reward_token, slow_token], info):
+        assert tuple(reward)[1:8] == tuple(multi.rewardData(token))
+        assert reward["rewardPerToken"] == multi.rewardPerToken(token)
+
+
+# Bulk earned matches the per-token view
+def test_earned(multi, lens, reward_token, slow_token, alice, issue, chain):
+    multi.stake(10 ** 10, {"from": alice})
+    chain.mine(timedelta=30)
+
+    earned = lens.getEarned(multi, alice)
+    assert earned == [multi.earned(alice, reward_token), multi.earned(alice, slow_token)]
+    assert min(earned) > 0
+
+
+# Gauge state covers every requested account
+def test_gauge_state(multi, lens, base_token, reward_token, slow_token, alice, bob, charlie, chain):
+    base_token.approve(multi, 10 ** 18, {"from": bob})
+    multi.stake(10 ** 18, {"from": bob})
+    chain.mine(timedelta=30)
+
+    info, earned = lens.getGaugeState(multi, [alice, bob, charlie])
+    assert len(info) == 2
+    assert len(earned) == 3
+    for account, amounts in zip([alice, bob, charlie], earned):
+        assert amounts == [multi.earned(account, i["token"]) for i in info]
+    assert earned[1][1] > 0
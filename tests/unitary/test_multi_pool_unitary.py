@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+
+import brownie
+import pytest
+from brownie_tokens.template import ERC20
+
+DURATION = 1000
+
+
+# Reward token distributed by Bob in both pools
+@pytest.fixture(scope="module")
+def shared_token(multi_pool, alice, bob):
+    token = ERC20()
+    token._mint_for_testing(bob, 10 ** 20)
+    token.approve(multi_pool, 2 ** 256 - 1, {"from": bob})
+    for pool_id in range(2):
+        multi_pool.addReward(pool_id, token, bob, DURATION, {"from": alice})
+    return token
+
+
+# Reward token only distributed in pool 1
+@pytest.fixture(scope="module")
+def pool_token(multi_pool, alice, bob):
+    token = ERC20()
+    token._mint_for_testing(bob, 10 ** 20)
+    token.approve(multi_pool, 2 ** 256 - 1, {"from": bob})
+    multi_pool.addReward(1, token, bob, DURATION, {"from": alice})
+    return token
+
+
+# Pools are numbered in the order they were added
+def test_pools(multi_pool, base_token, lp_token):
+    assert multi_pool.poolsLength() == 2
+    assert multi_pool.stakingTokens(0) == base_token
+    assert multi_pool.stakingTokens(1) == lp_token
+    assert multi_pool.isStakingToken(lp_token) is True
+
+
+# A staking token can only have one pool
+def test_duplicate_pool(multi_pool, base_token, alice):
+    with brownie.reverts("Pool already exists"):
+        multi_pool.addPool(base_token, {"from": alice})
+
+
+# Only the owner adds pools
+def test_add_pool_only_owner(multi_pool, bob):
+    with brownie.reverts("Only the contract owner may perform this action"):
+        multi_pool.addPool(ERC20(), {"from": bob})
+
+
+# Staking into a pool that does not exist reverts
+def test_unknown_pool(multi_pool, alice):
+    with brownie.reverts("Unknown pool"):
+        multi_pool.stake(2, 10 ** 10, {"from": alice})
+
+
+# A distributor cannot be set in a pool that does not exist
+def test_set_distributor_unknown_pool(multi_pool, shared_token, alice, bob):
+    with brownie.reverts("Unknown pool"):
+        multi_pool.setRewardsDistributor(2, shared_token, bob, {"from": alice})
+
+
+# Claiming from several pools reverts if any of them does not exist
+def test_get_reward_many_unknown_pool(multi_pool, alice):
+    with brownie.reverts("Unknown pool"):
+        multi_pool.getRewardMany([0, 2], {"from": alice})
+
+
+# Balances and supply are kept per pool
+def test_balances_per_pool(multi_pool, base_token, lp_token, alice, bob):
+    tx = multi_pool.stake(0, 10 ** 10, {"from": alice})
+    multi_pool.stake(1, 10 ** 12, {"from": bob})
+
+    assert tx.events["Staked"]["poolId"] == 0
+    assert tx.events["BalanceUpdated"].values() == [0, alice, 10 ** 10, 10 ** 10]
+    assert multi_pool.balanceOf(0, alice) == 10 ** 10
+    assert multi_pool.balanceOf(1, alice) == 0
+    assert multi_pool.totalSupply(0) == 10 ** 10
+    assert multi_pool.totalSupply(1) == 10 ** 12
+    assert base_token.balanceOf(multi_pool) == 10 ** 10
+    assert lp_token.balanceOf(multi_pool) == 10 ** 12
+
+
+# Reward data of a token shared by two pools is independent
+def test_rewards_per_pool(multi_pool, shared_token, alice, bob, chain):
+    multi_pool.stake(0, 10 ** 10, {"from": alice})
+    multi_pool.stake(1, 10 ** 10, {"from": alice})
+    multi_pool.notifyRewardAmount(0, shared_token, 10 ** 18, {"from": bob})
+    multi_pool.notifyRewardAmount(1, shared_token, 3 * 10 ** 18, {"from": bob})
+    chain.sleep(DURATION)
+    chain.mine()
+
+    assert multi_pool.rewardData(1, shared_token)["rewardRate"] == 3 * (10 ** 18 // DURATION)
+    assert multi_pool.earned(0, alice, shared_token) == pytest.approx(10 ** 18, rel=1e-3)
+    assert multi_pool.earned(1, alice, shared_token) == pytest.approx(3 * 10 ** 18, rel=1e-3)
+
+
+# One transfer pays a reward token shared by several pools
+def test_get_reward_many_shared_token(multi_pool, shared_token, pool_token, alice, bob, chain):
+    multi_pool.stake(0, 10 ** 10, {"from": alice})
+    multi_pool.stake(1, 10 ** 10, {"from": alice})
+    multi_pool.notifyRewardAmount(0, shared_token, 10 ** 18, {"from": bob})
+    multi_pool.notifyRewardAmount(1, shared_token, 10 ** 18, {"from": bob})
+    multi_pool.notifyRewardAmount(1, pool_token, 10 ** 18, {"from": bob})
+    chain.sleep(DURATION)
+
+    tx = multi_pool.getRewardMany([0, 1], {"from": alice})
+
+    paid = [(e["poolId"], e["rewardsToken"], e["reward"]) for e in tx.events["RewardPaid"]]
+    assert [p[:2] for p in paid] == [(0, shared_token), (1, shared_token), (1, pool_token)]
+    assert len(tx.events["Transfer"]) == 2
+    assert shared_token.balanceOf(alice) == paid[0][2] + paid[1][2]
+    assert pool_token.balanceOf(alice) == paid[2][2]
+    for pool_id, token, _ in paid:
+        assert multi_pool.rewards(pool_id, alice, token) == 0
+
+
+# Claiming several pools pays the same as claiming each one
+def test_get_reward_many_matches_get_reward(multi_pool, shared_token, alice, bob, chain):
+    multi_pool.stake(0, 10 ** 10, {"from": alice})
+    multi_pool.stake(1, 3 * 10 ** 10, {"from": alice})
+    multi_pool.stake(1, 10 ** 10, {"from": bob})
+    for pool_id in range(2):
+        multi_pool.notifyRewardAmount(pool_id, shared_token, 10 ** 18, {"from": bob})
+    chain.sleep(DURATION)
+
+    multi_pool.getRewardMany([0, 1], {"from": alice})
+    many = shared_token.balanceOf(alice)
+    chain.undo()
+
+    multi_pool.getReward(0, {"from": alice})
+    multi_pool.getReward(1, {"from": alice})
+    assert shared_token.balanceOf(alice) == many
+
+
+# Repeated or unfunded pools pay nothing extra
+def test_get_reward_many_repeated_pool(multi_pool, shared_token, alice, bob, chain):
+    multi_pool.stake(0, 10 ** 10, {"from": alice})
+    multi_pool.notifyRewardAmount(0, shared_token, 10 ** 18, {"from": bob})
+    chain.sleep(DURATION)
+
+    tx = multi_pool.getRewardMany([0, 0, 1], {"from": alice})
+    assert len(tx.events["RewardPaid"]) == 1
+    assert shared_token.balanceOf(alice) == tx.events["RewardPaid"]["reward"]
+
+
+# Withdrawing from one pool leaves the other untouched
+def test_exit_one_pool(multi_pool, base_token, lp_token, alice):
+    multi_pool.stake(0, 10 ** 10, {"from": alice})
+    multi_pool.stake(1, 10 ** 10, {"from": alice})
+    multi_pool.exit(0, {"from": alice})
+
+    assert multi_pool.balanceOf(0, alice) == 0
+    assert multi_pool.balanceOf(1, alice) == 10 ** 10
+    assert lp_token.balanceOf(multi_pool) == 10 ** 10
+
+
+# Neither staking tokens nor funded reward tokens can be recovered
+def test_recover_protected(multi_pool, lp_token, shared_token, alice, bob):
+    multi_pool.notifyRewardAmount(1, shared_token, 10 ** 18, {"from": bob})
+    with brownie.reverts("Cannot withdraw staking token"):
+        multi_pool.recoverERC20(lp_token, 1, {"from": alice})
+    with brownie.reverts("Cannot withdraw reward token"):
+        multi_pool.recoverERC20(shared_token, 1, {"from": alice})
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+
+import pytest
+
+from scripts.multicall import MulticallClient, MulticallError
+
+
+# Aggregated results match direct calls
+def test_read_matches_direct_calls(multi, client, base_token, reward_token, alice):
+    calls = [
+        (multi.rewardData, [reward_token]),
+        (base_token.balanceOf, [alice]),
+        (multi.totalSupply, []),
+    ]
+    assert client.read(calls) == [
+        multi.rewardData(reward_token),
+        base_token.balanceOf(alice),
+        multi.totalSupply(),
+    ]
+
+
+# Repeated reads in the same block are served from the cache
+def test_cache_hits(multi, client, reward_token):
+    calls = [(multi.rewardData, [reward_token]), (multi.totalSupply, [])]
+    client.read(calls)
+    assert (client.hits, client.misses) == (0, 2)
+
+    client.read(calls)
+    assert (client.hits, client.misses) == (2, 2)
+
+
+# Duplicate calls within one read are only sent once
+def test_duplicate_calls(multi, client):
+    assert client.read([(multi.totalSupply, [])] * 3) == [0, 0, 0]
+    assert client.misses == 1
+
+
+# A new block is a cache miss and returns the new state
+def test_new_block_misses(multi, client, alice):
+    assert client.read_one(multi.balanceOf, alice) == 0
+    multi.stake(10 ** 10, {"from": alice})
+
+    assert client.read_one(multi.balanceOf, alice) == 10 ** 10
+    assert client.misses == 2
+
+
+# Reads at an earlier block return the state of that block
+def test_read_past_block(multi, client, alice, chain):
+    height = chain.height
+    multi.stake(10 ** 10, {"from": alice})
+
+    assert client.read_one(multi.totalSupply, block=height) == 0
+    assert client.read_one(multi.totalSupply) == 10 ** 10
+
+
+# The least recently used result is evicted first
+def test_lru_eviction(multi, multicall, reward_token, slow_token):
+    client = MulticallClient(multicall, cache_size=2)
+    client.read([(multi.rewardData, [reward_token]), (multi.rewardData, [slow_token])])
+    client.read_one(multi.rewardData, reward_token)
+    client.read_one(multi.totalSupply)
+    client.read_one(multi.rewardData, reward_token)
+    assert (client.hits, client.misses) == (2, 3)
+
+    client.read_one(multi.rewardData, slow_token)
+    assert client.misses == 4
+
+
+# Calls are split across several aggregated calls
+def test_batches(multicall, base_token, accounts):
+    client = MulticallClient(multicall, batch_size=2)
+    calls = [(base_token.balanceOf, [a]) for a in accounts[:5]]
+    assert client.read(calls) == [base_token.balanceOf(a) for a in accounts[:5]]
+
+
+# A reverted call raises unless failures are allowed
+def test_failed_call(multi, client, reward_token):
+    calls = [(multi.rewardTokens, [0]), (multi.rewardTokens, [99])]
+    with pytest.raises(MulticallError):
+        client.read(calls)
+
+    assert client.read(calls, require_success=False) == [reward_token.address, None]
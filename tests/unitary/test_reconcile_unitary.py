@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+import pytest
+from eth_utils import to_checksum_address
+
+from scripts.reconcile_rewards import RETIRED, RewardConfig, RewardState, load_config, plan_changes
+
+GAUGE = "0x" + "11" * 20
+TOKEN = "0x" + "22" * 20
+OLD = "0x" + "33" * 20
+NEW = "0x" + "44" * 20
+NOW = 1000
+
+
+# A config that matches the chain needs no actions
+def test_no_changes():
+    desired = {GAUGE: {TOKEN: RewardConfig(OLD, 60)}}
+    current = {GAUGE: {TOKEN: RewardState(OLD, 60, 0)}}
+    assert plan_changes(desired, current, NOW) == []
+
+
+# Unknown tokens are added with their distributor and duration in one call
+def test_add_reward():
+    actions = plan_changes({GAUGE: {TOKEN: RewardConfig(NEW, 60)}}, {GAUGE: {}}, NOW)
+    assert [(a.function, a.args, a.sender) for a in actions] == [
+        ("addReward", (TOKEN, NEW, 60), "owner")
+    ]
+
+
+# A new distributor is set before it changes the duration
+def test_change_distributor_and_duration():
+    desired = {GAUGE: {TOKEN: RewardConfig(NEW, 120)}}
+    current = {GAUGE: {TOKEN: RewardState(OLD, 60, NOW - 1)}}
+    actions = plan_changes(desired, current, NOW)
+    assert [(a.function, a.args, a.sender, a.blocked) for a in actions] == [
+        ("setRewardsDistributor", (TOKEN, NEW), "owner", None),
+        ("setRewardsDuration", (TOKEN, 120), NEW, None),
+    ]
+
+
+# Durations cannot change while a period is running
+def test_duration_blocked():
+    desired = {GAUGE: {TOKEN: RewardConfig(OLD, 120)}}
+    current = {GAUGE: {TOKEN: RewardState(OLD, 60, NOW)}}
+    (action,) = plan_changes(desired, current, NOW)
+    assert action.function == "setRewardsDuration"
+    assert action.blocked is not None
+
+
+# A retired token cannot be added again, its config is reported and never sent
+def test_retired_token():
+    desired = {GAUGE: {TOKEN: RewardConfig(NEW, 60)}}
+    (action,) = plan_changes(desired, {GAUGE: {TOKEN: RETIRED}}, NOW)
+    assert (action.function, action.args) == ("addReward", (TOKEN, NEW, 60))
+    assert action.blocked == "reward token is retired, remove it from the config"
+
+
+# Addresses are checksummed and durations validated
+def test_load_config(tmp_path):
+    token = "0x" + "ab" * 20
+    path = tmp_path.joinpath("rewards.yaml")
+    path.write_text(
+        f'gauges:\n  "{GAUGE}":\n    "{token}":\n      distributor: "{NEW}"\n      duration: 60\n'
+    )
+    assert load_config(path) == {GAUGE: {to_checksum_address(token): RewardConfig(NEW, 60)}}
+
+    path.write_text(
+        f'gauges:\n  "{GAUGE}":\n    "{token}":\n      distributor: "{NEW}"\n      duration: 0\n'
+    )
+    with pytest.raises(ValueError):
+        load_config(path)
+
+
+# Unquoted addresses are parsed as integers by YAML and rejected
+def test_load_config_unquoted(tmp_path):
+    path = tmp_path.joinpath("rewards.yaml")
+    path.write_text(
+        f"gauges:\n  {GAUGE}:\n    {TOKEN}:\n      distributor: {NEW}\n      duration: 60\n"
+    )
+    with pytest.raises(ValueError):
+        load_config(path)
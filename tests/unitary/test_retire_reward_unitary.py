@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+
+import brownie
+import pytest
+from brownie_tokens.template import ERC20
+
+
+# Alice stakes through a full period of Bob's reward token and of a second token
+@pytest.fixture
+def finished(multi, reward_token, reward_token2, alice, bob, charlie, chain):
+    reward_token.approve(multi, 2 ** 256 - 1, {"from": bob})
+    reward_token2.approve(multi, 10 ** 18, {"from": charlie})
+    multi.stake(10 ** 10, {"from": alice})
+    multi.notifyRewardAmount(reward_token, 10 ** 18, {"from": bob})
+    multi.notifyRewardAmount(reward_token2, 10 ** 18, {"from": charlie})
+    chain.sleep(120)
+    chain.mine()
+    return reward_token
+
+
+# The token is swapped out of `rewardTokens` and moved to the claim-only set
+def test_retire(multi, finished, reward_token2, alice):
+    tx = multi.retireReward(finished, {"from": alice})
+
+    assert multi.rewardTokensLength() == 1
+    assert multi.rewardTokens(0) == reward_token2
+    assert multi.retiredRewardTokensLength() == 1
+    assert multi.retiredRewardTokens(0) == finished
+    assert multi.rewardTokenRetired(finished)
+    stored = multi.rewardData(finished)["rewardPerTokenStored"]
+    assert tx.events["RewardRetired"].values() == [finished, stored]
+
+
+# Only the owner can retire, and only once the period is over
+def test_retire_invalid(multi, reward_token, finished, alice, bob, chain):
+    with brownie.reverts("Only the contract owner may perform this action"):
+        multi.retireReward(finished, {"from": bob})
+    with brownie.reverts("Not a reward token"):
+        multi.retireReward(ERC20(), {"from": alice})
+
+    multi.notifyRewardAmount(reward_token, 10 ** 17, {"from": bob})
+    with brownie.reverts("Reward period still active"):
+        multi.retireReward(finished, {"from": alice})
+
+    chain.sleep(120)
+    multi.retireReward(finished, {"from": alice})
+    with brownie.reverts("Not a reward token"):
+        multi.retireReward(finished, {"from": alice})
+
+
+# `getReward` skips the retired token, which is claimed with `getRetiredRewards`
+def test_claim_retired(multi, finished, alice):
+    earned = multi.earned(alice, finished)
+    multi.retireReward(finished, {"from": alice})
+
+    tx = multi.getReward({"from": alice})
+    assert finished not in [e["rewardsToken"] for e in tx.events["RewardPaid"]]
+    assert multi.earned(alice, finished) == earned
+
+    balance = finished.balanceOf(alice)
+    tx = multi.getRetiredRewards({"from": alice})
+    assert tx.events["RewardPaid"].values() == [alice, finished, earned]
+    assert finished.balanceOf(alice) == balance + earned
+    assert multi.earned(alice, finished) == 0
+
+
+# Balance changes after retirement do not change what is owed
+def test_stake_after_retire(multi, finished, alice, chain):
+    earned = multi.earned(alice, finished)
+    multi.retireReward(finished, {"from": alice})
+    multi.stake(10 ** 10, {"from": alice})
+    chain.sleep(60)
+    multi.withdraw(5 * 10 ** 9, {"from": alice})
+
+    assert multi.userRetiredRewards(alice) == 1
+    assert multi.rewards(alice, finished) == earned
+    assert multi.earned(alice, finished) == earned
+    tx = multi.getRewardForTokens([finished], {"from": alice})
+    assert tx.events["RewardPaid"]["reward"] == earned
+
+
+# A retired token can never be funded, reconfigured or added again
+def test_retired_is_final(multi, finished, alice, bob):
+    multi.retireReward(finished, {"from": alice})
+
+    with brownie.reverts():
+        multi.notifyRewardAmount(finished, 10 ** 17, {"from": bob})
+    with brownie.reverts():
+        multi.setRewardsDuration(finished, 120, {"from": bob})
+    with brownie.reverts("Reward token is retired"):
+        multi.setRewardsDistributor(finished, bob, {"from": alice})
+    with brownie.reverts():
+        multi.addReward(finished, bob, 60, {"from": alice})
+    with brownie.reverts("Cannot withdraw reward token"):
+        multi.recoverERC20(finished, 1, {"from": alice})
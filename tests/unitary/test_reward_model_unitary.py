@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+
+import pytest
+from hypothesis import settings
+from hypothesis import strategies as st
+from hypothesis.stateful import RuleBasedStateMachine, invariant, precondition, rule
+
+from scripts.reward_model import MAX_SCHEDULED_STREAMS, ModelRevert, MultiRewardsModel
+
+ACCOUNTS = ["alice", "bob", "charlie", "dave"]
+DURATIONS = {"fast": 60, "slow": 86400}
+DISTRIBUTOR = "distributor"
+
+st_account = st.sampled_from(ACCOUNTS)
+st_token = st.sampled_from(sorted(DURATIONS))
+st_amount = st.integers(min_value=0, max_value=10 ** 24)
+
+
+# The model alone runs without a chain, so it can be checked against invariants over
+# thousands of operation sequences. tests/integration/test_reward_model_integration.py
+# compares it with the deployed contract.
+class ModelStateMachine(RuleBasedStateMachine):
+    def __init__(self):
+        super().__init__()
+        self.model = MultiRewardsModel()
+        self.now = 1600000000
+        self.funded = dict.fromkeys(DURATIONS, 0)
+        self.paid = dict.fromkeys(DURATIONS, 0)
+        for token, duration in DURATIONS.items():
+            self.model.add_reward(token, DISTRIBUTOR, duration)
+
+    def _record_paid(self, paid):
+        for token, amount in paid.items():
+            assert amount > 0
+            self.paid[token] += amount
+
+    @rule(seconds=st.integers(min_value=0, max_value=2 * 86400))
+    def sleep(self, seconds):
+        self.now += seconds
+
+    @rule(account=st_account, amount=st_amount)
+    def stake(self, account, amount):
+        try:
+            self.model.stake(account, amount, self.now)
+        except ModelRevert:
+            assert amount == 0
+
+    @rule(account=st_account, amount=st_amount)
+    def withdraw(self, account, amount):
+        balance = self.model.balances[account]
+        try:
+            self.model.withdraw(account, amount, self.now)
+        except ModelRevert:
+            assert amount == 0 or amount > balance
+        else:
+            assert self.model.balances[account] == balance - amount
+
+    # a transfer moves the balance without changing the supply or what was earned before it
+    @rule(sender=st_account, recipient=st_account, amount=st_amount)
+    def transfer(self, sender, recipient, amount):
+        supply = self.model.total_supply
+        balance = self.model.balances[sender]
+        try:
+            self.model.transfer(sender, recipient, amount, self.now)
+        except ModelRevert:
+            assert amount > balance
+            return
+        assert self.model.total_supply == supply
+        for token in DURATIONS:
+            assert (
+                self.model.earned(recipient, token, self.now)
+                == self.model.rewards[recipient, token]
+            )
+
+    @rule(account=st_account)
+    def get_reward(self, account):
+        self._record_paid(self.model.get_reward(account, self.now))
+        for token in self.model.reward_tokens:
+            assert self.model.earned(account, token, self.now) == 0
+
+    @rule(account=st_account, tokens=st.lists(st_token, max_size=3))
+    def get_reward_for_tokens(self, account, tokens):
+        self._record_paid(self.model.get_reward_for_tokens(account, tokens, self.now))
+        for token in tokens:
+            assert self.model.earned(account, token, self.now) == 0
+
+    @rule(accounts=st.lists(st_account, max_size=4))
+    def get_reward_for(self, accounts):
+        for account, token, amount in self.model.get_reward_for(accounts, self.now):
+            self._record_paid({token: amount})
+        for account in accounts:
+            for token in self.model.reward_tokens:
+                assert self.model.earned(account, token, self.now) == 0
+
+    # "fast" doubles as the staking token, so its rewards can be restaked
+    @rule(accounts=st.lists(st_account, max_size=4))
+    def compound_for(self, accounts):
+        supply = self.model.total_supply
+        restaked = self.model.compound_for(accounts, "fast", self.now)
+        self._record_paid({"fast": sum(amount for _, amount in restaked)} if restaked else {})
+        assert self.model.total_supply == supply + sum(amount for _, amount in restaked)
+        for account in accounts:
+            assert self.model.earned(account, "fast", self.now) == 0
+
+    @precondition(lambda self: any(self.model.balances.values()))
+    @rule(data=st.data())
+    def exit(self, data):
+        account = data.draw(st.sampled_from([a for a in ACCOUNTS if self.model.balances[a]]))
+        amount, paid = self.model.exit(account, self.now)
+        assert amount > 0
+        assert self.model.balances[account] == 0
+        self._record_paid(paid)
+
+    @rule(token=st_token, reward=st_amount)
+    def notify_reward_amount(self, token, reward):
+        try:
+            self.model.notify_reward_amount(DISTRIBUTOR, token, reward, self.now)
+        except ModelRevert:
+            # only a queued stream or retirement can block a new period
+            retired = token in self.model.retired_reward_tokens
+            assert retired or self.model.reward_data[token].next_stream_start
+        else:
+            self.funded[token] += reward
+
+    @rule(
+        token=st_token,
+        reward=st_amount,
+        gap=st.integers(min_value=0, max_value=86400),
+        duration=st.integers(min_value=1, max_value=86400),
+    )
+    def schedule_reward_amount(self, token, reward, gap, duration):
+        streams = self.model.reward_streams[token]
+        pending = len(streams) - self.model.next_reward_stream[token]
+        finish = streams[-1][1] if pending else self.model.reward_data[token].period_finish
+        start = max(finish, self.now) + gap
+        try:
+            self.model.schedule_reward_amount(DISTRIBUTOR, token, reward, start, duration, self.now)
+        except ModelRevert:
+            assert pending == MAX_SCHEDULED_STREAMS or token in self.model.retired_reward_tokens
+        else:
+            self.funded[token] += reward
+
+    @rule(token=st_token, reward=st_amount)
+    def notify_from_stranger(self, token, reward):
+        with pytest.raises(ModelRevert):
+            self.model.notify_reward_amount("stranger", token, reward, self.now)
+
+    @rule(token=st_token, duration=st.integers(min_value=1, max_value=86400))
+    def set_rewards_duration(self, token, duration):
+        finish = self.model.reward_data[token].period_finish
+        try:
+            self.model.set_rewards_duration(DISTRIBUTOR, token, duration, self.now)
+        except ModelRevert:
+            assert self.now <= finish or token in self.model.retired_reward_tokens
+
+    @rule(token=st_token)
+    def retire_reward(self, token):
+        owed = {a: self.model.earned(a, token, self.now) for a in ACCOUNTS}
+        try:
+            self.model.retire_reward(token, self.now)
+        except ModelRevert:
+            return
+        assert token not in self.model.reward_tokens
+        # retiring settles nothing away, every account can still claim what it earned
+        assert {a: self.model.earned(a, token, self.now) for a in ACCOUNTS} == owed
+
+    @rule(account=st_account)
+    def get_retired_rewards(self, account):
+        self._record_paid(self.model.get_retired_rewards(account, self.now))
+        for token in self.model.retired_reward_tokens:
+            assert self.model.earned(account, token, self.now) == 0
+
+    @invariant()
+    def supply_matches_balances(self):
+        assert self.model.total_supply == sum(self.model.balances.values())
+
+    @invariant()
+    def no_over_distribution(self):
+        for token in DURATIONS:
+            owed = sum(self.model.earned(a, token, self.now) for a in ACCOUNTS)
+            assert self.paid[token] + owed <= self.funded[token]
+
+    @invariant()
+    def distribution_bounded_by_rate(self):
+        # nothing accrues beyond what the current rate releases by `periodFinish`
+        for token, data in self.model.reward_data.items():
+            remaining = max(data.period_finish - self.now, 0) * data.reward_rate
+            owed = sum(self.model.earned(a, token, self.now) for a in ACCOUNTS)
+            assert self.paid[token] + owed + remaining <= self.funded[token]
+
+
+TestModelStateMachine = ModelStateMachine.TestCase
+TestModelStateMachine.settings = settings(max_examples=2000, stateful_step_count=30, deadline=None)
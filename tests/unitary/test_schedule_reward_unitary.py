@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+
+import brownie
+import pytest
+
+AMOUNT = 10 ** 18
+DURATION = 100
+
+
+# Bob, the distributor of the reward token, approves the gauge and Alice stakes
+@pytest.fixture
+def staked(multi, reward_token, alice, bob):
+    reward_token.approve(multi, 2 ** 256 - 1, {"from": bob})
+    multi.stake(10 ** 10, {"from": alice})
+
+
+# A scheduled stream is funded up front, queued and activates the token
+def test_schedule(multi, reward_token, staked, bob, chain):
+    start = chain.time() + 100
+    balance = reward_token.balanceOf(bob)
+    tx = multi.scheduleRewardAmount(reward_token, AMOUNT, start, DURATION, {"from": bob})
+
+    assert reward_token.balanceOf(bob) == balance - AMOUNT
+    assert tx.events["RewardScheduled"].values() == [
+        reward_token,
+        AMOUNT,
+        start,
+        start + DURATION,
+    ]
+    assert multi.rewardStreamsLength(reward_token) == 1
+    assert multi.rewardStreams(reward_token, 0) == (start, start + DURATION, AMOUNT // DURATION)
+    assert multi.rewardData(reward_token)["nextStreamStart"] == start
+    assert multi.activeRewardTokens(0) == reward_token
+
+
+# `rewardData` keeps the original field order, the queued start comes last
+def test_reward_data_order(multi, reward_token, staked, bob):
+    tx = multi.notifyRewardAmount(reward_token, AMOUNT, {"from": bob})
+    finish = tx.timestamp + 60
+    multi.scheduleRewardAmount(reward_token, AMOUNT, finish, DURATION, {"from": bob})
+
+    data = multi.rewardData(reward_token)
+    assert data[:5] == (bob, 60, finish, AMOUNT // 60, tx.timestamp)
+    assert data[6] == data["nextStreamStart"] == finish
+
+
+# The reward for a duration follows a started stream, but not one queued for later
+def test_reward_for_duration(multi, reward_token, staked, bob, chain):
+    start = chain.time() + 100
+    multi.scheduleRewardAmount(reward_token, AMOUNT, start, DURATION, {"from": bob})
+    assert multi.getRewardForDuration(reward_token) == 0
+
+    chain.sleep(110)
+    chain.mine()
+    assert multi.rewardData(reward_token)["rewardRate"] == 0
+    assert multi.getRewardForDuration(reward_token) == AMOUNT // DURATION * 60
+
+
+# Only the distributor can schedule a stream
+def test_schedule_only_distributor(multi, reward_token, staked, alice, chain):
+    with brownie.reverts():
+        multi.scheduleRewardAmount(
+            reward_token, AMOUNT, chain.time() + 100, DURATION, {"from": alice}
+        )
+
+
+# Streams cannot start in the past or last no time
+def test_schedule_invalid(multi, reward_token, staked, bob, chain):
+    with brownie.reverts("Stream starts in the past"):
+        multi.scheduleRewardAmount(reward_token, AMOUNT, chain.time() - 10, DURATION, {"from": bob})
+    with brownie.reverts("Reward duration must be non-zero"):
+        multi.scheduleRewardAmount(reward_token, AMOUNT, chain.time() + 100, 0, {"from": bob})
+
+
+# Streams cannot overlap the current period or each other
+def test_schedule_overlap(multi, reward_token, staked, bob):
+    multi.notifyRewardAmount(reward_token, AMOUNT, {"from": bob})
+    finish = multi.rewardData(reward_token)["periodFinish"]
+    with brownie.reverts("Overlaps a scheduled period"):
+        multi.scheduleRewardAmount(reward_token, AMOUNT, finish - 1, DURATION, {"from": bob})
+
+    multi.scheduleRewardAmount(reward_token, AMOUNT, finish, DURATION, {"from": bob})
+    with brownie.reverts("Overlaps a scheduled period"):
+        multi.scheduleRewardAmount(reward_token, AMOUNT, finish + DURATION - 1, 10, {"from": bob})
+    multi.scheduleRewardAmount(reward_token, AMOUNT, finish + DURATION, DURATION, {"from": bob})
+
+
+# A stream starts accruing at its start time without a transaction
+def test_stream_starts_without_transaction(multi, reward_token, staked, alice, bob, chain):
+    start = chain.time() + 100
+    multi.scheduleRewardAmount(reward_token, AMOUNT, start, DURATION, {"from": bob})
+    assert multi.earned(alice, reward_token) == 0
+
+    chain.sleep(100 + DURATION // 2)
+    chain.mine()
+    assert 0 < multi.earned(alice, reward_token) < AMOUNT
+
+    chain.sleep(DURATION)
+    chain.mine()
+    assert multi.earned(alice, reward_token) == pytest.approx(AMOUNT, rel=1e-6)
+    assert multi.lastTimeRewardApplicable(reward_token) == start + DURATION
+
+
+# A single checkpoint switches through every stream that has started
+def test_back_to_back_streams(multi, reward_token, staked, alice, bob, chain):
+    start = chain.time() + 100
+    for i in range(3):
+        multi.scheduleRewardAmount(
+            reward_token, AMOUNT, start + i * DURATION, DURATION, {"from": bob}
+        )
+    chain.sleep(100 + 3 * DURATION)
+    expected = multi.earned(alice, reward_token)
+    assert expected == pytest.approx(3 * AMOUNT, rel=1e-6)
+
+    tx = multi.getReward({"from": alice})
+
+    assert tx.events["RewardPaid"]["reward"] == expected
+    assert multi.nextRewardStream(reward_token) == 3
+    data = multi.rewardData(reward_token)
+    assert data["nextStreamStart"] == 0
+    assert data["periodFinish"] == start + 3 * DURATION
+    assert data["rewardRate"] == AMOUNT // DURATION
+    # the last stream is over, so the token leaves the active set
+    with brownie.reverts():
+        multi.activeRewardTokens(0)
+
+
+# A notification cannot run into a scheduled stream
+def test_notify_overlapping_stream(multi, reward_token, staked, bob, chain):
+    multi.scheduleRewardAmount(reward_token, AMOUNT, chain.time() + 30, DURATION, {"from": bob})
+    with brownie.reverts("Overlaps a scheduled period"):
+        multi.notifyRewardAmount(reward_token, AMOUNT, {"from": bob})
+
+
+# The number of queued streams is bounded
+def test_schedule_limit(multi, reward_token, staked, bob, chain):
+    start = chain.time() + 100
+    limit = multi.MAX_SCHEDULED_STREAMS()
+    for i in range(limit):
+        multi.scheduleRewardAmount(reward_token, 10, start + i * 10, 10, {"from": bob})
+    with brownie.reverts("Too many scheduled streams"):
+        multi.scheduleRewardAmount(reward_token, 10, start + limit * 10, 10, {"from": bob})
+
+
+# Funds of a scheduled stream cannot be recovered
+def test_recover_scheduled(multi, reward_token, staked, alice, bob, chain):
+    multi.scheduleRewardAmount(reward_token, AMOUNT, chain.time() + 100, DURATION, {"from": bob})
+    with brownie.reverts("Cannot withdraw reward token"):
+        multi.recoverERC20(reward_token, AMOUNT, {"from": alice})
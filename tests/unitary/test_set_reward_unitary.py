@@ -170,6 +170,38 @@ def test_cannot_set_duration_zero(multi, reward_token, alice, chain):
         multi.setRewardsDuration(reward_token, 0, {"from": alice})
 
 
+# Can the distributor fund several tokens in one call?
+def test_notify_reward_amounts(multi, reward_token, reward_token2, alice):
+    for token in (reward_token, reward_token2):
+        token.approve(multi, 10 ** 18, {"from": alice})
+        multi.setRewardsDistributor(token, alice, {"from": alice})
+
+    tx = multi.notifyRewardAmounts(
+        [reward_token, reward_token2], [10 ** 15, 10 ** 14], {"from": alice}
+    )
+    assert [e["reward"] for e in tx.events["RewardAdded"]] == [10 ** 15, 10 ** 14]
+    assert multi.rewardData(reward_token)["rewardRate"] == 10 ** 15 // 60
+    assert multi.rewardData(reward_token2)["rewardRate"] == 10 ** 14 // 60
+
+
+# Batched notification checks the distributor of every token
+def test_notify_reward_amounts_distributor(multi, reward_token, reward_token2, alice):
+    reward_token.approve(multi, 10 ** 18, {"from": alice})
+    reward_token2.approve(multi, 10 ** 18, {"from": alice})
+    multi.setRewardsDistributor(reward_token, alice, {"from": alice})
+    with brownie.reverts():
+        multi.notifyRewardAmounts(
+            [reward_token, reward_token2], [10 ** 15, 10 ** 14], {"from": alice}
+        )
+
+
+# Token and amount arrays must line up
+def test_notify_reward_amounts_length_mismatch(multi, reward_token, alice):
+    multi.setRewardsDistributor(reward_token, alice, {"from": alice})
+    with brownie.reverts("Array lengths differ"):
+        multi.notifyRewardAmounts([reward_token], [10 ** 15, 10 ** 14], {"from": alice})
+
+
 # def test_rewards_division_by_zero(multi, reward_token, alice, chain):
 #    reward_token.approve(multi, 10 ** 19, {"from": alice})
 #    multi.setRewardsDistributor(reward_token, alice, {"from": alice})
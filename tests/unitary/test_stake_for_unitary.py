@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+
+import brownie
+from brownie import ZERO_ADDRESS
+
+
+# The caller pays and the beneficiary holds the stake
+def test_stake_for(multi, base_token, alice, bob):
+    initial = base_token.balanceOf(alice)
+    tx = multi.stakeFor(bob, 10 ** 10, {"from": alice})
+
+    assert multi.balanceOf(bob) == 10 ** 10
+    assert multi.balanceOf(alice) == 0
+    assert base_token.balanceOf(alice) == initial - 10 ** 10
+    assert tx.events["Staked"].values() == [bob, 10 ** 10]
+    assert tx.events["BalanceUpdated"].values() == [bob, 10 ** 10, multi.totalSupply()]
+
+
+# The beneficiary is checkpointed exactly like a stake of its own
+def test_stake_for_checkpoints(multi, base_token, reward_token, issue, alice, bob, chain):
+    base_token.approve(multi, 10 ** 18, {"from": bob})
+    multi.stake(10 ** 10, {"from": bob})
+    chain.sleep(30)
+    multi.stakeFor(bob, 10 ** 10, {"from": alice})
+
+    stored = multi.rewardData(reward_token)["rewardPerTokenStored"]
+    assert multi.userRewardPerTokenPaid(bob, reward_token) == stored
+    assert multi.rewards(bob, reward_token) > 0
+    assert multi.userRewardPerTokenPaid(alice, reward_token) == 0
+
+
+# Only the beneficiary can withdraw
+def test_beneficiary_withdraws(multi, base_token, alice, bob):
+    multi.stakeFor(bob, 10 ** 10, {"from": alice})
+    with brownie.reverts("SafeMath: subtraction overflow"):
+        multi.withdraw(10 ** 10, {"from": alice})
+    multi.withdraw(10 ** 10, {"from": bob})
+    assert base_token.balanceOf(multi) == 0
+
+
+# Invalid stakes revert
+def test_stake_for_invalid(multi, alice, bob):
+    with brownie.reverts("Cannot stake for the zero address"):
+        multi.stakeFor(ZERO_ADDRESS, 10 ** 10, {"from": alice})
+    with brownie.reverts("Cannot stake 0"):
+        multi.stakeFor(bob, 0, {"from": alice})
+
+    multi.setPaused(True, {"from": alice})
+    with brownie.reverts("This action cannot be performed while the contract is paused"):
+        multi.stakeFor(bob, 10 ** 10, {"from": alice})
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+
+import brownie
+import pytest
+from eth_account import Account
+from eth_account.messages import encode_structured_data
+
+AMOUNT = 10 ** 18
+
+
+@pytest.fixture(scope="module")
+def permit_token(PermitToken, alice):
+    return PermitToken.deploy({"from": alice})
+
+
+@pytest.fixture(scope="module")
+def permit_multi(MultiRewards, permit_token, alice):
+    return MultiRewards.deploy(alice, permit_token, {"from": alice})
+
+
+# A local account, the only kind whose key can sign a permit
+@pytest.fixture(scope="module")
+def staker(accounts, permit_token, alice):
+    acct = accounts.add()
+    alice.transfer(acct, 10 ** 18)
+    permit_token.mint(acct, AMOUNT, {"from": alice})
+    return acct
+
+
+def _sign_permit(token, owner, spender, value, deadline):
+    data = {
+        "types": {
+            "EIP712Domain": [
+                {"name": "name", "type": "string"},
+                {"name": "version", "type": "string"},
+                {"name": "chainId", "type": "uint256"},
+                {"name": "verifyingContract", "type": "address"},
+            ],
+            "Permit": [
+                {"name": "owner", "type": "address"},
+                {"name": "spender", "type": "address"},
+                {"name": "value", "type": "uint256"},
+                {"name": "nonce", "type": "uint256"},
+                {"name": "deadline", "type": "uint256"},
+            ],
+        },
+        "domain": {
+            "name": token.name(),
+            "version": "1",
+            "chainId": token.chainId(),
+            "verifyingContract": token.address,
+        },
+        "primaryType": "Permit",
+        "message": {
+            "owner": owner.address,
+            "spender": spender.address,
+            "value": value,
+            "nonce": token.nonces(owner),
+            "deadline": deadline,
+        },
+    }
+    signed = Account.sign_message(encode_structured_data(data), owner.private_key)
+    return signed.v, signed.r, signed.s
+
+
+# One transaction approves and stakes, without a prior approve
+def test_stake_with_permit(permit_multi, permit_token, staker, chain):
+    deadline = chain.time() + 3600
+    v, r, s = _sign_permit(permit_token, staker, permit_multi, AMOUNT, deadline)
+    tx = permit_multi.stakeWithPermit(AMOUNT, deadline, v, r, s, {"from": staker})
+
+    assert permit_multi.balanceOf(staker) == AMOUNT
+    assert permit_token.balanceOf(permit_multi) == AMOUNT
+    assert permit_token.allowance(staker, permit_multi) == 0
+    assert tx.events["Staked"]["user"] == staker
+
+
+# A signature for another amount does not approve the stake
+def test_wrong_amount(permit_multi, permit_token, staker, chain):
+    deadline = chain.time() + 3600
+    v, r, s = _sign_permit(permit_token, staker, permit_multi, AMOUNT // 2, deadline)
+    with brownie.reverts("Invalid signature"):
+        permit_multi.stakeWithPermit(AMOUNT, deadline, v, r, s, {"from": staker})
+
+
+# Expired permits are rejected
+def test_expired_permit(permit_multi, permit_token, staker, chain):
+    deadline = chain.time() - 1
+    v, r, s = _sign_permit(permit_token, staker, permit_multi, AMOUNT, deadline)
+    with brownie.reverts("Permit expired"):
+        permit_multi.stakeWithPermit(AMOUNT, deadline, v, r, s, {"from": staker})
+
+
+# A permit signed by someone else cannot be used
+def test_permit_of_other_account(permit_multi, permit_token, staker, alice, chain):
+    deadline = chain.time() + 3600
+    v, r, s = _sign_permit(permit_token, staker, permit_multi, AMOUNT, deadline)
+    with brownie.reverts("Invalid signature"):
+        permit_multi.stakeWithPermit(AMOUNT, deadline, v, r, s, {"from": alice})
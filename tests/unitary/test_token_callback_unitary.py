@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+
+import brownie
+import pytest
+from eth_abi import encode_abi
+
+AMOUNT = 10 ** 18
+
+
+@pytest.fixture(scope="module")
+def callback_token(CallbackToken, accounts, alice):
+    token = CallbackToken.deploy({"from": alice})
+    for acct in accounts[:3]:
+        token.mint(acct, AMOUNT, {"from": alice})
+    return token
+
+
+@pytest.fixture(scope="module")
+def callback_multi(MultiRewards, callback_token, alice):
+    return MultiRewards.deploy(alice, callback_token, {"from": alice})
+
+
+# `transferAndCall` moves the tokens and stakes them in one transaction
+def test_transfer_and_call(callback_multi, callback_token, bob):
+    tx = callback_token.transferAndCall(callback_multi, AMOUNT, b"", {"from": bob})
+
+    assert callback_multi.balanceOf(bob) == AMOUNT
+    assert callback_multi.totalSupply() == AMOUNT
+    assert callback_token.balanceOf(callback_multi) == AMOUNT
+    assert tx.events["Staked"].values() == [bob, AMOUNT]
+    assert tx.events["BalanceUpdated"].values() == [bob, AMOUNT, AMOUNT]
+
+
+# The stake is credited to the address encoded in `data`
+def test_transfer_and_call_for(callback_multi, callback_token, bob, charlie):
+    data = encode_abi(["address"], [charlie.address])
+    callback_token.transferAndCall(callback_multi, AMOUNT, data, {"from": bob})
+
+    assert callback_multi.balanceOf(charlie) == AMOUNT
+    assert callback_multi.balanceOf(bob) == 0
+
+
+# Staked tokens are withdrawn like any other stake
+def test_withdraw(callback_multi, callback_token, bob):
+    callback_token.transferAndCall(callback_multi, AMOUNT, b"", {"from": bob})
+    callback_multi.withdraw(AMOUNT, {"from": bob})
+    assert callback_token.balanceOf(bob) == AMOUNT
+
+
+# Only the staking token can credit a stake through the callback
+def test_only_staking_token(callback_multi, multi, bob):
+    with brownie.reverts("Only the staking token"):
+        callback_multi.onTokenTransfer(bob, AMOUNT, b"", {"from": bob})
+    with brownie.reverts("Only the staking token"):
+        multi.onTokenTransfer(bob, AMOUNT, b"", {"from": bob})
+
+
+# Empty transfers stake nothing and revert
+def test_zero_amount(callback_multi, callback_token, bob):
+    with brownie.reverts("Cannot stake 0"):
+        callback_token.transferAndCall(callback_multi, 0, b"", {"from": bob})
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+
+import brownie
+from brownie import ZERO_ADDRESS
+from brownie_tokens.template import ERC20
+
+
+# The position moves to the recipient and the staking token stays in the gauge
+def test_transfer(multi, base_token, alice, bob):
+    multi.stake(10 ** 10, {"from": alice})
+    held = base_token.balanceOf(multi)
+    supply = multi.totalSupply()
+
+    tx = multi.transfer(bob, 4 * 10 ** 9, {"from": alice})
+
+    assert multi.balanceOf(alice) == 6 * 10 ** 9
+    assert multi.balanceOf(bob) == 4 * 10 ** 9
+    assert multi.totalSupply() == supply
+    assert base_token.balanceOf(multi) == held
+    assert tx.events["Transfer"].values() == [alice, bob, 4 * 10 ** 9]
+    assert [e.values() for e in tx.events["BalanceUpdated"]] == [
+        [alice, 6 * 10 ** 9, supply],
+        [bob, 4 * 10 ** 9, supply],
+    ]
+    assert "Staked" not in tx.events and "Withdrawn" not in tx.events
+
+
+# Staking mints the receipt and withdrawing burns it
+def test_mint_and_burn(multi, alice):
+    tx = multi.stake(10 ** 10, {"from": alice})
+    minted = [e.values() for e in tx.events["Transfer"] if e.address == multi]
+    assert minted == [[ZERO_ADDRESS, alice, 10 ** 10]]
+
+    tx = multi.withdraw(4 * 10 ** 9, {"from": alice})
+    burned = [e.values() for e in tx.events["Transfer"] if e.address == multi]
+    assert burned == [[alice, ZERO_ADDRESS, 4 * 10 ** 9]]
+
+
+# The receipt has the decimals of the staking token
+def test_decimals(MultiRewards, multi, base_token, alice):
+    assert multi.decimals() == base_token.decimals()
+
+    staking_token = ERC20(decimals=6)
+    gauge = MultiRewards.deploy(alice, staking_token, {"from": alice})
+    assert gauge.decimals() == 6
+
+
+# Both accounts are checkpointed, rewards earned before the transfer stay with the sender
+def test_transfer_checkpoints(multi, reward_token, issue, alice, bob, chain):
+    multi.stake(10 ** 10, {"from": alice})
+    chain.sleep(30)
+    multi.transfer(bob, 10 ** 10, {"from": alice})
+
+    stored = multi.rewardData(reward_token)["rewardPerTokenStored"]
+    assert multi.userRewardPerTokenPaid(alice, reward_token) == stored
+    assert multi.userRewardPerTokenPaid(bob, reward_token) == stored
+    assert multi.rewards(alice, reward_token) > 0
+    assert multi.earned(bob, reward_token) == 0
+
+    chain.sleep(10)
+    chain.mine()
+    assert multi.earned(alice, reward_token) == multi.rewards(alice, reward_token)
+    assert multi.earned(bob, reward_token) > 0
+
+
+# The recipient can withdraw the staking token it never deposited
+def test_recipient_withdraws(multi, base_token, alice, bob):
+    multi.stake(10 ** 10, {"from": alice})
+    multi.transfer(bob, 10 ** 10, {"from": alice})
+    balance = base_token.balanceOf(bob)
+
+    multi.withdraw(10 ** 10, {"from": bob})
+    assert base_token.balanceOf(bob) == balance + 10 ** 10
+    with brownie.reverts("SafeMath: subtraction overflow"):
+        multi.withdraw(1, {"from": alice})
+
+
+# A transfer to oneself leaves the position and the supply as they were
+def test_self_transfer(multi, alice, bob):
+    multi.stake(10 ** 10, {"from": alice})
+    multi.stake(10 ** 10, {"from": bob})
+    supply = multi.totalSupply()
+
+    tx = multi.transfer(alice, 10 ** 10, {"from": alice})
+    assert tx.events["Transfer"].values() == [alice, alice, 10 ** 10]
+    multi.approve(bob, 2 ** 256 - 1, {"from": alice})
+    multi.transferFrom(alice, alice, 4 * 10 ** 9, {"from": bob})
+
+    assert multi.balanceOf(alice) == 10 ** 10
+    assert multi.totalSupply() == supply
+    with brownie.reverts("SafeMath: subtraction overflow"):
+        multi.transfer(alice, 10 ** 10 + 1, {"from": alice})
+    with brownie.reverts("SafeMath: subtraction overflow"):
+        multi.withdraw(10 ** 10 + 1, {"from": alice})
+
+
+# Invalid transfers revert
+def test_transfer_invalid(multi, alice, bob):
+    multi.stake(10 ** 10, {"from": alice})
+    with brownie.reverts("Transfer to the zero address"):
+        multi.transfer(ZERO_ADDRESS, 1, {"from": alice})
+    with brownie.reverts("Transfer to the gauge"):
+        multi.transfer(multi, 1, {"from": alice})
+    with brownie.reverts("SafeMath: subtraction overflow"):
+        multi.transfer(bob, 10 ** 10 + 1, {"from": alice})
+
+
+# A spender moves a position within its allowance
+def test_transfer_from(multi, alice, bob, charlie):
+    multi.stake(10 ** 10, {"from": alice})
+    tx = multi.approve(bob, 10 ** 9, {"from": alice})
+    assert tx.events["Approval"].values() == [alice, bob, 10 ** 9]
+
+    multi.transferFrom(alice, charlie, 4 * 10 ** 8, {"from": bob})
+    assert multi.balanceOf(charlie) == 4 * 10 ** 8
+    assert multi.allowance(alice, bob) == 6 * 10 ** 8
+    with brownie.reverts("Transfer amount exceeds allowance"):
+        multi.transferFrom(alice, charlie, 6 * 10 ** 8 + 1, {"from": bob})
+
+
+# An unlimited allowance is never spent
+def test_transfer_from_unlimited(multi, alice, bob, charlie):
+    multi.stake(10 ** 10, {"from": alice})
+    multi.approve(bob, 2 ** 256 - 1, {"from": alice})
+    multi.transferFrom(alice, charlie, 10 ** 10, {"from": bob})
+    assert multi.allowance(alice, bob) == 2 ** 256 - 1